@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+asyncio API for the Codex/Gemini communicators
+Waits run on the caller's event loop instead of a sleeping thread each: one FileWatcher task per
+loop stats every watched log once per tick and wakes all of that log's waiters, which then parse
+the new entries with the same log readers the blocking communicators use. Sends and other
+one-off calls go through asyncio.to_thread; remote sessions use asyncio streams.
+
+    comm = AsyncCodexCommunicator()
+    reply = await comm.ask("review this diff", timeout=600)
+    async for reply in comm.replies():
+        ...
+
+Cancelling a task that awaits ask() cancels the request as well (unless CCB_CANCEL_ON_ABANDON=0).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import importlib
+import os
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bridge_protocol import (
+    RequestCancelledError,
+    RequestFramer,
+    cancel_on_abandon,
+    cancel_poll_interval,
+    clear_cancel,
+    encode_request,
+    is_cancelled,
+    reply_record_path,
+)
+
+DEFAULT_POLL_INTERVAL = 0.05
+# Same cadence as the blocking readers' checks for a newer session log.
+RESCAN_INTERVAL = 2.0
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return max(0.0, value)
+
+
+def _env_sync_timeout() -> float:
+    return _env_float("CCB_SYNC_TIMEOUT", 3600.0)
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class _Watch:
+    __slots__ = ("signature", "generation", "event", "refs")
+
+    def __init__(self, signature: Optional[Tuple[int, int, int]]):
+        self.signature = signature
+        self.generation = 0
+        self.event = asyncio.Event()
+        self.refs = 0
+
+
+class FileWatcher:
+    """Change notifications for log files: one polling task per event loop, however many waiters"""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = max(0.01, interval if interval is not None
+                            else _env_float("CCB_ASYNC_POLL_INTERVAL", DEFAULT_POLL_INTERVAL))
+        self._watches: Dict[Path, _Watch] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def watch(self, path: Path) -> None:
+        watch = self._watches.get(path)
+        if watch is None:
+            # The baseline is taken now, so a change between watch() and wait() is not missed.
+            watch = self._watches[path] = _Watch(_signature(path))
+        watch.refs += 1
+
+    def unwatch(self, path: Path) -> None:
+        watch = self._watches.get(path)
+        if watch is None:
+            return
+        watch.refs -= 1
+        if watch.refs <= 0:
+            del self._watches[path]
+
+    def generation(self, path: Optional[Path]) -> int:
+        watch = self._watches.get(path) if path else None
+        return watch.generation if watch else 0
+
+    async def wait(self, path: Optional[Path], generation: int, timeout: float) -> bool:
+        """Wait until `path` changes past `generation` or `timeout` elapses; True if it changed"""
+        watch = self._watches.get(path) if path else None
+        if watch is None:
+            await asyncio.sleep(timeout)
+            return False
+        if watch.generation != generation:
+            return True
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        try:
+            await asyncio.wait_for(watch.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _run(self) -> None:
+        while self._watches:
+            await asyncio.sleep(self.interval)
+            for path, watch in list(self._watches.items()):
+                signature = _signature(path)
+                if signature == watch.signature:
+                    continue
+                watch.signature = signature
+                watch.generation += 1
+                watch.event.set()
+                watch.event = asyncio.Event()
+        # Dropped so the finished task does not keep the loop alive through _WATCHERS.
+        self._task = None
+
+
+_WATCHERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, FileWatcher]" = weakref.WeakKeyDictionary()
+
+
+def file_watcher() -> FileWatcher:
+    """The running loop's shared FileWatcher"""
+    loop = asyncio.get_running_loop()
+    watcher = _WATCHERS.get(loop)
+    if watcher is None:
+        watcher = _WATCHERS[loop] = FileWatcher()
+    return watcher
+
+
+class ReplyStream:
+    """Async iterator over replies a log reader finds after `state`; ends at `deadline` (None: never)"""
+
+    def __init__(self, reader: Any, state: Dict[str, Any], path_key: str, tick: float,
+                 deadline: Optional[float] = None, check: Optional[Callable[[], None]] = None):
+        # A private copy: rotating to a newer log must not move other streams' read positions.
+        self.reader = copy.copy(reader)
+        self.state = state
+        self.deadline = deadline
+        self._path_key = path_key
+        self._tick = tick
+        self._check = check
+        self._watcher = file_watcher()
+        self._watched: Optional[Path] = None
+        self._last_rescan = time.time()
+
+    def _path(self, state: Dict[str, Any]) -> Optional[Path]:
+        value = state.get(self._path_key)
+        return Path(value) if value else None
+
+    def _follow(self, path: Optional[Path]) -> None:
+        if path == self._watched:
+            return
+        if self._watched:
+            self._watcher.unwatch(self._watched)
+        self._watched = path
+        if path:
+            self._watcher.watch(path)
+
+    async def next_reply(self) -> Optional[str]:
+        """The next reply, or None once the deadline passes"""
+        while True:
+            if self._check:
+                self._check()
+            path = self._path(self.state)
+            self._follow(path)
+            generation = self._watcher.generation(path)
+            rescan = time.time() - self._last_rescan >= RESCAN_INTERVAL
+            if rescan:
+                self._last_rescan = time.time()
+            reply, self.state = self.reader.try_get_message(self.state, rescan=rescan)
+            if reply:
+                return reply
+            if self._path(self.state) != path:
+                # Switched to another log: watch it before reading it.
+                continue
+            tick = self._tick
+            if self.deadline is not None:
+                remaining = self.deadline - time.time()
+                if remaining <= 0:
+                    return None
+                tick = min(tick, remaining)
+            await self._watcher.wait(path, generation, tick)
+
+    def close(self) -> None:
+        self._follow(None)
+
+    def __aiter__(self) -> "ReplyStream":
+        return self
+
+    async def __anext__(self) -> str:
+        reply = await self.next_reply()
+        if reply is None:
+            self.close()
+            raise StopAsyncIteration
+        return reply
+
+    async def __aenter__(self) -> "ReplyStream":
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        self.close()
+
+
+class _RemoteStream:
+    """An ask's connection to a remote bridge, read with asyncio streams"""
+
+    def __init__(self, address: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.address = address
+        self.reader = reader
+        self.writer = writer
+        self._framer = RequestFramer()
+        self._pending: List[Dict[str, Any]] = []
+
+    async def read(self, op: str, timeout: float) -> Optional[Dict[str, Any]]:
+        from remote_bridge import raise_for_error
+
+        deadline = time.time() + timeout
+        while True:
+            while self._pending:
+                frame = raise_for_error(self._pending.pop(0))
+                if frame.get("op") == op:
+                    return frame
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            try:
+                data = await asyncio.wait_for(self.reader.read(65536), remaining)
+            except asyncio.TimeoutError:
+                return None
+            if not data:
+                raise RuntimeError(f"Remote bridge {self.address} closed the connection")
+            self._pending.extend(self._framer.feed(data))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _AsyncCommunicator:
+    provider = ""
+    label = ""
+    # Key of the log file in the reader's state dict
+    path_key = ""
+    # Sync communicator as "module.Class", imported only when no `comm` is passed in
+    comm_class = ""
+
+    def __init__(self, comm: Any = None, lazy_init: bool = True):
+        if comm is None:
+            module, _, name = self.comm_class.rpartition(".")
+            comm = getattr(importlib.import_module(module), name)(lazy_init=lazy_init)
+        self.comm = comm
+
+    def _tick(self) -> float:
+        return min(cancel_poll_interval(), RESCAN_INTERVAL)
+
+    def _match(self, marker: str, reply: str) -> Optional[str]:
+        return reply
+
+    # Correlated waits: the provider can tell which reply answers which ask (see wait()).
+    def _correlated(self, state: Dict[str, Any]) -> bool:
+        return False
+
+    def _correlated_path(self, marker: str, state: Dict[str, Any]) -> Optional[Path]:
+        return None
+
+    def _take_correlated(self, marker: str, state: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+        return None, state
+
+    def _send_options(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        return options
+
+    async def health(self, probe: bool = False) -> Tuple[bool, str]:
+        return await asyncio.to_thread(self.comm._check_session_health_impl, probe)
+
+    async def status(self) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.comm.get_status)
+
+    async def pending(self, n: int = 1):
+        return await asyncio.to_thread(self.comm.consume_pending, False, n)
+
+    async def cancel(self, marker: str) -> bool:
+        return await asyncio.to_thread(self.comm.cancel, marker)
+
+    async def send(self, content: str, deadline: Optional[float] = None, **options: Any) -> Tuple[str, Dict[str, Any]]:
+        """Submit `content`; returns (marker, state) for wait(). Raises BridgeBackpressureError when full"""
+        options = self._send_options(options)
+        if self.comm.remote:
+            return await self._remote_send(content, deadline, options)
+        return await asyncio.to_thread(self.comm._send_message, content, deadline=deadline, **options)
+
+    async def _remote_send(self, content: str, deadline: Optional[float],
+                           options: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        client = self.comm.remote
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(client.host, client.port, ssl=client.ssl_context(),
+                                        server_hostname=client.host if client.tls else None),
+                client.connect_timeout,
+            )
+        except (OSError, asyncio.TimeoutError) as exc:
+            raise RuntimeError(f"Cannot reach remote bridge {client.address}: {exc}")
+        stream = _RemoteStream(client.address, reader, writer)
+        frame = {"op": "ask", "token": client.token, "content": content,
+                 "timeout": deadline - time.time() if deadline else _env_sync_timeout(), "deadline": deadline}
+        frame.update(options)
+        try:
+            writer.write(encode_request({key: value for key, value in frame.items() if value is not None}))
+            await writer.drain()
+            accepted = await stream.read("accepted", client.connect_timeout)
+        except BaseException:
+            stream.close()
+            raise
+        if accepted is None:
+            stream.close()
+            raise RuntimeError(f"Remote bridge {client.address} did not accept the request")
+        return str(accepted.get("marker") or ""), {"remote_stream": stream}
+
+    def _check_cancelled(self, marker: str) -> None:
+        if is_cancelled(self.comm.runtime_dir, marker):
+            clear_cancel(self.comm.runtime_dir, marker)
+            raise RequestCancelledError(f"Request {marker} was cancelled")
+
+    async def wait(self, marker: str, state: Dict[str, Any], timeout: float) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Reply to `marker` within `timeout` seconds (0: no limit), None on timeout; the returned state
+        resumes the wait. Raises RequestCancelledError if the request is cancelled meanwhile.
+        """
+        stream = state.get("remote_stream")
+        if stream is not None:
+            frame = await stream.read("reply", timeout if timeout > 0 else _env_sync_timeout())
+            if frame is None:
+                return None, state
+            stream.close()
+            if frame.get("status") == "cancelled":
+                raise RequestCancelledError(f"Request {marker} was cancelled")
+            return frame.get("reply"), state
+        deadline = time.time() + timeout if timeout > 0 else None
+        if self._correlated(state):
+            result = await self._wait_correlated(marker, state, deadline)
+            if result is not None:
+                return result
+            # Correlation stopped (the bridge went away): the first reply after our send is ours.
+        replies = ReplyStream(self.comm.log_reader, state, self.path_key, self._tick(), deadline,
+                              check=lambda: self._check_cancelled(marker))
+        matched: Optional[str] = None
+        async with replies:
+            async for reply in replies:
+                matched = self._match(marker, reply)
+                if matched is not None:
+                    break
+        return matched, replies.state
+
+    async def _wait_correlated(self, marker: str, state: Dict[str, Any],
+                               deadline: Optional[float]) -> Optional[Tuple[Optional[str], Dict[str, Any]]]:
+        watcher = file_watcher()
+        path = self._correlated_path(marker, state)
+        if path:
+            watcher.watch(path)
+        last_check = time.time()
+        try:
+            while True:
+                self._check_cancelled(marker)
+                generation = watcher.generation(path)
+                reply, state = self._take_correlated(marker, state)
+                if reply:
+                    return reply, state
+                tick = self._tick()
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return None, state
+                    tick = min(tick, remaining)
+                await watcher.wait(path, generation, tick)
+                if time.time() - last_check >= cancel_poll_interval():
+                    last_check = time.time()
+                    if not self._correlated(state):
+                        return None
+        finally:
+            if path:
+                watcher.unwatch(path)
+
+    async def ask(self, content: str, timeout: Optional[float] = None, **options: Any) -> Optional[str]:
+        """
+        Send `content` and await its reply; None on timeout (default CCB_SYNC_TIMEOUT, 0: no limit).
+        Cancelling the awaiting task, or timing out, cancels the request too (CCB_CANCEL_ON_ABANDON).
+        """
+        healthy, status = await self.health()
+        if not healthy:
+            raise RuntimeError(f"❌ Session error: {status}")
+        timeout = _env_sync_timeout() if timeout is None else float(timeout)
+        deadline = time.time() + timeout if timeout > 0 else None
+        marker, state = await self.send(content, deadline=deadline, **options)
+        try:
+            reply, _ = await self.wait(marker, state, timeout)
+        except asyncio.CancelledError:
+            if "remote_stream" in state:
+                state["remote_stream"].close()
+            if cancel_on_abandon():
+                # Not awaited: this task is being cancelled.
+                asyncio.get_running_loop().run_in_executor(None, self.comm.cancel, marker)
+            raise
+        if reply is None and cancel_on_abandon():
+            await self.cancel(marker)
+        return reply
+
+    def replies(self, state: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> ReplyStream:
+        """Every reply logged from now (or from `state`) on, as an async iterator"""
+        if self.comm.remote:
+            raise RuntimeError(f"Streaming {self.label} replies needs the local session logs (not remote)")
+        reader = self.comm.log_reader
+        return ReplyStream(reader, state if state is not None else reader.capture_state(), self.path_key,
+                           self._tick(), time.time() + timeout if timeout else None)
+
+
+class AsyncCodexCommunicator(_AsyncCommunicator):
+    """asyncio counterpart of CodexCommunicator (options: coalesce, priority)"""
+
+    provider = "codex"
+    label = "Codex"
+    path_key = "log_path"
+    comm_class = "codex_comm.CodexCommunicator"
+
+    def _match(self, marker: str, reply: str) -> Optional[str]:
+        return self.comm._match_reply(marker, reply)
+
+    def _correlated(self, state: Dict[str, Any]) -> bool:
+        return self.comm.correlated()
+
+    def _correlated_path(self, marker: str, state: Dict[str, Any]) -> Optional[Path]:
+        return reply_record_path(self.comm.runtime_dir, marker)
+
+    def _take_correlated(self, marker: str, state: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+        return self.comm.take_reply(marker), state
+
+    def _send_options(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        unknown = set(options) - {"coalesce", "priority"}
+        if unknown:
+            raise TypeError(f"Unknown Codex ask option(s): {', '.join(sorted(unknown))}")
+        return options
+
+
+class AsyncGeminiCommunicator(_AsyncCommunicator):
+    """asyncio counterpart of GeminiCommunicator"""
+
+    provider = "gemini"
+    label = "Gemini"
+    path_key = "session_path"
+    comm_class = "gemini_comm.GeminiCommunicator"
+
+    def _tick(self) -> float:
+        # Session JSON is rewritten in place; coarse mtimes need the reader's periodic forced read.
+        return min(super()._tick(), self.comm.log_reader._force_read_interval)
+
+    def _correlated(self, state: Dict[str, Any]) -> bool:
+        return state.get("ask_content") is not None
+
+    def _correlated_path(self, marker: str, state: Dict[str, Any]) -> Optional[Path]:
+        return Path(state["session_path"]) if state.get("session_path") else None
+
+    def _take_correlated(self, marker: str, state: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+        return self.comm.find_reply(state)
+
+    def _send_options(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        if options:
+            raise TypeError(f"Unknown Gemini ask option(s): {', '.join(sorted(options))}")
+        return options
+
+
+def async_communicator(provider: str, lazy_init: bool = True) -> _AsyncCommunicator:
+    if provider == "codex":
+        return AsyncCodexCommunicator(lazy_init=lazy_init)
+    if provider == "gemini":
+        return AsyncGeminiCommunicator(lazy_init=lazy_init)
+    raise ValueError(f"Unknown provider: {provider}")
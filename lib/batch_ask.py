@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Batch asks: every prompt of a JSONL file through one communicator, results as NDJSON
+  input:  one prompt per line, a JSON string or {"prompt": ..., "id": ..., "timeout": ..., "priority": ...}
+  output: one object per prompt, in order: id, line, status, reply, marker, latency_ms (send to reply), error
+Each prompt goes out as soon as the previous turn completes; when the bridge matches replies to their
+asks (see CodexCommunicator.correlated), the next prompt already waits in its queue instead.
+With --resume, prompts already answered in the output file are skipped; the rest are retried and the
+file is put back in input order once the run ends. "priority" is ignored by providers without lanes.
+
+Usage: cask-w --batch prompts.jsonl [-o results.jsonl [--resume]] [--timeout SECONDS]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, TextIO, Tuple
+
+from bridge_protocol import BridgeBackpressureError, RequestCancelledError, cancel_on_abandon
+from cli_output import EXIT_ERROR, EXIT_NO_REPLY, EXIT_OK, atomic_write_text
+
+BACKPRESSURE_RETRY = 1.0
+
+
+def load_prompts(path: Path) -> List[Dict[str, Any]]:
+    """Items with "id", "line", "prompt" and optional "timeout"/"priority"; raises ValueError on a bad line"""
+    items: List[Dict[str, Any]] = []
+    seen = set()
+    with Path(path).open("r", encoding="utf-8-sig") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as exc:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({exc})")
+            if isinstance(data, str):
+                data = {"prompt": data}
+            if not isinstance(data, dict):
+                raise ValueError(f"{path}:{line_no}: expected a string or an object")
+            prompt = data.get("prompt") or data.get("message") or data.get("content")
+            if not isinstance(prompt, str) or not prompt.strip():
+                raise ValueError(f"{path}:{line_no}: missing prompt")
+            item_id = str(data["id"]) if data.get("id") is not None else str(line_no)
+            if item_id in seen:
+                raise ValueError(f"{path}:{line_no}: duplicate id {item_id}")
+            seen.add(item_id)
+            item = {"id": item_id, "line": line_no, "prompt": prompt.strip()}
+            if data.get("timeout") is not None:
+                item["timeout"] = float(data["timeout"])
+            if data.get("priority"):
+                item["priority"] = str(data["priority"]).strip().lower()
+            items.append(item)
+    return items
+
+
+def answered_ids(out_path: Path) -> set:
+    """Keep only the answered records of a previous run (rewritten in place); returns their ids"""
+    try:
+        lines = out_path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return set()
+    kept: List[str] = []
+    done = set()
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # a record cut short by an interrupted run
+        if isinstance(record, dict) and record.get("status") == "ok" and record.get("id") not in done:
+            done.add(record.get("id"))
+            kept.append(line)
+    atomic_write_text(out_path, "".join(line + "\n" for line in kept))
+    return done
+
+
+def sort_output(out_path: Path) -> None:
+    """Rewrite a results file in input-line order (a resumed run appends its retries at the end)"""
+    try:
+        lines = [line for line in out_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    except OSError:
+        return
+
+    def line_no(text: str) -> float:
+        try:
+            return float(json.loads(text).get("line"))
+        except (ValueError, TypeError, AttributeError):
+            return float("inf")
+
+    atomic_write_text(out_path, "".join(line + "\n" for line in sorted(lines, key=line_no)))
+
+
+def accepts_option(comm: Any, name: str) -> bool:
+    """Whether comm._send_message() takes `name` (Gemini has no priority lanes)"""
+    import inspect
+
+    try:
+        return name in inspect.signature(comm._send_message).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+class BatchRunner:
+    """Sends `items` through one communicator; `window` prompts may be in flight at once"""
+
+    def __init__(self, comm: Any, items: List[Dict[str, Any]], timeout: float, emit,
+                 window: int = 1, **send_options: Any):
+        self.comm = comm
+        self.items = items
+        self.timeout = timeout
+        self.emit = emit
+        self.window = max(1, window)
+        self.send_options = {k: v for k, v in send_options.items() if v is not None}
+        self.priority_lanes = accepts_option(comm, "priority")
+        self.inflight: Deque[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], float]] = deque()
+        self.results: List[Dict[str, Any]] = []
+
+    def _timeout(self, item: Dict[str, Any]) -> float:
+        return float(item.get("timeout", self.timeout))
+
+    def _send(self, item: Dict[str, Any]) -> None:
+        result: Dict[str, Any] = {"id": item["id"], "line": item["line"], "status": "error", "reply": None, "marker": None}
+        timeout = self._timeout(item)
+        options = dict(self.send_options)
+        if item.get("priority") and self.priority_lanes:
+            options["priority"] = item["priority"]
+        started = time.perf_counter()
+        # Queued prompts wait out the ones ahead of them before their own timeout starts.
+        deadline = time.time() + timeout * (len(self.inflight) + 1) if timeout > 0 else None
+        while True:
+            try:
+                result["marker"], state = self.comm._send_message(item["prompt"], deadline=deadline, **options)
+                break
+            except BridgeBackpressureError as exc:
+                if deadline is not None and time.time() + BACKPRESSURE_RETRY >= deadline:
+                    result["status"] = "backpressure"
+                    result["error"] = str(exc)
+                    return self._done(result, started)
+                time.sleep(BACKPRESSURE_RETRY)
+            except Exception as exc:
+                result["error"] = str(exc).removeprefix("❌ ")
+                return self._done(result, started)
+        self.inflight.append((item, result, state, started))
+
+    def _wait_oldest(self) -> None:
+        item, result, state, started = self.inflight.popleft()
+        timeout = self._timeout(item)
+        try:
+            reply, _ = self.comm.wait_for_reply(result["marker"], state, timeout)
+            result["status"] = "ok" if reply else "timeout"
+            result["reply"] = reply
+            if not reply and cancel_on_abandon():
+                self.comm.cancel(result["marker"])
+        except RequestCancelledError:
+            result["status"] = "cancelled"
+        except Exception as exc:
+            result["error"] = str(exc).removeprefix("❌ ")
+        self._done(result, started)
+
+    def _done(self, result: Dict[str, Any], started: float) -> None:
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000.0)
+        self.results.append(result)
+        self.emit(result)
+
+    def run(self) -> List[Dict[str, Any]]:
+        pending = deque(self.items)
+        try:
+            while pending or self.inflight:
+                while pending and len(self.inflight) < self.window:
+                    self._send(pending.popleft())
+                if self.inflight:
+                    self._wait_oldest()
+        except KeyboardInterrupt:
+            if cancel_on_abandon():
+                for _, result, _, _ in self.inflight:
+                    try:
+                        self.comm.cancel(result["marker"])
+                    except Exception:
+                        pass
+            raise
+        return self.results
+
+
+def pipeline_window(comm: Any) -> int:
+    """2 when replies are matched to their asks (one prompt can wait in the bridge queue), else 1"""
+    correlated = getattr(comm, "correlated", None)
+    try:
+        return 2 if callable(correlated) and correlated() else 1
+    except Exception:
+        return 1
+
+
+def exit_code(results: List[Dict[str, Any]]) -> int:
+    if all(r["status"] == "ok" for r in results):
+        return EXIT_OK
+    if any(r["status"] in ("ok", "timeout", "cancelled") for r in results):
+        return EXIT_NO_REPLY
+    return EXIT_ERROR
+
+
+def run(comm: Any, label: str, batch_path: Path, out_path: Optional[Path] = None, timeout: float = 3600.0,
+        resume: bool = False, out: TextIO = sys.stdout, **send_options: Any) -> int:
+    try:
+        items = load_prompts(batch_path)
+    except (OSError, ValueError) as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return EXIT_ERROR
+    if resume and out_path is None:
+        print("❌ --resume requires --output FILE (the results of the earlier run)", file=sys.stderr)
+        return EXIT_ERROR
+
+    done = answered_ids(out_path) if resume and out_path.exists() else set()
+    todo = [item for item in items if item["id"] not in done]
+    skipped = f", {len(items) - len(todo)} already answered" if done else ""
+    print(f"🔔 Batch to {label}: {len(todo)} prompts{skipped}", file=sys.stderr, flush=True)
+    if not todo:
+        return EXIT_OK
+
+    healthy, status = comm._check_session_health_impl(probe_terminal=False)
+    if not healthy:
+        print(f"❌ Session error: {status}", file=sys.stderr)
+        return EXIT_ERROR
+
+    if any(item.get("priority") for item in todo) and not accepts_option(comm, "priority"):
+        print(f"⚠️ {label} has no priority lanes; \"priority\" is ignored", file=sys.stderr)
+
+    sink = out_path.open("a" if resume else "w", encoding="utf-8") if out_path else out
+    position = len(items) - len(todo)
+
+    def emit(result: Dict[str, Any]) -> None:
+        nonlocal position
+        position += 1
+        sink.write(json.dumps(result, ensure_ascii=False) + "\n")
+        sink.flush()
+        icon = "✅" if result["status"] == "ok" else "⚠️"
+        detail = result["status"] if not result.get("error") else f"{result['status']}: {result['error']}"
+        print(f"{icon} [{position}/{len(items)}] {result['id']} ({detail}, {result['latency_ms'] / 1000.0:.2f}s)",
+              file=sys.stderr, flush=True)
+
+    try:
+        runner = BatchRunner(comm, todo, timeout, emit, window=pipeline_window(comm), **send_options)
+        return exit_code(runner.run())
+    finally:
+        if sink is not out:
+            sink.close()
+            if resume:
+                sort_output(out_path)
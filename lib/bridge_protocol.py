@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+Bridge wire protocol
+Requests are newline-delimited JSON objects ("frames") written to the bridge's input FIFO.
+
+Submission never blocks indefinitely: frames are written non-blocking and kept within PIPE_BUF
+so each write is atomic (larger messages are handed over through a file in the runtime dir).
+When the bridge is not reading, frames are appended to a durable spool that the bridge drains
+into its bounded queue. A full queue or spool is reported as BridgeBackpressureError.
+
+Requests may carry a "deadline" (UNIX time) after which the bridge drops them unsent, and can be
+cancelled through a marker file in the runtime dir that also releases the waiting caller.
+Each request names a priority lane ("interactive" or "background"); the bridge dispatches the
+lanes strictly or by weight.
+Requests flagged "coalesce" may be merged by the bridge into one prompt with numbered sections;
+the bridge records each member's section index so the waiting caller can split its answer out.
+A turn-aware bridge correlates replies: it matches each logged user message to the request it
+typed and files that turn's reply under the request's marker, so concurrent callers never take
+each other's answers.
+"""
+
+from __future__ import annotations
+
+import errno
+import json
+import os
+import re
+import select
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the FIFO bridge only runs in tmux mode
+    fcntl = None
+
+DEFAULT_MAX_REQUEST_BYTES = 4 * 1024 * 1024
+DEFAULT_QUEUE_MAX = 64
+DEFAULT_SPOOL_MAX = 256
+DEFAULT_SUBMIT_TIMEOUT = 5.0
+
+SPOOL_FILE = "spool.jsonl"
+SPOOL_LOCK_FILE = "spool.lock"
+STATE_FILE = "bridge_state.json"
+MESSAGE_DIR = "requests"
+COALESCE_DIR = "coalesced"
+CANCEL_DIR = "cancel"
+REPLY_DIR = "replies"
+CLAIM_DIR = "claims"
+PRIORITIES = ("interactive", "background")
+DEFAULT_PRIORITY = "interactive"
+# Writes up to PIPE_BUF bytes are atomic, so concurrent clients never interleave frames.
+_ATOMIC_FRAME_BYTES = getattr(select, "PIPE_BUF", 512)
+# Shortest truncated log entry same_prompt() still matches by its opening.
+_PROMPT_PREFIX_MIN = 200
+
+
+class BridgeBackpressureError(RuntimeError):
+    """Bridge queue (or spool) is full; the caller should retry later"""
+
+
+class RequestCancelledError(RuntimeError):
+    """The request was cancelled (cask/gask --cancel) while its caller was waiting"""
+
+
+class MissingSectionError(RuntimeError):
+    """A coalesced ask's combined reply came back without this request's answer section"""
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return max(1, value)
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return max(0.0, value)
+
+
+def max_request_bytes() -> int:
+    return _env_int("CCB_BRIDGE_MAX_REQUEST_BYTES", DEFAULT_MAX_REQUEST_BYTES)
+
+
+def queue_max() -> int:
+    return _env_int("CCB_BRIDGE_QUEUE_MAX", DEFAULT_QUEUE_MAX)
+
+
+def spool_max() -> int:
+    return _env_int("CCB_BRIDGE_SPOOL_MAX", DEFAULT_SPOOL_MAX)
+
+
+def submit_timeout() -> float:
+    return _env_float("CCB_SUBMIT_TIMEOUT", DEFAULT_SUBMIT_TIMEOUT)
+
+
+def coalesce_enabled() -> bool:
+    return os.environ.get("CCB_COALESCE", "").lower() in {"1", "true", "yes", "on"}
+
+
+def default_priority() -> str:
+    value = (os.environ.get("CCB_PRIORITY") or "").strip().lower()
+    return value if value in PRIORITIES else DEFAULT_PRIORITY
+
+
+def request_priority(message: Dict[str, Any]) -> str:
+    value = str(message.get("priority") or "").lower()
+    return value if value in PRIORITIES else DEFAULT_PRIORITY
+
+
+def cancel_poll_interval() -> float:
+    return max(0.1, _env_float("CCB_CANCEL_POLL", 2.0))
+
+
+def cancel_on_abandon() -> bool:
+    return os.environ.get("CCB_CANCEL_ON_ABANDON", "1").lower() not in {"0", "false", "no", "off"}
+
+
+def interrupt_key(provider: str) -> str:
+    return os.environ.get(f"CCB_{provider.upper()}_INTERRUPT_KEY") or "Escape"
+
+
+def request_expired(message: Dict[str, Any], now: Optional[float] = None) -> bool:
+    deadline = message.get("deadline")
+    if not isinstance(deadline, (int, float)) or isinstance(deadline, bool):
+        return False
+    return (time.time() if now is None else now) >= deadline
+
+
+def encode_request(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class RequestFramer:
+    """Splits a byte stream into newline-framed JSON requests with a per-frame size limit"""
+
+    def __init__(self, max_bytes: int | None = None):
+        self.max_bytes = max_bytes or max_request_bytes()
+        self._buffer = bytearray()
+        self._discarding = False
+        self.oversized = 0
+        self.malformed = 0
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        """Add bytes and return every complete request they finish"""
+        requests: List[Dict[str, Any]] = []
+        self._buffer.extend(data)
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline < 0:
+                if len(self._buffer) > self.max_bytes:
+                    # Oversized frame: drop what we have and skip until the next newline.
+                    if not self._discarding:
+                        self.oversized += 1
+                    self._discarding = True
+                    self._buffer.clear()
+                break
+            frame = bytes(self._buffer[:newline])
+            del self._buffer[:newline + 1]
+            if self._discarding:
+                self._discarding = False
+                continue
+            if len(frame) > self.max_bytes:
+                self.oversized += 1
+                continue
+            if not frame.strip():
+                continue
+            try:
+                payload = json.loads(frame.decode("utf-8", errors="replace"))
+            except json.JSONDecodeError:
+                self.malformed += 1
+                continue
+            if isinstance(payload, dict):
+                requests.append(payload)
+            else:
+                self.malformed += 1
+        return requests
+
+
+def _pid_alive(pid: Any) -> bool:
+    try:
+        os.kill(int(pid), 0)
+        return True
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+def _atomic_write_json(path: Path, data: Any) -> None:
+    import tempfile
+
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+# ---- bridge state ----
+
+def read_bridge_state(runtime_dir: Path) -> Optional[Dict[str, Any]]:
+    """Bridge state published by a live bridge (None if absent or the bridge has exited)"""
+    try:
+        data = json.loads((Path(runtime_dir) / STATE_FILE).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(data, dict) or not _pid_alive(data.get("pid")):
+        return None
+    return data
+
+
+def write_bridge_state(runtime_dir: Path, state: Dict[str, Any]) -> None:
+    try:
+        _atomic_write_json(Path(runtime_dir) / STATE_FILE, state)
+    except Exception:
+        pass
+
+
+# ---- spool ----
+
+class _SpoolLock:
+    def __init__(self, runtime_dir: Path):
+        self.path = Path(runtime_dir) / SPOOL_LOCK_FILE
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "_SpoolLock":
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        if self._fd is not None:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+def spool_depth(runtime_dir: Path) -> int:
+    try:
+        with (Path(runtime_dir) / SPOOL_FILE).open("rb") as handle:
+            return sum(1 for line in handle if line.strip())
+    except OSError:
+        return 0
+
+
+def spool_append(runtime_dir: Path, frame: bytes, limit: Optional[int] = None) -> int:
+    """Durably append a frame to the spool; returns the new depth"""
+    runtime_dir = Path(runtime_dir)
+    with _SpoolLock(runtime_dir):
+        depth = spool_depth(runtime_dir)
+        if limit is not None and depth >= limit:
+            raise BridgeBackpressureError(f"Bridge spool full ({depth}/{limit} requests), retry later")
+        with (runtime_dir / SPOOL_FILE).open("ab") as handle:
+            handle.write(frame if frame.endswith(b"\n") else frame + b"\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+    return depth + 1
+
+
+def spool_take(runtime_dir: Path, max_items: int) -> List[bytes]:
+    """Remove and return up to max_items spooled frames (oldest first)"""
+    runtime_dir = Path(runtime_dir)
+    path = runtime_dir / SPOOL_FILE
+    if max_items <= 0 or not path.exists():
+        return []
+    with _SpoolLock(runtime_dir):
+        try:
+            lines = [line for line in path.read_bytes().splitlines(keepends=True) if line.strip()]
+        except OSError:
+            return []
+        taken, rest = lines[:max_items], lines[max_items:]
+        if rest:
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(b"".join(rest))
+            os.replace(tmp, path)
+        else:
+            path.unlink(missing_ok=True)
+    return taken
+
+
+# ---- message files (frames larger than PIPE_BUF) ----
+
+def load_message_file(runtime_dir: Path, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Resolve a frame that points at a message file; returns the full message"""
+    name = payload.get("message_file")
+    if not name:
+        return payload
+    path = Path(runtime_dir) / MESSAGE_DIR / Path(str(name)).name
+    try:
+        if path.stat().st_size > max_request_bytes():
+            return None
+        message = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    finally:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+    return message if isinstance(message, dict) else None
+
+
+def _frame_for(runtime_dir: Path, message: Dict[str, Any]) -> bytes:
+    frame = encode_request(message)
+    if len(frame) > max_request_bytes():
+        raise RuntimeError(f"Message too large ({len(frame)} bytes, limit {max_request_bytes()})")
+    if len(frame) <= _ATOMIC_FRAME_BYTES:
+        return frame
+    message_dir = Path(runtime_dir) / MESSAGE_DIR
+    message_dir.mkdir(parents=True, exist_ok=True)
+    name = f"{message.get('marker') or 'msg'}-{os.getpid()}-{time.time_ns()}.json"
+    _atomic_write_json(message_dir / name, message)
+    return encode_request({"marker": message.get("marker"), "message_file": name})
+
+
+def _write_frame_nonblocking(fifo: Path, frame: bytes, timeout: float) -> bool:
+    """Write a frame to the FIFO; False if no reader or the deadline passed"""
+    try:
+        fd = os.open(fifo, os.O_WRONLY | os.O_NONBLOCK)
+    except OSError as exc:
+        if exc.errno in (errno.ENXIO, errno.ENOENT):
+            return False
+        raise
+    deadline = time.time() + timeout
+    try:
+        while True:
+            try:
+                os.write(fd, frame)
+                return True
+            except BlockingIOError:
+                pass
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            select.select([], [fd], [], min(remaining, 0.5))
+    finally:
+        os.close(fd)
+
+
+def submit_request(runtime_dir: Path, fifo: Path, message: Dict[str, Any],
+                   timeout: Optional[float] = None) -> str:
+    """
+    Submit a request to the bridge without blocking past the deadline.
+
+    Returns "sent" when the bridge accepted the frame, "spooled" when it was queued on disk for
+    the bridge to pick up. Raises BridgeBackpressureError when the bridge queue or spool is full.
+    """
+    runtime_dir = Path(runtime_dir)
+    state = read_bridge_state(runtime_dir)
+    if state:
+        depth = int(state.get("queue_depth") or 0)
+        limit = int(state.get("queue_max") or queue_max())
+        if depth >= limit:
+            raise BridgeBackpressureError(f"Bridge queue full ({depth}/{limit} requests), retry later")
+    frame = _frame_for(runtime_dir, message)
+    timeout = submit_timeout() if timeout is None else max(0.0, timeout)
+    if _write_frame_nonblocking(Path(fifo), frame, timeout):
+        return "sent"
+    spool_append(runtime_dir, frame, limit=spool_max())
+    return "spooled"
+
+
+# ---- coalescing (several small asks in one provider turn) ----
+
+# Answer headers carry the batch marker, so a section is only ever taken from its own batch's reply.
+_ANSWER_HEADER = "=== CCB ANSWER {batch} {index} ==="
+_ANSWER_HEADER_RE = re.compile(r"^[ \t>*#]*=== CCB ANSWER (\S+) (\d+) ===[ \t*]*$", re.MULTILINE)
+
+
+def build_coalesced_prompt(contents: List[str], batch: str) -> str:
+    """One prompt with numbered sections; the reply is expected to mirror them"""
+    lines = [
+        f"Answer the following {len(contents)} independent requests separately.",
+        f"Begin the answer to request N with the line \"{_ANSWER_HEADER.format(batch=batch, index='N')}\" "
+        "and do not add text outside the answers.",
+        "",
+    ]
+    for index, content in enumerate(contents, 1):
+        lines.append(f"=== CCB REQUEST {index} ===")
+        lines.append(content.strip())
+        lines.append("")
+    return "\n".join(lines).strip()
+
+
+def is_coalesced_reply(reply: str) -> bool:
+    return bool(_ANSWER_HEADER_RE.search(reply or ""))
+
+
+def is_batch_reply(reply: str, batch: str) -> bool:
+    return any(match.group(1) == batch for match in _ANSWER_HEADER_RE.finditer(reply or ""))
+
+
+def split_coalesced_reply(reply: str, index: int, batch: str) -> Optional[str]:
+    """Section `index` of `batch`'s coalesced reply; None if the reply has no such section
+    (never the whole reply: that would hand every caller the others' answers)"""
+    headers = list(_ANSWER_HEADER_RE.finditer(reply or ""))
+    for pos, match in enumerate(headers):
+        if match.group(1) != batch or int(match.group(2)) != index:
+            continue
+        end = headers[pos + 1].start() if pos + 1 < len(headers) else len(reply)
+        return reply[match.end():end].strip()
+    return None
+
+
+def missing_section_message(batch: str, index: int) -> str:
+    return f"The combined reply to {batch} has no answer section {index} for this request; ask again without coalescing"
+
+
+def _coalesce_record_path(runtime_dir: Path, marker: str) -> Path:
+    return Path(runtime_dir) / COALESCE_DIR / f"{Path(str(marker)).name}.json"
+
+
+def write_coalesce_record(runtime_dir: Path, marker: str, batch: str, index: int, count: int) -> None:
+    path = _coalesce_record_path(runtime_dir, marker)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write_json(path, {"batch": batch, "index": index, "count": count})
+    except Exception:
+        pass
+
+
+def read_coalesce_record(runtime_dir: Path, marker: str) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(_coalesce_record_path(runtime_dir, marker).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def discard_coalesce_record(runtime_dir: Path, marker: str) -> None:
+    try:
+        _coalesce_record_path(runtime_dir, marker).unlink()
+    except OSError:
+        pass
+
+
+# ---- reply correlation ----
+
+def same_prompt(logged: str, sent: str) -> bool:
+    """Whether a user message found in a provider log is the prompt that was typed"""
+    logged, sent = " ".join((logged or "").split()), " ".join((sent or "").split())
+    if not logged or not sent:
+        return False
+    if len(logged) >= len(sent):
+        return logged == sent
+    # Only a log entry cut short (long prompts may be logged trimmed) is matched by its opening,
+    # and only a long one: a short prefix would also match any longer prompt that starts alike.
+    logged = logged.rstrip(".… ")
+    return len(logged) >= _PROMPT_PREFIX_MIN and sent.startswith(logged)
+
+
+def reply_record_path(runtime_dir: Path, marker: str) -> Path:
+    return Path(runtime_dir) / REPLY_DIR / f"{Path(str(marker)).name}.json"
+
+
+def write_reply_record(runtime_dir: Path, marker: str, reply: str, **extra: Any) -> None:
+    path = reply_record_path(runtime_dir, marker)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write_json(path, {"marker": marker, "reply": reply, "at": time.time(), **extra})
+    except Exception:
+        pass
+
+
+def take_reply_record(runtime_dir: Path, marker: str) -> Optional[Dict[str, Any]]:
+    """The reply filed for `marker`, removed once read (None while it has not arrived)"""
+    path = reply_record_path(runtime_dir, marker)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    try:
+        path.unlink()
+    except OSError:
+        pass
+    return data if isinstance(data, dict) else None
+
+
+def claim_entry(runtime_dir: Path, key: str, owner: str = "") -> bool:
+    """
+    Reserve a logged user message for one waiter; False if another waiter already has it.
+    `owner` (the waiter's marker) is kept in the claim so cancel() can tell whose prompt it is.
+    """
+    path = Path(runtime_dir) / CLAIM_DIR / Path(str(key)).name
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    except FileExistsError:
+        return False
+    except OSError:
+        # Claims are best effort: without them identical concurrent prompts may share a reply.
+        return True
+    try:
+        if owner:
+            os.write(fd, owner.encode("utf-8"))
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+    return True
+
+
+def claim_owner(runtime_dir: Path, key: str) -> Optional[str]:
+    """Marker of the waiter that claimed `key`, None if unclaimed or claimed without an owner"""
+    try:
+        owner = (Path(runtime_dir) / CLAIM_DIR / Path(str(key)).name).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return owner or None
+
+
+# ---- cancellation ----
+
+def _cancel_path(runtime_dir: Path, marker: str) -> Path:
+    return Path(runtime_dir) / CANCEL_DIR / Path(str(marker)).name
+
+
+def request_cancel(runtime_dir: Path, marker: str) -> None:
+    path = _cancel_path(runtime_dir, marker)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"{time.time()}\n", encoding="utf-8")
+
+
+def is_cancelled(runtime_dir: Path, marker: str) -> bool:
+    return bool(marker) and _cancel_path(runtime_dir, marker).exists()
+
+
+def clear_cancel(runtime_dir: Path, marker: str) -> None:
+    try:
+        _cancel_path(runtime_dir, marker).unlink()
+    except OSError:
+        pass
+
+
+def purge_stale_records(runtime_dir: Path, max_age: float = 86400.0) -> None:
+    """Drop cancel / coalesce / reply records nobody picked up (their callers are long gone)"""
+    cutoff = time.time() - max_age
+    for name in (CANCEL_DIR, COALESCE_DIR, REPLY_DIR, CLAIM_DIR):
+        directory = Path(runtime_dir) / name
+        try:
+            candidates = list(directory.iterdir())
+        except OSError:
+            continue
+        for path in candidates:
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+
+def purge_stale_records_every(runtime_dir: Path, interval: float = 3600.0) -> None:
+    """purge_stale_records() at most once per `interval`, for callers without a long-lived loop"""
+    stamp = Path(runtime_dir) / ".purged"
+    try:
+        if time.time() - stamp.stat().st_mtime < interval:
+            return
+    except OSError:
+        pass
+    try:
+        stamp.touch()
+    except OSError:
+        return
+    purge_stale_records(runtime_dir)
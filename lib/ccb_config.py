@@ -1,7 +1,6 @@
 """CCB configuration for Windows/WSL backend environment"""
 import json
 import os
-import subprocess
 import sys
 from pathlib import Path
 
@@ -25,6 +24,8 @@ def get_backend_env() -> str | None:
 
 def _wsl_probe_distro_and_home() -> tuple[str, str]:
     """Probe default WSL distro and home directory"""
+    import subprocess
+
     try:
         r = subprocess.run(
             ["wsl.exe", "-e", "sh", "-lc", "echo $WSL_DISTRO_NAME; echo $HOME"],
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Per-project ccb daemon
+Keeps Codex/Gemini communicators (session info, log readers, terminal backends) warm and serves
+them over a Unix socket as newline-framed JSON-RPC 2.0, so bin/* scripts skip the interpreter-wide
+imports and log rescans. Clients fall back to the in-process path when no daemon is running.
+
+Methods (params): ask(provider, content, [coalesce, deadline, priority, timeout]) -> {marker}
+                  wait(marker, timeout) -> {status: ok|timeout|cancelled, reply}
+                  pending(provider, n) / status(provider) / turn(provider)
+                  ping(provider, [probe]) / cancel(provider, marker) / shutdown()
+
+Usage: ccb daemon start|stop|status  (or python lib/ccb_daemon.py --work-dir DIR)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from bridge_protocol import BridgeBackpressureError, RequestCancelledError, RequestFramer, encode_request
+from daemon_client import DaemonClient, daemon_supported, socket_path
+from session_utils import session_file_path
+
+PROVIDERS = ("codex", "gemini")
+DEFAULT_IDLE_TIMEOUT = 1800.0
+DEFAULT_WAIT_TIMEOUT = 3600.0
+# Waits nobody collects are dropped this long after their ask's timeout.
+INFLIGHT_GRACE = 300.0
+
+# JSON-RPC error codes (-32000..-32099 are implementation-defined)
+ERR_PARSE = -32700
+ERR_METHOD = -32601
+ERR_PARAMS = -32602
+ERR_INTERNAL = -32603
+ERR_SESSION = -32000
+ERR_BACKPRESSURE = -32001
+ERR_UNKNOWN_MARKER = -32002
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return max(0.0, value)
+
+
+class RpcError(RuntimeError):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "RpcServer"
+
+    def handle(self) -> None:
+        framer = RequestFramer()
+        while True:
+            try:
+                data = self.request.recv(65536)
+            except OSError:
+                return
+            if not data:
+                return
+            for frame in framer.feed(data):
+                response = self.server.handle_rpc(frame)
+                try:
+                    self.request.sendall(encode_request(response))
+                except OSError:
+                    return
+            if framer.malformed or framer.oversized:
+                framer.malformed = framer.oversized = 0
+                self.request.sendall(encode_request(_error(None, ERR_PARSE, "Malformed or oversized request")))
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class RpcServer(socketserver.ThreadingUnixStreamServer):
+    """Newline-framed JSON-RPC 2.0 on a Unix socket; method "x" is served by rpc_x(**params)"""
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, running_message: str):
+        self.path = Path(path)
+        self._last_request = time.time()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            if DaemonClient(path=self.path).alive():
+                raise RuntimeError(running_message)
+            self.path.unlink()
+        super().__init__(str(self.path), _Handler)
+        os.chmod(self.path, 0o600)
+
+    def handle_rpc(self, frame: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = frame.get("id")
+        method = frame.get("method")
+        params = frame.get("params") or {}
+        self._last_request = time.time()
+        if not isinstance(params, dict):
+            return _error(request_id, ERR_PARAMS, "params must be an object")
+        handler = getattr(self, f"rpc_{method}", None) if isinstance(method, str) else None
+        if handler is None:
+            return _error(request_id, ERR_METHOD, f"Unknown method: {method}")
+        try:
+            result = handler(**params)
+        except RpcError as exc:
+            return _error(request_id, exc.code, str(exc))
+        except BridgeBackpressureError as exc:
+            return _error(request_id, ERR_BACKPRESSURE, str(exc))
+        except TypeError as exc:
+            return _error(request_id, ERR_PARAMS, str(exc))
+        except Exception as exc:
+            return _error(request_id, ERR_INTERNAL, str(exc))
+        finally:
+            self._last_request = time.time()
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def rpc_shutdown(self) -> Dict[str, Any]:
+        threading.Thread(target=self.shutdown, daemon=True).start()
+        return {"stopping": True}
+
+    def serve(self) -> None:
+        pid_file = self.path.with_suffix(".pid")
+        pid_file.write_text(str(os.getpid()), encoding="utf-8")
+        try:
+            self.serve_forever(poll_interval=1.0)
+        finally:
+            self.server_close()
+            self.path.unlink(missing_ok=True)
+            pid_file.unlink(missing_ok=True)
+
+
+class CcbDaemon(RpcServer):
+    """Serves one project's provider sessions; exits after CCB_DAEMON_IDLE_TIMEOUT without requests"""
+
+    def __init__(self, work_dir: Path, path: Optional[Path] = None, idle_timeout: Optional[float] = None):
+        self.work_dir = Path(work_dir).resolve()
+        self.idle_timeout = (idle_timeout if idle_timeout is not None
+                             else _env_float("CCB_DAEMON_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+        self._lock = threading.Lock()
+        self._comms: Dict[str, Tuple[Any, Any]] = {}
+        self._inflight: Dict[str, Dict[str, Any]] = {}
+        super().__init__(Path(path) if path else socket_path(self.work_dir),
+                         f"A ccb daemon is already serving {self.work_dir}")
+
+    # ---- communicators ----
+
+    def _session_key(self, provider: str) -> Any:
+        """Identity of the provider session; the cached communicator is rebuilt when it changes"""
+        remote = os.environ.get(f"CCB_{provider.upper()}_REMOTE")
+        if remote or os.environ.get(f"{provider.upper()}_SESSION_ID"):
+            return remote or os.environ.get(f"{provider.upper()}_SESSION_ID")
+        try:
+            data = json.loads(session_file_path(provider, self.work_dir).read_text(encoding="utf-8-sig"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+        return (data.get("session_id"), data.get("runtime_dir"), data.get("active"))
+
+    def communicator(self, provider: str) -> Any:
+        if provider not in PROVIDERS:
+            raise RpcError(ERR_PARAMS, f"Unknown provider: {provider}")
+        key = self._session_key(provider)
+        with self._lock:
+            cached = self._comms.get(provider)
+            if cached and cached[0] == key:
+                return cached[1]
+            try:
+                if provider == "codex":
+                    from codex_comm import CodexCommunicator
+                    comm = CodexCommunicator(lazy_init=True)
+                else:
+                    from gemini_comm import GeminiCommunicator
+                    comm = GeminiCommunicator(lazy_init=True)
+            except RuntimeError as exc:
+                raise RpcError(ERR_SESSION, str(exc))
+            self._comms[provider] = (key, comm)
+            return comm
+
+    # ---- dispatch ----
+
+    def rpc_ping(self, provider: str, probe: bool = True) -> Dict[str, Any]:
+        healthy, status = self.communicator(provider)._check_session_health_impl(probe_terminal=probe)
+        return {"healthy": healthy, "status": status}
+
+    def rpc_status(self, provider: str) -> Dict[str, Any]:
+        return self.communicator(provider).get_status()
+
+    def rpc_turn(self, provider: str) -> Dict[str, Any]:
+        comm = self.communicator(provider)
+        if not hasattr(comm, "turn_status"):
+            return {"source": "daemon", "turn": "unknown"}
+        return comm.turn_status()
+
+    def rpc_pending(self, provider: str, n: int = 1) -> Dict[str, Any]:
+        result = self.communicator(provider).consume_pending(display=False, n=max(1, int(n)))
+        if isinstance(result, list):
+            return {"conversations": [list(pair) for pair in result]}
+        return {"reply": result}
+
+    def rpc_cancel(self, provider: str, marker: str) -> Dict[str, Any]:
+        return {"interrupted": bool(self.communicator(provider).cancel(marker))}
+
+    def rpc_ask(self, provider: str, content: str, coalesce: Optional[bool] = None,
+                deadline: Optional[float] = None, priority: Optional[str] = None,
+                timeout: Optional[float] = None) -> Dict[str, Any]:
+        comm = self.communicator(provider)
+        if provider == "codex":
+            marker, state = comm._send_message(content, coalesce=coalesce, deadline=deadline, priority=priority)
+        else:
+            marker, state = comm._send_message(content, deadline=deadline)
+        expires = time.time() + float(timeout or DEFAULT_WAIT_TIMEOUT) + INFLIGHT_GRACE
+        with self._lock:
+            self._prune_inflight()
+            self._inflight[marker] = {"provider": provider, "state": state, "expires": expires}
+        return {"marker": marker}
+
+    def rpc_wait(self, marker: str, timeout: float = DEFAULT_WAIT_TIMEOUT) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._inflight.get(marker)
+        if entry is None:
+            raise RpcError(ERR_UNKNOWN_MARKER, f"No pending ask with marker {marker}")
+        comm = self.communicator(entry["provider"])
+        try:
+            reply, state = comm.wait_for_reply(marker, entry["state"], float(timeout))
+        except RequestCancelledError:
+            with self._lock:
+                self._inflight.pop(marker, None)
+            return {"status": "cancelled", "reply": None}
+        with self._lock:
+            if reply:
+                self._inflight.pop(marker, None)
+            else:
+                # Timed out: keep the read position so the caller can wait again.
+                entry["state"] = state
+        return {"status": "ok" if reply else "timeout", "reply": reply}
+
+    def rpc_info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "work_dir": str(self.work_dir),
+                "socket": str(self.path),
+                "providers": sorted(self._comms),
+                "inflight": len(self._inflight),
+                "idle_s": round(time.time() - self._last_request, 1),
+            }
+
+    def _prune_inflight(self) -> None:
+        now = time.time()
+        for marker in [m for m, entry in self._inflight.items() if entry["expires"] < now]:
+            del self._inflight[marker]
+
+    # ---- lifecycle ----
+
+    def service_actions(self) -> None:
+        if not self.idle_timeout:
+            return
+        with self._lock:
+            busy = bool(self._inflight)
+        if not busy and time.time() - self._last_request > self.idle_timeout:
+            threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-project ccb daemon")
+    parser.add_argument("--work-dir", default=None, help="Project directory (default: cwd)")
+    parser.add_argument("--idle-timeout", type=float, default=None,
+                        help="Exit after this many idle seconds (default CCB_DAEMON_IDLE_TIMEOUT, 0 = never)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = parse_args(argv)
+    if not daemon_supported():
+        print("❌ ccb daemon needs Unix domain sockets", file=sys.stderr)
+        return 1
+    work_dir = Path(args.work_dir).expanduser() if args.work_dir else Path.cwd()
+    # Communicators resolve .codex-session/.gemini-session (or the CCB_INSTANCE ones) relative to cwd.
+    os.chdir(work_dir)
+    try:
+        server = CcbDaemon(work_dir, idle_timeout=args.idle_timeout)
+    except Exception as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 1
+    print(f"🔌 ccb daemon serving {server.work_dir} on {server.path}", flush=True)
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    print("👋 ccb daemon exited", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import os
-import tempfile
 from pathlib import Path
 from typing import Optional
 
@@ -9,6 +8,8 @@ from typing import Optional
 EXIT_OK = 0
 EXIT_ERROR = 1
 EXIT_NO_REPLY = 2
+EXIT_BACKPRESSURE = 3
+EXIT_CANCELLED = 4
 
 
 def atomic_write_text(path: Path, content: str, *, encoding: str = "utf-8") -> None:
@@ -17,6 +18,9 @@ def atomic_write_text(path: Path, content: str, *, encoding: str = "utf-8") -> N
 
     fd: Optional[int] = None
     tmp_path: Optional[str] = None
+    # tempfile is imported here: it costs more at startup than every other cli_output import.
+    import tempfile
+
     try:
         fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
         with os.fdopen(fd, "w", encoding=encoding, newline="\n") as handle:
@@ -40,3 +44,21 @@ def atomic_write_text(path: Path, content: str, *, encoding: str = "utf-8") -> N
 def normalize_message_parts(parts: list[str]) -> str:
     return " ".join(parts).strip()
 
+
+def print_pending(result: str | list[tuple[str, str]] | None, provider: str) -> str | list[tuple[str, str]] | None:
+    """Show what consume_pending() found: a reply, or (question, reply) pairs separated by ---"""
+    if not result:
+        from i18n import t
+
+        print(t("no_reply_available", provider=provider))
+        return None
+    if isinstance(result, list):
+        for i, (question, reply) in enumerate(result):
+            if question:
+                print(f"Q: {question}")
+            print(f"A: {reply}")
+            if i < len(result) - 1:
+                print("---")
+    else:
+        print(result)
+    return result
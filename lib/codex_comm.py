@@ -6,38 +6,83 @@ Sends requests via FIFO and parses replies from ~/.codex/sessions logs.
 
 from __future__ import annotations
 
+import itertools
 import json
 import os
 import re
 import sys
 import time
-import shlex
-from datetime import datetime
 from pathlib import Path
 from typing import Optional, Tuple, Dict, Any, List
 
-from terminal import get_backend_for_session, get_pane_id_from_session
+from bridge_protocol import (
+    MissingSectionError,
+    RequestCancelledError,
+    cancel_poll_interval,
+    clear_cancel,
+    coalesce_enabled,
+    default_priority,
+    discard_coalesce_record,
+    is_cancelled,
+    is_batch_reply,
+    is_coalesced_reply,
+    missing_section_message,
+    read_bridge_state,
+    read_coalesce_record,
+    request_cancel,
+    spool_depth,
+    split_coalesced_reply,
+    submit_request,
+    take_reply_record,
+)
 from ccb_config import apply_backend_env
+from cli_output import print_pending
 from i18n import t
 
-apply_backend_env()
 
-SESSION_ROOT = Path(os.environ.get("CODEX_SESSION_ROOT") or (Path.home() / ".codex" / "sessions")).expanduser()
+def session_root() -> Path:
+    """Codex log root; resolved on first use so importing this module never probes WSL"""
+    apply_backend_env()
+    return Path(os.environ.get("CODEX_SESSION_ROOT") or (Path.home() / ".codex" / "sessions")).expanduser()
+
+
+def __getattr__(name: str) -> Any:
+    if name == "SESSION_ROOT":
+        return session_root()
+    raise AttributeError(name)
+
+
+_MARKER_SEQ = itertools.count(1)
+# Longest wait on a supervisor change notice before the reader looks at its log itself again
+WATCH_SLICE = 2.0
+# Footer hints the Codex TUI shows once it takes input (`ccb up` readiness); CODEX_READY_PATTERN overrides
+DEFAULT_READY_PATTERN = r"\? for shortcuts|context left|⏎ send"
 SESSION_ID_PATTERN = re.compile(
     r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
     re.IGNORECASE,
 )
 
 
+def _env_sync_timeout() -> float:
+    try:
+        return float(os.environ.get("CCB_SYNC_TIMEOUT", "3600.0"))
+    except ValueError:
+        return 3600.0
+
+
 class CodexLogReader:
     """Reads Codex official logs from ~/.codex/sessions"""
 
-    def __init__(self, root: Path = SESSION_ROOT, log_path: Optional[Path] = None,
+    def __init__(self, root: Optional[Path] = None, log_path: Optional[Path] = None,
                  session_id_filter: Optional[str] = None, work_dir: Optional[Path] = None):
-        self.root = Path(root).expanduser()
+        self.root = Path(root).expanduser() if root else session_root()
         self._preferred_log = self._normalize_path(log_path)
         self._session_id_filter = session_id_filter
         self._work_dir = self._normalize_work_dir(work_dir)
+        # Pinned readers (pool workers sharing a work dir) never switch to another log on their own.
+        self.pinned = False
+        # This project's change counter at the log supervisor (see _wait_for_change)
+        self._log_version: Optional[int] = None
         try:
             poll = float(os.environ.get("CODEX_POLL_INTERVAL", "0.05"))
         except Exception:
@@ -82,7 +127,18 @@ class CodexLogReader:
         except TypeError:
             return None
 
+    def _supervised(self, method: str, **params: Any) -> Optional[Dict[str, Any]]:
+        """The log supervisor's answer for this work dir (lib/log_supervisor.py); None: scan on our own"""
+        if not self._work_dir:
+            return None
+        from daemon_client import supervisor_call
+
+        return supervisor_call(method, provider="codex", root=str(self.root), key=self._work_dir, **params)
+
     def _scan_latest(self) -> Optional[Path]:
+        indexed = self._supervised("latest")
+        if indexed is not None:
+            return Path(indexed["path"]) if indexed.get("path") else None
         if not self.root.exists():
             return None
         try:
@@ -106,8 +162,28 @@ class CodexLogReader:
 
         return latest
 
+    def recent_logs(self, since: float) -> List[Path]:
+        """Logs of this work dir modified since `since`, newest first"""
+        indexed = self._supervised("recent", since=since)
+        if indexed is not None:
+            return [Path(p) for p in indexed.get("paths") or []]
+        found = []
+        try:
+            for p in self.root.glob("**/*.jsonl"):
+                try:
+                    mtime = p.stat().st_mtime
+                except OSError:
+                    continue
+                if mtime >= since and (not self._work_dir or self._extract_cwd_from_log(p) == self._work_dir):
+                    found.append((mtime, p))
+        except OSError:
+            return []
+        return [p for _, p in sorted(found, reverse=True)]
+
     def _latest_log(self) -> Optional[Path]:
         preferred = self._preferred_log
+        if self.pinned:
+            return preferred if preferred and preferred.exists() else None
         # Always scan for latest to detect if preferred is stale
         latest = self._scan_latest()
         if latest:
@@ -148,9 +224,9 @@ class CodexLogReader:
         """Block and wait for new reply"""
         return self._read_since(state, timeout, block=True)
 
-    def try_get_message(self, state: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Non-blocking read for reply"""
-        return self._read_since(state, timeout=0.0, block=False)
+    def try_get_message(self, state: Dict[str, Any], rescan: bool = False) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Non-blocking read for reply; `rescan` also checks for a newer session log"""
+        return self._read_since(state, timeout=0.0, block=False, rescan=rescan)
 
     def latest_message(self) -> Optional[str]:
         """Get the latest reply directly"""
@@ -187,7 +263,95 @@ class CodexLogReader:
                 return message
         return None
 
-    def _read_since(self, state: Dict[str, Any], timeout: float, block: bool) -> Tuple[Optional[str], Dict[str, Any]]:
+    def read_entries(self, state: Dict[str, Any], rescan: bool = False) -> Tuple[List[dict], Dict[str, Any]]:
+        """Non-blocking: every complete log entry appended since `state`, plus the advanced state"""
+        log_path = self._normalize_path(state.get("log_path"))
+        offset = state.get("offset", -1)
+        if not isinstance(offset, int):
+            offset = -1
+        if rescan or not log_path or not log_path.exists():
+            latest = self._latest_log()
+            if latest and latest != log_path:
+                # A log that appeared after we started is read from the beginning.
+                if log_path is not None or offset >= 0:
+                    offset = 0
+                log_path = latest
+        if not log_path or not log_path.exists():
+            return [], {"log_path": None, "offset": 0}
+
+        entries: List[dict] = []
+        try:
+            size = log_path.stat().st_size
+            if offset < 0 or offset > size:
+                offset = size
+            with log_path.open("rb") as fh:
+                fh.seek(offset, os.SEEK_SET)
+                while True:
+                    raw_line = fh.readline()
+                    # A line without newline may still be being written; pick it up next time.
+                    if not raw_line or not raw_line.endswith(b"\n"):
+                        break
+                    offset += len(raw_line)
+                    line = raw_line.decode("utf-8", errors="ignore").strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(entry, dict):
+                        entries.append(entry)
+        except OSError:
+            pass
+        return entries, {"log_path": log_path, "offset": offset}
+
+    def latest_turn_state(self) -> Optional[str]:
+        """'busy' / 'idle' derived from the log tail, None if it cannot be determined"""
+        log_path = self._latest_log()
+        if not log_path or not log_path.exists():
+            return None
+        try:
+            with log_path.open("rb") as handle:
+                handle.seek(0, os.SEEK_END)
+                position = handle.tell()
+                start = max(0, position - 1024 * 256)
+                handle.seek(start)
+                lines = handle.read(position - start).decode("utf-8", errors="ignore").splitlines()
+        except OSError:
+            return None
+
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict):
+                entries.append(entry)
+        explicit_end = any(self.extract_turn_event(entry) == "end" for entry in entries)
+        for entry in reversed(entries):
+            event = self.extract_turn_event(entry)
+            if event:
+                return "busy" if event == "start" else "idle"
+            # Logs without turn-complete events: the assistant reply ends the turn.
+            if not explicit_end and self._extract_message(entry):
+                return "idle"
+        return None
+
+    @staticmethod
+    def extract_turn_event(entry: dict) -> Optional[str]:
+        """'start' / 'end' for turn boundary events in the rollout log, None otherwise"""
+        if entry.get("type") != "event_msg":
+            return None
+        kind = (entry.get("payload") or {}).get("type")
+        if kind in ("user_message", "task_started"):
+            return "start"
+        if kind in ("task_complete", "turn_complete", "turn_aborted"):
+            return "end"
+        return None
+
+    def _read_since(self, state: Dict[str, Any], timeout: float, block: bool,
+                    rescan: bool = False) -> Tuple[Optional[str], Dict[str, Any]]:
         deadline = time.time() + timeout
         current_path = self._normalize_path(state.get("log_path"))
         offset = state.get("offset", -1)
@@ -195,7 +359,7 @@ class CodexLogReader:
             offset = -1
         # Keep rescans infrequent; new messages usually append to the same log file.
         rescan_interval = min(2.0, max(0.2, timeout / 2.0))
-        last_rescan = time.time()
+        last_rescan = 0.0 if rescan else time.time()
 
         def ensure_log() -> Path:
             candidates = [
@@ -205,7 +369,7 @@ class CodexLogReader:
             for candidate in candidates:
                 if candidate:
                     return candidate
-            latest = self._scan_latest()
+            latest = None if self.pinned else self._scan_latest()
             if latest:
                 self._preferred_log = latest
                 return latest
@@ -283,10 +447,21 @@ class CodexLogReader:
             if not block:
                 return None, {"log_path": log_path, "offset": offset}
 
-            time.sleep(self._poll_interval)
+            self._wait_for_change(deadline)
             if time.time() >= deadline:
                 return None, {"log_path": log_path, "offset": offset}
 
+    def _wait_for_change(self, deadline: float) -> None:
+        """Sleep until this project's logs may have changed: the supervisor's notice, else one poll interval"""
+        remaining = min(WATCH_SLICE, deadline - time.time())
+        if remaining > 0:
+            indexed = self._supervised("watch", version=self._log_version, timeout=remaining,
+                                       call_timeout=remaining + 5.0)
+            if indexed is not None:
+                self._log_version = indexed.get("version")
+                return
+        time.sleep(self._poll_interval)
+
     @staticmethod
     def _extract_message(entry: dict) -> Optional[str]:
         if entry.get("type") != "response_item":
@@ -379,8 +554,19 @@ class CodexCommunicator:
         self.runtime_dir = Path(self.session_info["runtime_dir"])
         self.input_fifo = Path(self.session_info["input_fifo"])
         self.terminal = self.session_info.get("terminal", os.environ.get("CODEX_TERMINAL", "tmux"))
-        self.pane_id = get_pane_id_from_session(self.session_info) or ""
-        self.backend = get_backend_for_session(self.session_info)
+        # `ccb up codex:N`: asks go to the least-loaded worker; the first worker's runtime dir is shared.
+        self.workers: List[Dict[str, Any]] = []
+        if self.session_info.get("pool"):
+            from worker_pool import pool_workers
+
+            self.workers = pool_workers(self.session_info)
+        self._pane_id: Optional[str] = None
+        self._backend = None
+        # Remote mode (CCB_CODEX_REMOTE): everything goes through the remote bridge, no local logs.
+        self.remote = None
+        if self.session_info.get("remote"):
+            from remote_bridge import RemoteBridgeClient
+            self.remote = RemoteBridgeClient(self.session_info["remote"])
 
         self.timeout = int(os.environ.get("CODEX_SYNC_TIMEOUT", "30"))
         self.marker_prefix = "ask"
@@ -391,11 +577,27 @@ class CodexCommunicator:
         self._log_reader_primed = False
 
         if not lazy_init:
-            self._ensure_log_reader()
+            if not self.remote:
+                self._ensure_log_reader()
             healthy, msg = self._check_session_health()
             if not healthy:
                 raise RuntimeError(f"❌ Session unhealthy: {msg}\nTip: Run 'ccb up codex' to start a new session")
 
+    @property
+    def pane_id(self) -> str:
+        """Session pane, resolved on first use: importing terminal is the slowest part of startup"""
+        if self._pane_id is None:
+            from terminal import get_pane_id_from_session
+            self._pane_id = get_pane_id_from_session(self.session_info) or ""
+        return self._pane_id
+
+    @property
+    def backend(self):
+        if self._backend is None and not self.remote:
+            from terminal import get_backend_for_session
+            self._backend = get_backend_for_session(self.session_info)
+        return self._backend
+
     @property
     def log_reader(self) -> CodexLogReader:
         """Lazy-load log reader on first access"""
@@ -409,14 +611,42 @@ class CodexCommunicator:
             return
         preferred_log = self.session_info.get("codex_session_path")
         bound_session_id = self.session_info.get("codex_session_id")
-        self._log_reader = CodexLogReader(log_path=preferred_log, session_id_filter=bound_session_id)
+        work_dir = self.session_info.get("work_dir")
+        from session_utils import instance_name
+
+        pinned = bool(instance_name()) and not self.remote
+        if pinned:
+            from worker_pool import bound_log
+
+            # A named instance reads only the log its bridge bound (see worker_pool.bind_log), never
+            # the newest log of the work dir, which may belong to another instance.
+            preferred_log = bound_log(self.runtime_dir) or preferred_log
+        self._log_reader = CodexLogReader(log_path=preferred_log, session_id_filter=bound_session_id,
+                                          work_dir=Path(work_dir) if work_dir else None)
+        self._log_reader.pinned = pinned
         if not self._log_reader_primed:
             self._prime_log_binding()
             self._log_reader_primed = True
 
     def _load_session_info(self):
+        remote = (os.environ.get("CCB_CODEX_REMOTE") or "").strip()
+        if remote:
+            return {
+                "session_id": f"remote:{remote}",
+                "runtime_dir": "",
+                "input_fifo": "",
+                "terminal": "remote",
+                "remote": remote,
+                "_session_file": None,
+            }
+
         if "CODEX_SESSION_ID" in os.environ:
             terminal = os.environ.get("CODEX_TERMINAL", "tmux")
+            pool = None
+            if os.environ.get("CODEX_POOL"):
+                from worker_pool import pool_from_env
+
+                pool = pool_from_env("CODEX")
             # Get pane_id based on terminal type
             if terminal == "wezterm":
                 pane_id = os.environ.get("CODEX_WEZTERM_PANE", "")
@@ -432,10 +662,14 @@ class CodexCommunicator:
                 "terminal": terminal,
                 "tmux_session": os.environ.get("CODEX_TMUX_SESSION", ""),
                 "pane_id": pane_id,
+                "work_dir": os.environ.get("CODEX_WORK_DIR", ""),
+                "pool": pool,
                 "_session_file": None,
             }
 
-        project_session = Path.cwd() / ".codex-session"
+        from session_utils import session_file_path
+
+        project_session = session_file_path("codex")
         if not project_session.exists():
             return None
 
@@ -470,6 +704,8 @@ class CodexCommunicator:
         return self._check_session_health_impl(probe_terminal=True)
 
     def _check_session_health_impl(self, probe_terminal: bool):
+        if self.remote:
+            return self.remote.health(probe=probe_terminal)
         try:
             if not self.runtime_dir.exists():
                 return False, "Runtime directory does not exist"
@@ -483,8 +719,21 @@ class CodexCommunicator:
                     return False, f"{self.terminal} pane does not exist: {self.pane_id}"
                 return True, "Session healthy"
 
-            # tmux mode: relies on wrapper to write codex.pid and FIFO
-            codex_pid_file = self.runtime_dir / "codex.pid"
+            if self.workers:
+                up = sum(1 for w in self.workers
+                         if self._check_worker(Path(w["runtime_dir"]), Path(w["input_fifo"]))[0])
+                if not up:
+                    return False, f"No healthy worker in the pool (0/{len(self.workers)})"
+                return True, f"Session healthy (pool: {up}/{len(self.workers)} workers up)"
+            return self._check_worker(self.runtime_dir, self.input_fifo)
+        except Exception as exc:
+            return False, f"Health check failed: {exc}"
+
+    @staticmethod
+    def _check_worker(runtime_dir: Path, input_fifo: Path) -> Tuple[bool, str]:
+        """tmux mode: the wrapper writes codex.pid, the bridge bridge.pid and the FIFO"""
+        try:
+            codex_pid_file = runtime_dir / "codex.pid"
             if not codex_pid_file.exists():
                 return False, "Codex process PID file not found"
 
@@ -495,7 +744,7 @@ class CodexCommunicator:
             except OSError:
                 return False, f"Codex process (PID:{codex_pid}) has exited"
 
-            bridge_pid_file = self.runtime_dir / "bridge.pid"
+            bridge_pid_file = runtime_dir / "bridge.pid"
             if not bridge_pid_file.exists():
                 return False, "Bridge process PID file not found"
             try:
@@ -508,25 +757,70 @@ class CodexCommunicator:
             except OSError:
                 return False, f"Bridge process (PID:{bridge_pid}) has exited"
 
-            if not self.input_fifo.exists():
+            if not input_fifo.exists():
                 return False, "Communication pipe does not exist"
 
             return True, "Session healthy"
         except Exception as exc:
             return False, f"Health check failed: {exc}"
 
+    def readiness(self, since: float) -> Optional[str]:
+        """How the Codex CLI showed it takes input (for `ccb up`); None while it is still starting"""
+        if self.remote:
+            return "remote bridge" if self.remote.health(probe=True)[0] else None
+        if not self._check_session_health_impl(probe_terminal=False)[0]:
+            return None
+        from terminal import get_pane_id_from_session
+
+        panes = [get_pane_id_from_session(w) for w in self.workers] if self.workers else [self.pane_id]
+        # A bare reader: the communicator's own one would bind an older log of the project.
+        work_dir = self.session_info.get("work_dir")
+        reader = CodexLogReader(work_dir=Path(work_dir) if work_dir else None)
+        if len(reader.recent_logs(since)) >= len(panes):
+            return "session_meta"
+        pattern = re.compile(os.environ.get("CODEX_READY_PATTERN") or DEFAULT_READY_PATTERN)
+        if self.backend and all(p and pattern.search(self.backend.get_text(p)) for p in panes):
+            return "idle prompt"
+        return None
+
+    def _worker_load(self, worker: Dict[str, Any]) -> Optional[float]:
+        """Running turn plus queued asks of a pool worker's bridge; None if the worker is down"""
+        runtime_dir, input_fifo = Path(worker["runtime_dir"]), Path(worker["input_fifo"])
+        if not self._check_worker(runtime_dir, input_fifo)[0]:
+            return None
+        state = read_bridge_state(runtime_dir) or {}
+        return ((1 if state.get("turn") == "busy" else 0) + int(state.get("queue_depth") or 0)
+                + int(state.get("spool_depth") or 0))
+
     def _send_via_terminal(self, content: str) -> None:
         if not self.backend or not self.pane_id:
             raise RuntimeError("Terminal session not configured")
         self.backend.send_text(self.pane_id, content)
 
-    def _send_message(self, content: str) -> Tuple[str, Dict[str, Any]]:
+    def _send_message(self, content: str, coalesce: Optional[bool] = None,
+                      deadline: Optional[float] = None, priority: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+        from datetime import datetime
+
         marker = self._generate_marker()
         message = {
             "content": content,
             "timestamp": datetime.now().isoformat(),
             "marker": marker,
+            "priority": priority or default_priority(),
         }
+        # The bridge drops the request unsent if it is still queued when the caller gives up.
+        if deadline:
+            message["deadline"] = deadline
+        # Opt-in: the bridge may merge this with other small queued asks into one Codex turn.
+        if coalesce if coalesce is not None else coalesce_enabled():
+            message["coalesce"] = True
+
+        if self.remote:
+            # The remote bridge assigns the marker; its log tailer streams the reply back.
+            timeout = deadline - time.time() if deadline else _env_sync_timeout()
+            ask = self.remote.ask(content, timeout=timeout, deadline=deadline,
+                                  priority=message["priority"], coalesce=message.get("coalesce"))
+            return ask.marker, {"remote_ask": ask}
 
         state = self.log_reader.capture_state()
 
@@ -534,14 +828,117 @@ class CodexCommunicator:
         if self.terminal in ("wezterm", "iterm2"):
             self._send_via_terminal(content)
         else:
-            with open(self.input_fifo, "w", encoding="utf-8") as fifo:
-                fifo.write(json.dumps(message, ensure_ascii=False) + "\n")
-                fifo.flush()
+            # Non-blocking with a deadline; falls back to the on-disk spool if the bridge isn't reading.
+            # Raises BridgeBackpressureError when the bridge queue/spool is full.
+            runtime_dir, input_fifo = self.runtime_dir, self.input_fifo
+            if self.workers:
+                from worker_pool import pick_worker
+
+                worker = pick_worker(self.workers, self._worker_load)
+                if worker is None:
+                    raise RuntimeError("No healthy Codex worker in the pool")
+                runtime_dir, input_fifo = Path(worker["runtime_dir"]), Path(worker["input_fifo"])
+            result = submit_request(runtime_dir, input_fifo, message)
+            if result == "spooled":
+                print("📥 Codex bridge not reading, request spooled (will be delivered when it resumes)",
+                      file=sys.stderr)
 
         return marker, state
 
+    def wait_for_reply(self, marker: str, state: Dict[str, Any], timeout: float) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Wait for the reply to `marker`; for a coalesced ask, return only this caller's section.
+        With a turn-aware bridge the reply is the one it filed under `marker`; otherwise it is the
+        first reply logged after `state`. Raises RequestCancelledError if the request is cancelled,
+        MissingSectionError if its coalesced turn answered without this ask's section.
+        """
+        if self.remote:
+            from remote_bridge import wait_remote_reply
+            return wait_remote_reply(state, timeout), state
+        deadline = time.time() + timeout
+        while True:
+            if is_cancelled(self.runtime_dir, marker):
+                clear_cancel(self.runtime_dir, marker)
+                raise RequestCancelledError(f"Request {marker} was cancelled")
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None, state
+            step = min(remaining, cancel_poll_interval())
+            if self.correlated():
+                reply = self._wait_reply_record(marker, step)
+                if reply:
+                    return reply, state
+                continue
+            reply, state = self.log_reader.wait_for_message(state, step)
+            if not reply:
+                continue
+            reply = self._match_reply(marker, reply)
+            if reply is not None:
+                return reply, state
+
+    def correlated(self) -> bool:
+        """Whether a turn-aware bridge files replies under their markers (asks typed through the FIFO)"""
+        if self.remote or self.terminal in ("wezterm", "iterm2"):
+            return False
+        runtime_dirs = [Path(w["runtime_dir"]) for w in self.workers] or [self.runtime_dir]
+        return any((read_bridge_state(d) or {}).get("ledger") for d in runtime_dirs)
+
+    def take_reply(self, marker: str) -> Optional[str]:
+        """Non-blocking: the reply the bridge filed for `marker`, if it has arrived"""
+        record = take_reply_record(self.runtime_dir, marker)
+        if record is None:
+            return None
+        discard_coalesce_record(self.runtime_dir, marker)
+        if record.get("error"):
+            raise MissingSectionError(str(record["error"]))
+        return str(record.get("reply") or "")
+
+    def _wait_reply_record(self, marker: str, timeout: float) -> Optional[str]:
+        deadline = time.time() + timeout
+        while True:
+            reply = self.take_reply(marker)
+            if reply is not None or time.time() >= deadline:
+                return reply
+            time.sleep(self.log_reader._poll_interval)
+
+    def _match_reply(self, marker: str, reply: str) -> Optional[str]:
+        """`marker`'s answer within a logged reply, None if the reply belongs to other asks"""
+        record = read_coalesce_record(self.runtime_dir, marker)
+        if record is None:
+            # A combined answer to a batch this ask was not part of.
+            return None if is_coalesced_reply(reply) else reply
+        batch, index = str(record.get("batch") or ""), int(record.get("index") or 0)
+        if not is_batch_reply(reply, batch):
+            # Another batch's combined answer (or a plain reply) logged before ours.
+            return None
+        section = split_coalesced_reply(reply, index, batch)
+        discard_coalesce_record(self.runtime_dir, marker)
+        if section is None:
+            raise MissingSectionError(missing_section_message(batch, index))
+        return section
+
+    def cancel(self, marker: str) -> bool:
+        """
+        Cancel a request: the bridge drops it if still queued, or interrupts Codex if it is the
+        running turn; its waiter is released. Returns True if Codex is being interrupted.
+        Without a turn-aware bridge (WezTerm/iTerm2 mode) nothing ties the running turn to a
+        marker, so only the waiter is released and Codex is left to finish.
+        """
+        if self.remote:
+            return self.remote.cancel(marker)
+        request_cancel(self.runtime_dir, marker)
+        if self.workers:
+            # Every worker's bridge sees the cancel in the shared dir; report whether one is running it.
+            return any((read_bridge_state(Path(w["runtime_dir"])) or {}).get("inflight") == marker
+                       for w in self.workers)
+        bridge_state = read_bridge_state(self.runtime_dir)
+        if bridge_state and bridge_state.get("turn"):
+            return bridge_state.get("inflight") == marker
+        return False
+
     def _generate_marker(self) -> str:
-        return f"{self.marker_prefix}-{int(time.time())}-{os.getpid()}"
+        # The sequence keeps markers distinct when one process (daemon, remote bridge) sends many asks.
+        return f"{self.marker_prefix}-{int(time.time())}-{os.getpid()}-{next(_MARKER_SEQ)}"
 
     def ask_async(self, question: str) -> bool:
         try:
@@ -550,8 +947,9 @@ class CodexCommunicator:
                 raise RuntimeError(f"❌ Session error: {status}")
 
             marker, state = self._send_message(question)
-            log_hint = state.get("log_path") or self.log_reader.current_log_path()
-            self._remember_codex_session(log_hint)
+            if not self.remote:
+                log_hint = state.get("log_path") or self.log_reader.current_log_path()
+                self._remember_codex_session(log_hint)
             print(f"✅ Sent to Codex (marker: {marker[:12]}...)")
             print("Tip: Use /cpend to view latest reply")
             return True
@@ -568,6 +966,15 @@ class CodexCommunicator:
             print(f"🔔 {t('sending_to', provider='Codex')}", flush=True)
             marker, state = self._send_message(question)
             wait_timeout = self.timeout if timeout is None else int(timeout)
+            if self.remote:
+                print(f"⏳ {t('waiting_for_reply', provider='Codex')}", flush=True)
+                message, _ = self.wait_for_reply(marker, state, float(wait_timeout or _env_sync_timeout()))
+                if message:
+                    print(f"🤖 {t('reply_from', provider='Codex')}")
+                    print(message)
+                    return message
+                print(f"⏰ {t('timeout_no_reply', provider='Codex')}")
+                return None
             if wait_timeout == 0:
                 print(f"⏳ {t('waiting_for_reply', provider='Codex')}", flush=True)
                 start_time = time.time()
@@ -606,34 +1013,20 @@ class CodexCommunicator:
             return None
 
     def consume_pending(self, display: bool = True, n: int = 1):
+        if self.remote:
+            result = self.remote.pending(n) or None
+            return print_pending(result, "Codex") if display else result
         current_path = self.log_reader.current_log_path()
         self._remember_codex_session(current_path)
 
         if n > 1:
-            conversations = self.log_reader.latest_conversations(n)
-            if not conversations:
-                if display:
-                    print(t('no_reply_available', provider='Codex'))
-                return None
-            if display:
-                for i, (question, reply) in enumerate(conversations):
-                    if question:
-                        print(f"Q: {question}")
-                    print(f"A: {reply}")
-                    if i < len(conversations) - 1:
-                        print("---")
-            return conversations
-
-        message = self.log_reader.latest_message()
+            conversations = self.log_reader.latest_conversations(n) or None
+            return print_pending(conversations, "Codex") if display else conversations
+
+        message = self.log_reader.latest_message() or None
         if message:
             self._remember_codex_session(self.log_reader.current_log_path())
-        if not message:
-            if display:
-                print(t('no_reply_available', provider='Codex'))
-            return None
-        if display:
-            print(message)
-        return message
+        return print_pending(message, "Codex") if display else message
 
     def ping(self, display: bool = True) -> Tuple[bool, str]:
         healthy, status = self._check_session_health()
@@ -643,6 +1036,10 @@ class CodexCommunicator:
         return healthy, msg
 
     def get_status(self) -> Dict[str, Any]:
+        if self.remote:
+            info = self.remote.status()
+            info["remote"] = self.remote.address
+            return info
         healthy, status = self._check_session_health()
         info = {
             "session_id": self.session_id,
@@ -657,9 +1054,72 @@ class CodexCommunicator:
             with open(codex_pid_file, "r", encoding="utf-8") as f:
                 info["codex_pid"] = int(f.read().strip())
 
+        bridge_state = read_bridge_state(self.runtime_dir)
+        if bridge_state:
+            info["bridge_queue_depth"] = bridge_state.get("queue_depth", 0)
+            info["bridge_queue_max"] = bridge_state.get("queue_max")
+            info["bridge_spool_depth"] = bridge_state.get("spool_depth", 0)
+            if bridge_state.get("turn"):
+                info["bridge_turn"] = bridge_state.get("turn")
+            if bridge_state.get("lanes"):
+                info["bridge_lanes"] = bridge_state.get("lanes")
+        if self.workers:
+            info["pool"] = [self._worker_status(w) for w in self.workers]
+
         return info
 
+    def _worker_status(self, worker: Dict[str, Any]) -> Dict[str, Any]:
+        runtime_dir = Path(worker["runtime_dir"])
+        healthy, status = self._check_worker(runtime_dir, Path(worker["input_fifo"]))
+        state = read_bridge_state(runtime_dir) or {}
+        return {"name": worker.get("name"), "healthy": healthy, "status": status, "turn": state.get("turn"),
+                "inflight": state.get("inflight"), "queue_depth": state.get("queue_depth", 0)}
+
+    def turn_status(self) -> Dict[str, Any]:
+        """Busy/idle state and queue: from the bridge when it tracks turns, otherwise from the log tail"""
+        if self.remote:
+            return self.remote.turn()
+        if self.workers:
+            workers = [self._worker_status(w) for w in self.workers]
+            up = [w for w in workers if w["healthy"]]
+            return {
+                "source": "pool",
+                "turn": "idle" if any(w["turn"] == "idle" and not w["queue_depth"] for w in up) else "busy",
+                "inflight": next((w["inflight"] for w in up if w["inflight"]), None),
+                "turn_started_at": None,
+                "queue_depth": sum(int(w["queue_depth"] or 0) for w in up),
+                "queued": [],
+                "spool_depth": 0,
+                "lanes": {},
+                "workers": workers,
+            }
+        bridge_state = read_bridge_state(self.runtime_dir)
+        if bridge_state and bridge_state.get("turn") in ("busy", "idle"):
+            return {
+                "source": "bridge",
+                "turn": bridge_state["turn"],
+                "inflight": bridge_state.get("inflight"),
+                "turn_started_at": bridge_state.get("turn_started_at"),
+                "queue_depth": bridge_state.get("queue_depth", 0),
+                "queued": bridge_state.get("queued") or [],
+                "spool_depth": bridge_state.get("spool_depth", 0),
+                "lanes": bridge_state.get("lanes") or {},
+            }
+        return {
+            "source": "log",
+            "turn": self.log_reader.latest_turn_state() or "unknown",
+            "inflight": None,
+            "turn_started_at": None,
+            "queue_depth": 0,
+            "queued": [],
+            "spool_depth": spool_depth(self.runtime_dir),
+            "lanes": {},
+        }
+
     def _remember_codex_session(self, log_path: Optional[Path]) -> None:
+        if self.workers:
+            # Every pool worker's bridge binds its own log (worker_pool.bind_log).
+            return
         if not log_path:
             log_path = self.log_reader.current_log_path()
             if not log_path:
@@ -722,6 +1182,13 @@ class CodexCommunicator:
                 if tmp_file.exists():
                     tmp_file.unlink(missing_ok=True)
 
+        if updated and session_id:
+            from resume_registry import record
+
+            # `ccb up -r` resumes this session without scanning ~/.codex/sessions.
+            work_dir = data.get("work_dir")
+            record(Path(work_dir) if work_dir else None, codex_session_id=session_id, codex_log=path_str)
+
         self.session_info["codex_session_path"] = path_str
         if session_id:
             self.session_info["codex_session_id"] = session_id
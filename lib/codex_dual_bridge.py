@@ -2,20 +2,72 @@
 """
 Codex dual-window bridge
 Sends commands to Codex, supports tmux and WezTerm.
+Requests are dispatched one turn at a time: the next queued request is injected as soon as
+the Codex rollout log shows the previous turn has finished. Small requests flagged "coalesce"
+that are queued together are sent as one prompt with numbered sections. Requests past their
+deadline are dropped unsent; a cancelled in-flight request interrupts the running turn.
+Each turn's reply is filed under the marker of the request whose user message opened it
+(bridge_protocol reply records), so concurrent waiters receive their own answers.
+Interactive and background requests wait in separate lanes (CCB_BRIDGE_LANE_POLICY).
+With --listen / CCB_BRIDGE_LISTEN the bridge also accepts asks over TCP/TLS (lib/remote_bridge.py).
+In a worker pool (CCB_POOL_SHARED_DIR) the bridge follows only its own pane's log and files replies
+in the pool's shared dir (lib/worker_pool.py).
 """
 
 from __future__ import annotations
 
 import argparse
+import errno
 import json
 import os
+import selectors
 import signal
 import time
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
-
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from bridge_protocol import (
+    PRIORITIES,
+    RequestFramer,
+    build_coalesced_prompt,
+    encode_request,
+    interrupt_key,
+    is_cancelled,
+    load_message_file,
+    missing_section_message,
+    purge_stale_records,
+    queue_max,
+    request_expired,
+    request_priority,
+    same_prompt,
+    spool_append,
+    spool_depth,
+    spool_take,
+    split_coalesced_reply,
+    write_bridge_state,
+    write_coalesce_record,
+    write_reply_record,
+)
+from codex_comm import CodexLogReader
+from rotating_log import RotatingLogWriter
 from terminal import TmuxBackend, WeztermBackend
+from session_utils import instance_name, session_file_path
+from worker_pool import bind_log, bound_log, in_pool, shared_dir
+
+BIND_SCAN_INTERVAL = 0.5
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return max(1, value)
 
 
 def _env_float(name: str, default: float) -> float:
@@ -37,23 +89,281 @@ class TerminalCodexSession:
         self.pane_id = pane_id
         self.backend = WeztermBackend() if terminal_type == "wezterm" else TmuxBackend()
 
-    def send(self, text: str) -> None:
-        command = text.replace("\r", " ").replace("\n", " ").strip()
+    def send(self, text: str, multiline: bool = False) -> None:
+        # Coalesced prompts keep their line structure (pasted as one bracketed paste).
+        command = text.strip() if multiline else text.replace("\r", " ").replace("\n", " ").strip()
         if command:
             self.backend.send_text(self.pane_id, command)
 
+    def interrupt(self) -> None:
+        self.backend.send_key(self.pane_id, interrupt_key("codex"))
+
+
+def _lane_weights() -> Dict[str, int]:
+    """CCB_BRIDGE_LANE_WEIGHTS, e.g. "interactive=4,background=1" """
+    weights = {"interactive": 4, "background": 1}
+    for item in (os.environ.get("CCB_BRIDGE_LANE_WEIGHTS") or "").split(","):
+        name, _, value = item.partition("=")
+        name = name.strip().lower()
+        if name in weights:
+            try:
+                weights[name] = max(1, int(value))
+            except ValueError:
+                pass
+    return weights
+
+
+class PriorityLanes:
+    """
+    Bridge queue split into priority lanes.
+    "strict": interactive always goes first; "weighted": smooth weighted round-robin between the
+    non-empty lanes, so background work keeps draining under interactive load.
+    """
+
+    def __init__(self, policy: str = "weighted", weights: Optional[Dict[str, int]] = None):
+        self.policy = policy if policy in ("strict", "weighted") else "weighted"
+        self.weights = weights or _lane_weights()
+        self._lanes: Dict[str, Deque[Dict[str, Any]]] = {name: deque() for name in PRIORITIES}
+        self._credit: Dict[str, int] = {name: 0 for name in PRIORITIES}
+        self._stats: Dict[str, Dict[str, float]] = {
+            name: {"dispatched": 0, "wait_total": 0.0, "wait_max": 0.0, "wait_last": 0.0} for name in PRIORITIES
+        }
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def __bool__(self) -> bool:
+        return any(self._lanes.values())
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for name in PRIORITIES:
+            yield from self._lanes[name]
+
+    def append(self, payload: Dict[str, Any]) -> None:
+        self._lanes[request_priority(payload)].append(payload)
+
+    def ready_lanes(self) -> List[str]:
+        """Non-empty lanes, the one that dispatches next first"""
+        ready = [name for name in PRIORITIES if self._lanes[name]]
+        if self.policy == "strict" or len(ready) < 2:
+            return ready
+        return sorted(ready, key=lambda name: -(self._credit[name] + self.weights.get(name, 1)))
+
+    def next_lane(self) -> Optional[str]:
+        ready = self.ready_lanes()
+        return ready[0] if ready else None
+
+    def lane_items(self, lane: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Requests in `lane` (default: the lane that dispatches next), oldest first"""
+        lane = lane or self.next_lane()
+        return list(self._lanes[lane]) if lane else []
+
+    def popleft(self) -> Dict[str, Any]:
+        return self.take(1)[0]
+
+    def take(self, count: int, lane: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Pop up to `count` requests from `lane` (default: next lane); one provider turn, one scheduling step"""
+        lane = lane or self.next_lane()
+        if lane is None or not self._lanes[lane]:
+            raise IndexError("pop from empty queue")
+        ready = [name for name in PRIORITIES if self._lanes[name]]
+        if self.policy == "weighted" and len(ready) > 1:
+            total = sum(self.weights.get(name, 1) for name in ready)
+            for name in ready:
+                self._credit[name] += self.weights.get(name, 1)
+            self._credit[lane] -= total
+        now = time.time()
+        taken: List[Dict[str, Any]] = []
+        stats = self._stats[lane]
+        while self._lanes[lane] and len(taken) < max(1, count):
+            payload = self._lanes[lane].popleft()
+            waited = max(0.0, now - float(payload.get("queued_at") or now))
+            stats["dispatched"] += 1
+            stats["wait_total"] += waited
+            stats["wait_max"] = max(stats["wait_max"], waited)
+            stats["wait_last"] = waited
+            taken.append(payload)
+        if not any(self._lanes.values()):
+            self._credit = {name: 0 for name in PRIORITIES}
+        return taken
+
+    def prune(self, drop: Callable[[Dict[str, Any]], bool]) -> None:
+        for name in PRIORITIES:
+            self._lanes[name] = deque(p for p in self._lanes[name] if not drop(p))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for name in PRIORITIES:
+            stats = self._stats[name]
+            dispatched = int(stats["dispatched"])
+            out[name] = {
+                "queued": len(self._lanes[name]),
+                "dispatched": dispatched,
+                "wait_avg_s": round(stats["wait_total"] / dispatched, 3) if dispatched else 0.0,
+                "wait_max_s": round(stats["wait_max"], 3),
+                "wait_last_s": round(stats["wait_last"], 3),
+            }
+        return out
+
+
+class CodexTurnTracker:
+    """
+    Tracks whether Codex is mid-turn from user-message / turn-complete events in its rollout log,
+    and which request each turn answers: the logged user message is matched against the prompts
+    typed so far, and the turn's last assistant message becomes that request's reply.
+    """
+
+    def __init__(self, reader: CodexLogReader, turn_timeout: float, poll_interval: float,
+                 rescan_interval: float = 2.0, binder: Optional[Callable[[Path], bool]] = None):
+        self.reader = reader
+        # Pool workers: the reader is pinned, and `binder` claims the log this pane writes to.
+        self.binder = binder
+        self._created_at = time.time()
+        self._last_bind_scan = 0.0
+        self.turn_timeout = turn_timeout
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.busy = False
+        self.inflight: Optional[str] = None
+        self.started_at = 0.0
+        self._state = reader.capture_state()
+        self._last_rescan = time.time()
+        # Older Codex builds don't log turn-complete events; then the assistant reply ends the turn.
+        self._explicit_end = False
+        # Typed requests whose user message has not been logged yet, oldest first.
+        self._typed: Deque[Dict[str, Any]] = deque(maxlen=64)
+        self._owner: Optional[Dict[str, Any]] = None
+        self._foreign_prompt = False
+        self._reply: Optional[str] = None
+        self.completed: List[Tuple[Dict[str, Any], str]] = []
+
+    def begin(self, marker: str, request: Optional[Dict[str, Any]] = None) -> None:
+        """`request` ({"marker", "content"[, "members"]}) was just typed into Codex"""
+        self.busy = True
+        self.inflight = marker
+        self.started_at = time.time()
+        if request is not None:
+            self._typed.append(request)
+
+    def take_completed(self) -> List[Tuple[Dict[str, Any], str]]:
+        """(request, reply) for turns finished since the last call"""
+        completed, self.completed = self.completed, []
+        return completed
+
+    def _on_user_message(self, text: str) -> None:
+        for index, request in enumerate(self._typed):
+            if same_prompt(text, request.get("content") or ""):
+                # Codex answers in order: anything typed before this one was never logged.
+                for _ in range(index + 1):
+                    owner = self._typed.popleft()
+                self._owner = owner
+                return
+        if self._owner is None or not same_prompt(text, self._owner.get("content") or ""):
+            self._foreign_prompt = True
+
+    def _bind_log(self, now: float) -> None:
+        """Pin the reader to the log holding one of our typed prompts (other panes share the work dir)"""
+        if not self._typed or now - self._last_bind_scan < BIND_SCAN_INTERVAL:
+            return
+        self._last_bind_scan = now
+        for log in self.reader.recent_logs(self._created_at - BIND_SCAN_INTERVAL):
+            offset = self._typed_prompt_offset(log)
+            if offset is not None and self.binder(log):
+                self.reader.set_preferred_log(log)
+                self._state = {"log_path": log, "offset": offset}
+                return
+
+    def _typed_prompt_offset(self, log: Path) -> Optional[int]:
+        """Offset of the first user message in `log` that is one of our typed prompts"""
+        offset = 0
+        try:
+            with log.open("rb") as fh:
+                for raw in fh:
+                    if b'"user' in raw:
+                        try:
+                            text = self.reader._extract_user_message(json.loads(raw))
+                        except ValueError:
+                            text = None
+                        if text and any(same_prompt(text, r.get("content") or "") for r in self._typed):
+                            return offset
+                    offset += len(raw)
+        except OSError:
+            pass
+        return None
+
+    def refresh(self) -> Optional[str]:
+        """Consume new log entries; returns "timeout" if a turn was abandoned after turn_timeout"""
+        now = time.time()
+        rescan = now - self._last_rescan >= self.rescan_interval
+        if rescan:
+            self._last_rescan = now
+        if self.reader.pinned and self.reader.current_log_path() is None:
+            self._bind_log(now)
+        entries, self._state = self.reader.read_entries(self._state, rescan=rescan)
+        for entry in entries:
+            user_text = self.reader._extract_user_message(entry)
+            if user_text:
+                self._on_user_message(user_text)
+            message = CodexLogReader._extract_message(entry)
+            if message:
+                self._reply = message
+            event = self.reader.extract_turn_event(entry)
+            if event == "start":
+                if not self.busy:
+                    # Someone typed into the pane directly; hold queued requests until it finishes.
+                    self.busy = True
+                    self.inflight = None
+                    self.started_at = now
+            elif event == "end":
+                self._explicit_end = True
+                self._finish(answered=True)
+            elif not self._explicit_end and self.busy and message:
+                self._finish(answered=True)
+        if self.busy and self.turn_timeout and now - self.started_at >= self.turn_timeout:
+            self._finish()
+            return "timeout"
+        return None
+
+    def release(self) -> None:
+        """Forget the running turn (it was interrupted)"""
+        self._finish()
+
+    def _finish(self, answered: bool = False) -> None:
+        owner = self._owner
+        if (owner is None and answered and self._reply and not self._foreign_prompt
+                and self._typed and self._typed[0].get("marker") == self.inflight):
+            # Logs without user-message text: the turn answers the request the bridge typed last.
+            owner = self._typed.popleft()
+        if owner is not None and answered and self._reply:
+            self.completed.append((owner, self._reply))
+        if answered and self.inflight and any(r.get("marker") == self.inflight for r in self._typed):
+            # That was someone else's turn; ours is still queued in Codex, so stay busy until it runs.
+            self.started_at = time.time()
+        else:
+            self.busy = False
+            self.inflight = None
+            self.started_at = 0.0
+        self._owner = None
+        self._foreign_prompt = False
+        self._reply = None
+
 
 class DualBridge:
     """Claude ↔ Codex bridge main process"""
 
-    def __init__(self, runtime_dir: Path, session_id: str):
+    def __init__(self, runtime_dir: Path, session_id: str, work_dir: Optional[Path] = None):
         self.runtime_dir = runtime_dir
+        # Replies, cancels and coalesce records: the pool's shared dir for a pool worker.
+        self.shared_dir = shared_dir(runtime_dir)
         self.session_id = session_id
         self.input_fifo = self.runtime_dir / "input.fifo"
         self.history_dir = self.runtime_dir / "history"
         self.history_file = self.history_dir / "session.jsonl"
         self.bridge_log = self.runtime_dir / "bridge.log"
         self.history_dir.mkdir(parents=True, exist_ok=True)
+        # Handles stay open; writes are buffered and flushed on an interval and at exit.
+        self._history_writer = RotatingLogWriter(self.history_file)
+        self._bridge_writer = RotatingLogWriter(self.bridge_log)
 
         terminal_type = os.environ.get("CODEX_TERMINAL", "tmux")
         pane_id = os.environ.get("CODEX_WEZTERM_PANE") if terminal_type == "wezterm" else os.environ.get("CODEX_TMUX_SESSION")
@@ -62,54 +372,381 @@ class DualBridge:
 
         self.codex_session = TerminalCodexSession(terminal_type, pane_id)
         self._running = True
+        self._framer = RequestFramer()
+        # Bounded in-memory queue (split into priority lanes); overflow goes back to the on-disk spool.
+        self._queue = PriorityLanes(policy=(os.environ.get("CCB_BRIDGE_LANE_POLICY") or "weighted").strip().lower())
+        self._queue_max = queue_max()
+        self._started_at = self._timestamp()
+        self._processed = 0
+        self._last_reply_at: Optional[float] = None
+        self._last_state: Optional[Dict[str, Any]] = None
+        self._coalesce_window = _env_float("CCB_BRIDGE_COALESCE_WINDOW", 1.0)
+        self._coalesce_max = _env_int("CCB_BRIDGE_COALESCE_MAX", 4)
+        self._coalesce_max_chars = _env_int("CCB_BRIDGE_COALESCE_MAX_CHARS", 2000)
+        self._turn: Optional[CodexTurnTracker] = None
+        if os.environ.get("CCB_BRIDGE_TURN_AWARE", "1").lower() not in {"0", "false", "no", "off"}:
+            # Pool workers and named instances share the work dir with other panes: each binds its own log.
+            pooled = in_pool() or bool(instance_name())
+            reader = CodexLogReader(log_path=bound_log(self.runtime_dir) if pooled else self._bound_log_path(work_dir),
+                                    work_dir=work_dir)
+            reader.pinned = pooled
+            self._turn = CodexTurnTracker(
+                reader,
+                turn_timeout=_env_float("CCB_BRIDGE_TURN_TIMEOUT", 600.0),
+                poll_interval=max(0.01, _env_float("CCB_BRIDGE_TURN_POLL", 0.1)),
+                binder=(lambda log: bind_log(self.shared_dir, self.runtime_dir, log)) if pooled else None,
+            )
+        self._fifo_fd: Optional[int] = None
+        self._selector = selectors.DefaultSelector()
+        # Self-pipe so signal handlers can wake a selector blocked without timeout.
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
         signal.signal(signal.SIGTERM, self._handle_signal)
         signal.signal(signal.SIGINT, self._handle_signal)
 
     def _handle_signal(self, signum: int, _: Any) -> None:
         self._running = False
         self._log_console(f"⚠️ Received signal {signum}, exiting...")
+        self._wake()
+
+    def _wake(self) -> None:
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
 
     def run(self) -> int:
         self._log_console("🔌 Codex bridge started, waiting for Claude commands...")
-        idle_sleep = _env_float("CCB_BRIDGE_IDLE_SLEEP", 0.05)
         error_backoff_min = _env_float("CCB_BRIDGE_ERROR_BACKOFF_MIN", 0.05)
         error_backoff_max = _env_float("CCB_BRIDGE_ERROR_BACKOFF_MAX", 0.2)
         error_backoff = max(0.0, min(error_backoff_min, error_backoff_max))
-        while self._running:
-            try:
-                payload = self._read_request()
-                if payload is None:
-                    if idle_sleep:
-                        time.sleep(idle_sleep)
-                    continue
-                self._process_request(payload)
-                error_backoff = max(0.0, min(error_backoff_min, error_backoff_max))
-            except KeyboardInterrupt:
-                self._running = False
-            except Exception as exc:
-                self._log_console(f"❌ Failed to process message: {exc}")
-                self._log_bridge(f"error: {exc}")
-                if error_backoff:
-                    time.sleep(error_backoff)
-                if error_backoff_max:
-                    error_backoff = min(error_backoff_max, max(error_backoff_min, error_backoff * 2))
+        fifo_retry = _env_float("CCB_BRIDGE_FIFO_RETRY", 0.5)
+        purge_stale_records(self.runtime_dir)
+        # Requests spooled while the bridge was down (or restarting) are picked up first.
+        self._drain_spool()
+        self._publish_state()
+        try:
+            while self._running:
+                try:
+                    if self._fifo_fd is None and not self._open_fifo():
+                        # FIFO not created yet (or removed): poll for it without spinning.
+                        self._selector.select(timeout=fifo_retry or 0.5)
+                        continue
+                    for payload in self._wait_requests(self._select_timeout()):
+                        self._enqueue(payload)
+                    self._drain_spool()
+                    self._refresh_turn()
+                    self._prune_queue()
+                    while self._queue and self._running and not self._is_busy():
+                        batch = self._next_batch()
+                        if not batch:
+                            break
+                        payload = batch[0] if len(batch) == 1 else self._coalesce(batch)
+                        if self._process_request(payload) and self._turn:
+                            self._turn.begin(payload.get("marker") or "", {
+                                "marker": payload.get("marker") or "",
+                                "content": payload.get("content") or "",
+                                "members": payload.get("members") or [],
+                            })
+                        self._processed += len(batch)
+                        self._drain_spool()
+                    self._publish_state()
+                    self._flush_logs()
+                    error_backoff = max(0.0, min(error_backoff_min, error_backoff_max))
+                except KeyboardInterrupt:
+                    self._running = False
+                except Exception as exc:
+                    self._log_console(f"❌ Failed to process message: {exc}")
+                    self._log_bridge(f"error: {exc}")
+                    if error_backoff:
+                        time.sleep(error_backoff)
+                    if error_backoff_max:
+                        error_backoff = min(error_backoff_max, max(error_backoff_min, error_backoff * 2))
+        finally:
+            self._close_fifo()
+            for writer in (self._history_writer, self._bridge_writer):
+                try:
+                    writer.close()
+                except Exception:
+                    pass
 
         self._log_console("👋 Codex bridge exited")
         return 0
 
-    def _read_request(self) -> Optional[Dict[str, Any]]:
-        if not self.input_fifo.exists():
+    def _select_timeout(self) -> Optional[float]:
+        # Wake up in time to flush buffered log lines.
+        flush_in = [w.next_flush_in() for w in (self._history_writer, self._bridge_writer)]
+        flush_in = [value for value in flush_in if value is not None]
+        timeout = self._dispatch_timeout()
+        if flush_in:
+            timeout = min(flush_in) if timeout is None else min(timeout, min(flush_in))
+        return timeout
+
+    def _dispatch_timeout(self) -> Optional[float]:
+        # Poll the rollout log only while a turn is running or work is waiting; otherwise block.
+        if not self._queue and not self._is_busy():
             return None
+        timeout = self._turn.poll_interval if self._turn else 0.0
+        holds = [self._coalesce_hold(lane) for lane in self._queue.ready_lanes()]
+        hold = min((value for value in holds if value > 0), default=0.0)
+        if hold > 0:
+            timeout = min(timeout, hold) if timeout else hold
+        return timeout
+
+    def _flush_logs(self) -> None:
+        for writer in (self._history_writer, self._bridge_writer):
+            try:
+                writer.flush_due()
+            except Exception as exc:
+                self._log_console(f"⚠️ Failed to write log {writer.path.name}: {exc}")
+
+    def _coalescable(self, payload: Dict[str, Any]) -> bool:
+        return bool(payload.get("coalesce")) and len(payload.get("content") or "") <= self._coalesce_max_chars
+
+    def _coalesce_hold(self, name: Optional[str] = None) -> float:
+        """Seconds left to wait for more coalescable requests before dispatching the head of lane `name`"""
+        lane = self._queue.lane_items(name)
+        if not lane or not self._coalescable(lane[0]):
+            return 0.0
+        leading = 0
+        for payload in lane:
+            if not self._coalescable(payload) or leading >= self._coalesce_max:
+                break
+            leading += 1
+        if leading >= self._coalesce_max:
+            return 0.0
+        queued_at = float(lane[0].get("queued_at") or 0.0)
+        return max(0.0, queued_at + self._coalesce_window - time.time())
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """Requests for the next turn: a lane head, or a run of coalescable requests"""
+        # A lane waiting out its coalesce window doesn't hold up ready work in the other lane.
+        for name in self._queue.ready_lanes():
+            lane = self._queue.lane_items(name)
+            if not self._coalescable(lane[0]):
+                return self._queue.take(1, name)
+            if self._coalesce_hold(name) > 0:
+                continue
+            # Coalesce only within one lane: the leading run of flagged requests.
+            run = 0
+            while run < len(lane) and run < self._coalesce_max and self._coalescable(lane[run]):
+                run += 1
+            return self._queue.take(run, name)
+        return []
+
+    def _coalesce(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        batch_marker = f"batch-{batch[0].get('marker') or self._generate_marker()}"
+        for index, payload in enumerate(batch, 1):
+            if payload.get("marker"):
+                write_coalesce_record(self.shared_dir, payload["marker"], batch_marker, index, len(batch))
+        self._log_bridge(f"coalesced {len(batch)} requests into {batch_marker}: "
+                         + ", ".join(str(p.get("marker")) for p in batch))
+        return {
+            "marker": batch_marker,
+            "content": build_coalesced_prompt([p.get("content", "") for p in batch], batch_marker),
+            "multiline": True,
+            "members": [[p["marker"], index] for index, p in enumerate(batch, 1) if p.get("marker")],
+        }
+
+    def _refresh_turn(self) -> None:
+        if self._turn is None:
+            return
+        inflight = self._turn.inflight
+        timed_out = self._turn.refresh() == "timeout"
+        for request, reply in self._turn.take_completed():
+            self._file_reply(request, reply)
+        if timed_out:
+            self._log_bridge(f"turn timeout, releasing {inflight or 'manual turn'}")
+            return
+        inflight = self._turn.inflight
+        if self._turn.busy and inflight and is_cancelled(self.shared_dir, inflight):
+            # The caller gave up: interrupt Codex so the next request doesn't wait behind it.
+            try:
+                self.codex_session.interrupt()
+                self._log_bridge(f"cancelled in-flight {inflight}, interrupt sent")
+                # Let the TUI settle back to its prompt before the next request is typed.
+                time.sleep(_env_float("CCB_BRIDGE_INTERRUPT_SETTLE", 0.3))
+            except Exception as exc:
+                self._log_bridge(f"cancel {inflight}: interrupt failed: {exc}")
+            self._turn.release()
+
+    def _file_reply(self, request: Dict[str, Any], reply: str) -> None:
+        """Hand a finished turn's reply to its waiter(s); coalesced members get their own section"""
+        if not request.get("marker"):
+            return
+        self._append_history("codex", reply, request["marker"])
+        self._last_reply_at = time.time()
+        if not request.get("members"):
+            write_reply_record(self.shared_dir, request["marker"], reply)
+            self._log_bridge(f"reply for {request['marker']}")
+            return
+        for marker, index in request["members"]:
+            section = split_coalesced_reply(reply, int(index), request["marker"])
+            if section is None:
+                # Filed as an error: the waiter raises MissingSectionError instead of taking it as a reply.
+                self._log_bridge(f"reply for {request['marker']} has no section {index} ({marker})")
+                write_reply_record(self.shared_dir, marker, "", batch=request["marker"], index=index,
+                                   error=missing_section_message(request["marker"], int(index)))
+                continue
+            write_reply_record(self.shared_dir, marker, section, batch=request["marker"], index=index)
+        self._log_bridge(f"reply for {request['marker']} split to {len(request['members'])} members")
+
+    def _drop_reason(self, payload: Dict[str, Any]) -> Optional[str]:
+        if request_expired(payload):
+            return "deadline passed"
+        if is_cancelled(self.shared_dir, payload.get("marker") or ""):
+            return "cancelled"
+        return None
+
+    def _prune_queue(self) -> None:
+        def drop(payload: Dict[str, Any]) -> bool:
+            reason = self._drop_reason(payload)
+            if reason:
+                self._log_bridge(f"dropped {payload.get('marker')}: {reason}")
+            return bool(reason)
+
+        self._queue.prune(drop)
+
+    def _is_busy(self) -> bool:
+        return bool(self._turn and self._turn.busy)
+
+    @staticmethod
+    def _bound_log_path(work_dir: Optional[Path]) -> Optional[str]:
+        session_file = session_file_path("codex", work_dir)
         try:
-            with self.input_fifo.open("r", encoding="utf-8") as fifo:
-                line = fifo.readline()
-                if not line:
-                    return None
-                return json.loads(line)
-        except (OSError, json.JSONDecodeError):
+            data = json.loads(session_file.read_text(encoding="utf-8-sig"))
+        except Exception:
             return None
+        return data.get("codex_session_path") if isinstance(data, dict) else None
 
-    def _process_request(self, payload: Dict[str, Any]) -> None:
+    def _open_fifo(self) -> bool:
+        if not self.input_fifo.exists():
+            return False
+        try:
+            # O_RDWR keeps a writer reference open ourselves, so the FIFO never reports EOF
+            # between clients and we don't have to reopen it for every request.
+            fd = os.open(self.input_fifo, os.O_RDWR | os.O_NONBLOCK)
+        except OSError:
+            return False
+        self._fifo_fd = fd
+        self._selector.register(fd, selectors.EVENT_READ, "fifo")
+        return True
+
+    def _close_fifo(self) -> None:
+        if self._fifo_fd is None:
+            return
+        try:
+            self._selector.unregister(self._fifo_fd)
+        except Exception:
+            pass
+        try:
+            os.close(self._fifo_fd)
+        except OSError:
+            pass
+        self._fifo_fd = None
+
+    def _wait_requests(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Block until input arrives and return every complete request read from the FIFO"""
+        requests: List[Dict[str, Any]] = []
+        for key, _ in self._selector.select(timeout=timeout):
+            if key.data == "wake":
+                try:
+                    while os.read(self._wake_r, 512):
+                        pass
+                except OSError:
+                    pass
+                continue
+            if key.data == "fifo":
+                requests.extend(self._read_fifo())
+        return requests
+
+    def _read_fifo(self) -> List[Dict[str, Any]]:
+        requests: List[Dict[str, Any]] = []
+        oversized, malformed = self._framer.oversized, self._framer.malformed
+        while self._fifo_fd is not None:
+            try:
+                chunk = os.read(self._fifo_fd, 65536)
+            except BlockingIOError:
+                break
+            except OSError as exc:
+                if exc.errno == errno.EINTR:
+                    continue
+                self._log_bridge(f"fifo read error: {exc}")
+                self._close_fifo()
+                break
+            if not chunk:
+                break
+            requests.extend(self._framer.feed(chunk))
+        if self._framer.oversized != oversized:
+            self._log_console(f"⚠️ Dropped request larger than {self._framer.max_bytes} bytes")
+            self._log_bridge(f"dropped oversized request (limit {self._framer.max_bytes} bytes)")
+        if self._framer.malformed != malformed:
+            self._log_bridge("dropped malformed request")
+        return requests
+
+    def _enqueue(self, payload: Dict[str, Any]) -> None:
+        if payload.get("message_file"):
+            resolved = load_message_file(self.runtime_dir, payload)
+            if resolved is None:
+                self._log_bridge(f"dropped request {payload.get('marker')}: unreadable message file")
+                return
+            payload = resolved
+        reason = self._drop_reason(payload)
+        if reason:
+            self._log_bridge(f"dropped {payload.get('marker')}: {reason}")
+            return
+        payload.setdefault("queued_at", time.time())
+        if len(self._queue) >= self._queue_max:
+            # Never drop accepted work: park it on disk until the queue has room.
+            spool_append(self.runtime_dir, encode_request(payload))
+            self._log_bridge(f"queue full, spooled {payload.get('marker')}")
+            return
+        self._queue.append(payload)
+
+    def _drain_spool(self) -> None:
+        room = self._queue_max - len(self._queue)
+        if room <= 0:
+            return
+        for raw in spool_take(self.runtime_dir, room):
+            try:
+                payload = json.loads(raw.decode("utf-8", errors="replace"))
+            except json.JSONDecodeError:
+                self._log_bridge("dropped malformed spooled request")
+                continue
+            if isinstance(payload, dict):
+                self._enqueue(payload)
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def _publish_state(self) -> None:
+        state = {
+            "pid": os.getpid(),
+            "session_id": self.session_id,
+            "queue_depth": len(self._queue),
+            "queue_max": self._queue_max,
+            "spool_depth": spool_depth(self.runtime_dir),
+            "processed": self._processed,
+            "started_at": self._started_at,
+            "last_reply_at": self._last_reply_at,
+            "queued": [item.get("marker") for item in list(self._queue)[:10]],
+            "lane_policy": self._queue.policy,
+            "lanes": self._queue.stats(),
+        }
+        if self._turn is not None:
+            state["turn"] = "busy" if self._turn.busy else "idle"
+            state["inflight"] = self._turn.inflight
+            state["turn_started_at"] = self._turn.started_at or None
+            # Waiters read their reply from the bridge's reply records instead of the log.
+            state["ledger"] = True
+        if state == self._last_state:
+            return
+        self._last_state = state
+        write_bridge_state(self.runtime_dir, {**state, "updated_at": self._timestamp()})
+
+    def _process_request(self, payload: Dict[str, Any]) -> bool:
         content = payload.get("content", "")
         marker = payload.get("marker") or self._generate_marker()
 
@@ -118,11 +755,13 @@ class DualBridge:
         self._append_history("claude", content, marker)
 
         try:
-            self.codex_session.send(content)
+            self.codex_session.send(content, multiline=bool(payload.get("multiline")))
+            return True
         except Exception as exc:
             msg = f"❌ Failed to send to Codex: {exc}"
             self._append_history("codex", msg, marker)
             self._log_console(msg)
+            return False
 
     def _append_history(self, role: str, content: str, marker: str) -> None:
         entry = {
@@ -132,16 +771,13 @@ class DualBridge:
             "content": content,
         }
         try:
-            with self.history_file.open("a", encoding="utf-8") as handle:
-                json.dump(entry, handle, ensure_ascii=False)
-                handle.write("\n")
+            self._history_writer.write(json.dumps(entry, ensure_ascii=False) + "\n")
         except Exception as exc:
             self._log_console(f"⚠️ Failed to write history: {exc}")
 
     def _log_bridge(self, message: str) -> None:
         try:
-            with self.bridge_log.open("a", encoding="utf-8") as handle:
-                handle.write(f"{self._timestamp()} {message}\n")
+            self._bridge_writer.write(f"{self._timestamp()} {message}\n")
         except Exception:
             pass
 
@@ -162,14 +798,33 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Claude-Codex bridge")
     parser.add_argument("--runtime-dir", required=True, help="Runtime directory")
     parser.add_argument("--session-id", required=True, help="Session ID")
+    parser.add_argument("--work-dir", default=None, help="Project directory Codex runs in (default: cwd)")
+    parser.add_argument("--listen", default=os.environ.get("CCB_BRIDGE_LISTEN") or None,
+                        help="Also serve remote asks on host:port (needs CCB_BRIDGE_TOKEN unless loopback)")
     return parser.parse_args()
 
 
 def main() -> int:
     args = parse_args()
     runtime_dir = Path(args.runtime_dir)
-    bridge = DualBridge(runtime_dir, args.session_id)
-    return bridge.run()
+    work_dir = Path(args.work_dir).expanduser() if args.work_dir else None
+    bridge = DualBridge(runtime_dir, args.session_id, work_dir=work_dir)
+    server = None
+    if args.listen:
+        from remote_bridge import RemoteBridgeServer
+        try:
+            server = RemoteBridgeServer("codex", args.listen)
+        except Exception as exc:
+            bridge._log_console(f"❌ Remote listener not started: {exc}")
+            return 1
+        server.start_background()
+        bridge._log_console(f"🌐 Serving remote asks on {server.address}")
+    try:
+        return bridge.run()
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Client for the per-project ccb daemon (lib/ccb_daemon.py) and the user-level log supervisor (lib/log_supervisor.py)
+Kept import-light: bin/* scripts load only this module when a daemon is running and fall back
+to the in-process communicators otherwise (or when CCB_DAEMON=0).
+"""
+
+from __future__ import annotations
+
+import getpass
+import itertools
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from bridge_protocol import BridgeBackpressureError, RequestCancelledError, encode_request
+
+# Mirrors ccb_daemon's error codes the client reacts to.
+ERR_BACKPRESSURE = -32001
+CALL_TIMEOUT = 30.0
+WAIT_MARGIN = 10.0
+
+
+def daemon_supported() -> bool:
+    import socket
+
+    return hasattr(socket, "AF_UNIX")
+
+
+def daemon_enabled() -> bool:
+    return (os.environ.get("CCB_DAEMON") or "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _temp_dir() -> str:
+    # Same first choice as tempfile.gettempdir(), without importing tempfile on every bin/* start.
+    for name in ("TMPDIR", "TEMP", "TMP"):
+        if os.environ.get(name):
+            return os.environ[name]
+    return "/tmp"
+
+
+def daemon_dir() -> Path:
+    return Path(_temp_dir()) / f"claude-ai-{getpass.getuser()}" / "daemon"
+
+
+def socket_path(work_dir: Optional[Path] = None) -> Path:
+    """Socket for the project at `work_dir` (default cwd) and instance; hashed to stay under the AF_UNIX path limit"""
+    project = str(Path(work_dir or Path.cwd()).resolve())
+    instance = (os.environ.get("CCB_INSTANCE") or "").strip()
+    project = (f"{project}\0{instance}" if instance else project).encode("utf-8")
+    digest = f"{zlib.crc32(project):08x}{zlib.adler32(project):08x}"
+    return daemon_dir() / f"{digest}.sock"
+
+
+class DaemonError(RuntimeError):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class DaemonClient:
+    """JSON-RPC over one persistent Unix-socket connection"""
+
+    def __init__(self, work_dir: Optional[Path] = None, path: Optional[Path] = None):
+        self.path = Path(path) if path else socket_path(work_dir)
+        self._sock = None
+        self._reader = None
+        self._ids = itertools.count(1)
+
+    def alive(self) -> bool:
+        # Checked before anything that imports socket: most invocations have no daemon.
+        if not self.path.exists() or not daemon_supported():
+            return False
+        try:
+            self._connect()
+        except OSError:
+            return False
+        return True
+
+    def _connect(self) -> None:
+        if self._sock is not None:
+            return
+        import socket
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(CALL_TIMEOUT)
+        try:
+            sock.connect(str(self.path))
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = None
+            self._reader = None
+
+    def call(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: float = CALL_TIMEOUT) -> Any:
+        try:
+            self._connect()
+            request_id = next(self._ids)
+            self._sock.settimeout(timeout)
+            self._sock.sendall(encode_request({"jsonrpc": "2.0", "id": request_id, "method": method,
+                                               "params": {k: v for k, v in (params or {}).items() if v is not None}}))
+            response = None
+            while response is None:
+                line = self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                if response.get("id") not in (request_id, None):
+                    response = None  # answer to an earlier call abandoned on this connection
+        except TimeoutError:
+            self.close()
+            raise RuntimeError(f"ccb daemon did not answer {method} within {int(timeout)}s")
+        except OSError as exc:
+            self.close()
+            raise RuntimeError(f"ccb daemon connection failed: {exc}")
+        except BaseException:
+            # Interrupted mid-call (Ctrl-C during a wait): the daemon answers this connection's
+            # frames in order, so the next call (e.g. the cancel) must not queue behind it.
+            self.close()
+            raise
+        if response is None:
+            self.close()
+            raise RuntimeError("ccb daemon closed the connection")
+        error = response.get("error")
+        if error:
+            raise DaemonError(int(error.get("code") or 0), str(error.get("message") or "daemon error"))
+        return response.get("result")
+
+
+class DaemonCommunicator:
+    """The slice of Codex/GeminiCommunicator the bin/* scripts use, served by the daemon"""
+
+    def __init__(self, client: DaemonClient, provider: str):
+        self.client = client
+        self.provider = provider
+        self.label = provider.capitalize()
+
+    def _check_session_health_impl(self, probe_terminal: bool) -> Tuple[bool, str]:
+        try:
+            result = self.client.call("ping", {"provider": self.provider, "probe": probe_terminal})
+        except RuntimeError as exc:
+            return False, str(exc)
+        return bool(result.get("healthy")), str(result.get("status") or "")
+
+    def _check_session_health(self) -> Tuple[bool, str]:
+        return self._check_session_health_impl(probe_terminal=True)
+
+    def ping(self, display: bool = True) -> Tuple[bool, str]:
+        healthy, status = self._check_session_health()
+        msg = (f"✅ {self.label} connection OK ({status})" if healthy
+               else f"❌ {self.label} connection error: {status}")
+        if display:
+            print(msg)
+        return healthy, msg
+
+    def _send_message(self, content: str, coalesce: Optional[bool] = None, deadline: Optional[float] = None,
+                      priority: Optional[str] = None, timeout: Optional[float] = None) -> Tuple[str, Dict[str, Any]]:
+        try:
+            result = self.client.call("ask", {"provider": self.provider, "content": content, "coalesce": coalesce,
+                                              "deadline": deadline, "priority": priority, "timeout": timeout})
+        except DaemonError as exc:
+            if exc.code == ERR_BACKPRESSURE:
+                raise BridgeBackpressureError(str(exc))
+            raise
+        return result["marker"], {"daemon": True}
+
+    def wait_for_reply(self, marker: str, state: Dict[str, Any], timeout: float) -> Tuple[Optional[str], Dict[str, Any]]:
+        result = self.client.call("wait", {"marker": marker, "timeout": timeout}, timeout=timeout + WAIT_MARGIN)
+        if result.get("status") == "cancelled":
+            raise RequestCancelledError(f"Request {marker} was cancelled")
+        return result.get("reply"), state
+
+    def cancel(self, marker: str) -> bool:
+        try:
+            result = self.client.call("cancel", {"provider": self.provider, "marker": marker})
+        except RuntimeError:
+            return False  # daemon gone: nothing left to cancel
+        return bool(result.get("interrupted"))
+
+    def consume_pending(self, display: bool = True, n: int = 1):
+        result = self.client.call("pending", {"provider": self.provider, "n": n})
+        conversations = result.get("conversations")
+        reply = [tuple(pair) for pair in conversations] if conversations else result.get("reply")
+        if not display:
+            return reply or None
+        from cli_output import print_pending
+        return print_pending(reply, self.label)
+
+    def get_status(self) -> Dict[str, Any]:
+        return self.client.call("status", {"provider": self.provider})
+
+    def turn_status(self) -> Dict[str, Any]:
+        return self.client.call("turn", {"provider": self.provider})
+
+
+def daemon_communicator(provider: str, work_dir: Optional[Path] = None) -> Optional[DaemonCommunicator]:
+    """A daemon-backed communicator if this project's daemon is running, else None (use the in-process path)"""
+    if not daemon_enabled() or os.environ.get(f"CCB_{provider.upper()}_REMOTE"):
+        return None
+    client = DaemonClient(work_dir)
+    if not client.alive():
+        return None
+    return DaemonCommunicator(client, provider)
+
+
+# ---- user-level log supervisor (lib/log_supervisor.py) ----
+
+SUPERVISOR_RECHECK = 5.0
+_supervisor_local: Any = None  # threading.local(), created on first supervisor_call()
+_supervisor_missing_until = 0.0
+
+
+def supervisor_enabled() -> bool:
+    return (os.environ.get("CCB_SUPERVISOR") or "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def supervisor_socket_path() -> Path:
+    return daemon_dir() / "supervisor.sock"
+
+
+def supervisor_call(method: str, call_timeout: float = CALL_TIMEOUT, **params: Any) -> Optional[Dict[str, Any]]:
+    """
+    Ask the log supervisor; None when it isn't running (or can't answer for these params), so the
+    caller scans on its own. A missing supervisor is rechecked every SUPERVISOR_RECHECK seconds.
+    Each thread keeps its own connection: `watch` calls block.
+    """
+    global _supervisor_local, _supervisor_missing_until
+    import time
+
+    if not supervisor_enabled() or time.time() < _supervisor_missing_until:
+        return None
+    if _supervisor_local is None:
+        import threading
+
+        _supervisor_local = threading.local()
+    client = getattr(_supervisor_local, "client", None)
+    if client is None:
+        client = DaemonClient(path=supervisor_socket_path())
+        if not client.alive():
+            _supervisor_missing_until = time.time() + SUPERVISOR_RECHECK
+            return None
+        _supervisor_local.client = client
+    try:
+        result = client.call(method, params, timeout=call_timeout)
+    except DaemonError:
+        return None  # e.g. a different log root than the supervisor watches
+    except RuntimeError:
+        _supervisor_local.client = None
+        _supervisor_missing_until = time.time() + SUPERVISOR_RECHECK
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def open_communicator(provider: str, lazy_init: bool = True):
+    """Daemon-backed communicator when this project's daemon runs, else the in-process one"""
+    comm = daemon_communicator(provider)
+    if comm is not None:
+        return comm
+    if provider == "codex":
+        from codex_comm import CodexCommunicator
+        return CodexCommunicator(lazy_init=lazy_init)
+    from gemini_comm import GeminiCommunicator
+    return GeminiCommunicator(lazy_init=lazy_init)
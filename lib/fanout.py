@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Fan-out asks: one prompt to several providers concurrently, every wait in one process
+  gather: all answers, as labeled sections or NDJSON (one object per provider, in reply order)
+  first:  the first answer wins; the others are left running, or cancelled with cancel_rest
+Each result carries the provider's latency from send to reply.
+
+Usage: ccb ask [--all | -p codex -p gemini] [--mode gather|first] [--cancel-rest] [--json] <message>
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from async_comm import async_communicator
+from bridge_protocol import BridgeBackpressureError, RequestCancelledError
+from cli_output import EXIT_ERROR, EXIT_NO_REPLY, EXIT_OK
+from session_utils import session_file_path
+
+PROVIDERS = ("codex", "gemini")
+
+
+def active_providers(work_dir: Optional[Path] = None) -> List[str]:
+    """Providers this project can reach: a remote, a session in env, or an active .<provider>-session"""
+    work_dir = Path(work_dir or Path.cwd())
+    active = []
+    for provider in PROVIDERS:
+        if os.environ.get(f"CCB_{provider.upper()}_REMOTE") or os.environ.get(f"{provider.upper()}_SESSION_ID"):
+            active.append(provider)
+            continue
+        try:
+            data = json.loads(session_file_path(provider, work_dir).read_text(encoding="utf-8-sig"))
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, dict) and data.get("active"):
+            active.append(provider)
+    return active
+
+
+async def _ask_one(provider: str, message: str, timeout: float, cancel_rest: bool) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"provider": provider, "status": "error", "reply": None, "marker": None}
+    started = time.perf_counter()
+    comm = None
+    try:
+        comm = async_communicator(provider)
+        healthy, status = await comm.health()
+        if not healthy:
+            raise RuntimeError(f"Session error: {status}")
+        deadline = time.time() + timeout if timeout > 0 else None
+        result["marker"], state = await comm.send(message, deadline=deadline)
+        reply, _ = await comm.wait(result["marker"], state, timeout)
+        result["status"] = "ok" if reply else "timeout"
+        result["reply"] = reply
+    except asyncio.CancelledError:
+        # Lost a first-wins race: stop waiting, and withdraw the request if asked to.
+        result["status"] = "abandoned"
+        if cancel_rest and comm is not None and result["marker"]:
+            try:
+                await comm.cancel(result["marker"])
+                result["status"] = "cancelled"
+            except Exception as exc:
+                result["error"] = str(exc)
+    except RequestCancelledError:
+        result["status"] = "cancelled"
+    except BridgeBackpressureError as exc:
+        result["status"] = "backpressure"
+        result["error"] = str(exc)
+    except Exception as exc:
+        result["error"] = str(exc).removeprefix("❌ ")
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000.0)
+    return result
+
+
+async def fanout(message: str, providers: List[str], mode: str = "gather", timeout: float = 3600.0,
+                 cancel_rest: bool = False, on_result=None) -> List[Dict[str, Any]]:
+    """Ask every provider; results in completion order. `on_result` sees each as it completes"""
+    tasks = [asyncio.create_task(_ask_one(provider, message, timeout, cancel_rest)) for provider in providers]
+    results: List[Dict[str, Any]] = []
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            results.append(task.result())
+            if on_result:
+                on_result(results[-1])
+        if mode == "first" and any(r["status"] == "ok" for r in results):
+            for task in pending:
+                task.cancel()
+            for result in await asyncio.gather(*pending):
+                results.append(result)
+                if on_result:
+                    on_result(result)
+            break
+    return results
+
+
+def _label(result: Dict[str, Any]) -> str:
+    latency = f"{result['latency_ms'] / 1000.0:.2f}s"
+    return f"=== {result['provider'].capitalize()} ({result['status']}, {latency}) ==="
+
+
+def format_section(result: Dict[str, Any]) -> str:
+    body = result.get("reply")
+    if not body:
+        body = result.get("error") or {
+            "timeout": "(no reply before the timeout)",
+            "abandoned": f"(still running, marker {result.get('marker')}; fetch it later with the pend command)",
+            "cancelled": "(cancelled)",
+        }.get(result["status"], "(no reply)")
+    return f"{_label(result)}\n{body.rstrip()}\n"
+
+
+def exit_code(results: List[Dict[str, Any]], mode: str) -> int:
+    answered = [r for r in results if r["status"] == "ok"]
+    if answered and (mode == "first" or len(answered) == len(results)):
+        return EXIT_OK
+    if answered or any(r["status"] in ("timeout", "abandoned", "cancelled") for r in results):
+        return EXIT_NO_REPLY
+    return EXIT_ERROR
+
+
+def run(message: str, providers: List[str], mode: str = "gather", timeout: float = 3600.0,
+        cancel_rest: bool = False, as_json: bool = False, out: TextIO = sys.stdout) -> int:
+    def emit(result: Dict[str, Any]) -> None:
+        if as_json:
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        elif mode == "gather" or result["status"] == "ok":
+            out.write(format_section(result))
+        else:
+            print(f"{_label(result)} {result.get('error') or ''}".rstrip(), file=sys.stderr)
+        out.flush()
+
+    print(f"🔔 Asking {', '.join(p.capitalize() for p in providers)} ({mode})", file=sys.stderr, flush=True)
+    results = asyncio.run(fanout(message, providers, mode=mode, timeout=timeout,
+                                 cancel_rest=cancel_rest, on_result=emit))
+    return exit_code(results, mode)
@@ -7,19 +7,49 @@ Supports tmux and WezTerm terminals, reads replies from ~/.gemini/tmp/<hash>/cha
 from __future__ import annotations
 
 import hashlib
+import itertools
 import json
 import os
+import re
 import time
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any, List
-
-from terminal import get_backend_for_session, get_pane_id_from_session
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bridge_protocol import (
+    RequestCancelledError,
+    cancel_poll_interval,
+    claim_entry,
+    claim_owner,
+    clear_cancel,
+    interrupt_key,
+    is_cancelled,
+    purge_stale_records_every,
+    request_cancel,
+    same_prompt,
+)
 from ccb_config import apply_backend_env
+from cli_output import print_pending
 from i18n import t
 
-apply_backend_env()
+# Input box placeholder Gemini CLI shows once it takes input (`ccb up` readiness); GEMINI_READY_PATTERN overrides
+DEFAULT_READY_PATTERN = r"Type your message"
+# Outstanding asks older than this no longer count towards a pool worker's load.
+OUTSTANDING_MAX_AGE = 600.0
+
+
+def gemini_root() -> Path:
+    """Gemini session root; resolved on first use so importing this module never probes WSL"""
+    apply_backend_env()
+    return Path(os.environ.get("GEMINI_ROOT") or (Path.home() / ".gemini" / "tmp")).expanduser()
+
+
+def __getattr__(name: str) -> Any:
+    if name == "GEMINI_ROOT":
+        return gemini_root()
+    raise AttributeError(name)
+
 
-GEMINI_ROOT = Path(os.environ.get("GEMINI_ROOT") or (Path.home() / ".gemini" / "tmp")).expanduser()
+_MARKER_SEQ = itertools.count(1)
 
 
 def _get_project_hash(work_dir: Optional[Path] = None) -> str:
@@ -37,12 +67,14 @@ def _get_project_hash(work_dir: Optional[Path] = None) -> str:
 class GeminiLogReader:
     """Reads Gemini session files from ~/.gemini/tmp/<hash>/chats"""
 
-    def __init__(self, root: Path = GEMINI_ROOT, work_dir: Optional[Path] = None):
-        self.root = Path(root).expanduser()
+    def __init__(self, root: Optional[Path] = None, work_dir: Optional[Path] = None):
+        self.root = Path(root).expanduser() if root else gemini_root()
         self.work_dir = work_dir or Path.cwd()
         forced_hash = os.environ.get("GEMINI_PROJECT_HASH", "").strip()
         self._project_hash = forced_hash or _get_project_hash(self.work_dir)
         self._preferred_session: Optional[Path] = None
+        # Pinned: read only the preferred session file, never switch to the project's newest one.
+        self.pinned = False
         try:
             poll = float(os.environ.get("GEMINI_POLL_INTERVAL", "0.05"))
         except Exception:
@@ -60,8 +92,36 @@ class GeminiLogReader:
         chats = self.root / self._project_hash / "chats"
         return chats if chats.exists() else None
 
+    def _supervised(self, method: str, **params: Any) -> Optional[Dict[str, Any]]:
+        """The log supervisor's answer for this project (lib/log_supervisor.py); None: scan on our own"""
+        from daemon_client import supervisor_call
+
+        return supervisor_call(method, provider="gemini", root=str(self.root), **params)
+
+    def recent_sessions(self, since: float) -> List[Path]:
+        """Session files of this project modified since `since`, newest first"""
+        indexed = self._supervised("recent", key=self._project_hash, since=since)
+        if indexed is not None:
+            return [Path(p) for p in indexed.get("paths") or []]
+        chats = self._chats_dir()
+        found = []
+        try:
+            for p in (chats.glob("session-*.json") if chats else []):
+                try:
+                    mtime = p.stat().st_mtime
+                except OSError:
+                    continue
+                if mtime >= since and not p.name.startswith("."):
+                    found.append((mtime, p))
+        except OSError:
+            return []
+        return [p for _, p in sorted(found, reverse=True)]
+
     def _scan_latest_session_any_project(self) -> Optional[Path]:
         """Scan latest session across all projectHash (fallback for Windows/WSL path hash mismatch)"""
+        indexed = self._supervised("latest")
+        if indexed is not None:
+            return Path(indexed["path"]) if indexed.get("path") else None
         if not self.root.exists():
             return None
         try:
@@ -74,6 +134,9 @@ class GeminiLogReader:
         return sessions[-1] if sessions else None
 
     def _scan_latest_session(self) -> Optional[Path]:
+        indexed = self._supervised("latest", key=self._project_hash)
+        if indexed is not None:
+            return Path(indexed["path"]) if indexed.get("path") else None
         chats = self._chats_dir()
         try:
             if chats:
@@ -93,6 +156,8 @@ class GeminiLogReader:
 
     def _latest_session(self) -> Optional[Path]:
         preferred = self._preferred_session
+        if self.pinned:
+            return preferred if preferred and preferred.exists() else None
         # Always scan for latest to detect if preferred is stale
         latest = self._scan_latest_session()
         if latest:
@@ -129,9 +194,9 @@ class GeminiLogReader:
     def current_session_path(self) -> Optional[Path]:
         return self._latest_session()
 
-    def capture_state(self) -> Dict[str, Any]:
-        """Record current session file and message count"""
-        session = self._latest_session()
+    def capture_state(self, session: Optional[Path] = None) -> Dict[str, Any]:
+        """Record current (or the given) session file and message count"""
+        session = session or self._latest_session()
         msg_count = 0
         mtime = 0.0
         mtime_ns = 0
@@ -186,9 +251,87 @@ class GeminiLogReader:
         """Block and wait for new Gemini reply"""
         return self._read_since(state, timeout, block=True)
 
-    def try_get_message(self, state: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Non-blocking read reply"""
-        return self._read_since(state, timeout=0.0, block=False)
+    def try_get_message(self, state: Dict[str, Any], rescan: bool = False) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Non-blocking read reply; `rescan` also checks for a newer session file"""
+        return self._read_since(state, timeout=0.0, block=False, rescan=rescan)
+
+    def find_reply(self, state: Dict[str, Any], content: str, claim: Callable[[str], bool],
+                   session: Optional[Path] = None) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Non-blocking: the reply to this prompt rather than whichever reply comes next. Finds the
+        user message matching `content` logged after `state` (`claim` reserves it, so identical
+        concurrent prompts get distinct ones) and returns the Gemini reply before the next prompt.
+        """
+        session = session or self._latest_session()
+        try:
+            stat = session.stat() if session else None
+        except OSError:
+            stat = None
+        if stat is None:
+            return None, state
+        signature = [str(session), stat.st_mtime_ns, stat.st_size]
+        if (state.get("scan_signature") == signature
+                and time.time() - float(state.get("scanned_at") or 0.0) < self._force_read_interval):
+            return None, state
+        try:
+            with session.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None, state
+        messages = data.get("messages", []) if isinstance(data, dict) else []
+        if not isinstance(messages, list):
+            return None, state
+        state = {**state, "scan_signature": signature, "scanned_at": time.time()}
+
+        anchor = state.get("anchor") if state.get("anchor_session") == str(session) else None
+        if anchor is None:
+            start = state.get("msg_count") if session == state.get("session_path") else 0
+            start = start if isinstance(start, int) and start > 0 else 0
+            for index in range(start, len(messages)):
+                msg = messages[index]
+                if (isinstance(msg, dict) and msg.get("type") == "user"
+                        and same_prompt(str(msg.get("content") or ""), content)
+                        and claim(f"{session.stem}-{msg.get('id') or index}")):
+                    anchor = index
+                    break
+            if anchor is None:
+                return None, state
+            state.update(anchor=anchor, anchor_session=str(session))
+
+        reply: Optional[str] = None
+        for msg in messages[anchor + 1:]:
+            if not isinstance(msg, dict):
+                continue
+            if msg.get("type") == "user":
+                break
+            if msg.get("type") == "gemini":
+                text = str(msg.get("content") or "").strip()
+                if text:
+                    reply = text
+        return reply, state
+
+    def pending_prompt_key(self, session: Optional[Path] = None) -> Optional[str]:
+        """Claim key of the last user message if Gemini has not answered it yet, else None"""
+        session = session or self._latest_session()
+        if not session:
+            return None
+        try:
+            with session.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        messages = data.get("messages", []) if isinstance(data, dict) else []
+        if not isinstance(messages, list):
+            return None
+        for index in range(len(messages) - 1, -1, -1):
+            msg = messages[index]
+            if not isinstance(msg, dict):
+                continue
+            if msg.get("type") == "gemini" and str(msg.get("content") or "").strip():
+                return None
+            if msg.get("type") == "user":
+                return f"{session.stem}-{msg.get('id') or index}"
+        return None
 
     def latest_message(self) -> Optional[str]:
         """Get the latest Gemini reply directly"""
@@ -237,7 +380,8 @@ class GeminiLogReader:
 
         return conversations[-n:] if len(conversations) > n else conversations
 
-    def _read_since(self, state: Dict[str, Any], timeout: float, block: bool) -> Tuple[Optional[str], Dict[str, Any]]:
+    def _read_since(self, state: Dict[str, Any], timeout: float, block: bool,
+                    rescan: bool = False) -> Tuple[Optional[str], Dict[str, Any]]:
         deadline = time.time() + timeout
         prev_count = state.get("msg_count", 0)
         unknown_baseline = isinstance(prev_count, int) and prev_count < 0
@@ -251,12 +395,12 @@ class GeminiLogReader:
         prev_last_gemini_hash = state.get("last_gemini_hash")
         # Allow short timeout to scan new session files (gask-w defaults 1s/poll)
         rescan_interval = min(2.0, max(0.2, timeout / 2.0))
-        last_rescan = time.time()
+        last_rescan = 0.0 if rescan else time.time()
         last_forced_read = time.time()
 
         while True:
             # Periodically rescan to detect new session files
-            if time.time() - last_rescan >= rescan_interval:
+            if not self.pinned and time.time() - last_rescan >= rescan_interval:
                 latest = self._scan_latest_session()
                 if latest and latest != self._preferred_session:
                     self._preferred_session = latest
@@ -487,22 +631,52 @@ class GeminiCommunicator:
         self.session_id = self.session_info["session_id"]
         self.runtime_dir = Path(self.session_info["runtime_dir"])
         self.terminal = self.session_info.get("terminal", "tmux")
-        self.pane_id = get_pane_id_from_session(self.session_info)
+        self._pane_id: Optional[str] = None
+        # `ccb up gemini:N`: asks go to the worker with the fewest outstanding asks.
+        self.workers: List[Dict[str, Any]] = []
+        if self.session_info.get("pool"):
+            from worker_pool import pool_workers
+
+            self.workers = pool_workers(self.session_info)
+        # A named instance (CCB_INSTANCE) routes its asks like a one-worker pool, so it binds and
+        # reads its own session file instead of the project's newest one.
+        self._ask_workers = self.workers or ([self.session_info] if self._pinned() else [])
         self.timeout = int(os.environ.get("GEMINI_SYNC_TIMEOUT", "60"))
         self.marker_prefix = "ask"
         self.project_session_file = self.session_info.get("_session_file")
-        self.backend = get_backend_for_session(self.session_info)
+        self._backend = None
+        # Remote mode (CCB_GEMINI_REMOTE): everything goes through the remote bridge, no local logs.
+        self.remote = None
+        if self.session_info.get("remote"):
+            from remote_bridge import RemoteBridgeClient
+            self.remote = RemoteBridgeClient(self.session_info["remote"])
 
         # Lazy initialization: defer log reader and health check
         self._log_reader: Optional[GeminiLogReader] = None
         self._log_reader_primed = False
 
         if not lazy_init:
-            self._ensure_log_reader()
+            if not self.remote:
+                self._ensure_log_reader()
             healthy, msg = self._check_session_health()
             if not healthy:
                 raise RuntimeError(f"❌ Session unhealthy: {msg}\nHint: Please run ccb up gemini")
 
+    @property
+    def pane_id(self) -> str:
+        """Session pane, resolved on first use: importing terminal is the slowest part of startup"""
+        if self._pane_id is None:
+            from terminal import get_pane_id_from_session
+            self._pane_id = get_pane_id_from_session(self.session_info) or ""
+        return self._pane_id
+
+    @property
+    def backend(self):
+        if self._backend is None and not self.remote:
+            from terminal import get_backend_for_session
+            self._backend = get_backend_for_session(self.session_info)
+        return self._backend
+
     @property
     def log_reader(self) -> GeminiLogReader:
         """Lazy-load log reader on first access"""
@@ -510,6 +684,12 @@ class GeminiCommunicator:
             self._ensure_log_reader()
         return self._log_reader
 
+    def _pinned(self) -> bool:
+        """Named instance (CCB_INSTANCE): bind and read only this instance's own session file"""
+        from session_utils import instance_name
+
+        return bool(instance_name()) and not self.session_info.get("remote")
+
     def _ensure_log_reader(self) -> None:
         """Initialize log reader if not already done"""
         if self._log_reader is not None:
@@ -518,6 +698,11 @@ class GeminiCommunicator:
         log_work_dir = Path(work_dir_hint) if isinstance(work_dir_hint, str) and work_dir_hint else None
         self._log_reader = GeminiLogReader(work_dir=log_work_dir)
         preferred_session = self.session_info.get("gemini_session_path") or self.session_info.get("session_path")
+        if self._pinned():
+            from worker_pool import bound_log
+
+            self._log_reader.pinned = True
+            preferred_session = bound_log(self.runtime_dir) or preferred_session
         if preferred_session:
             self._log_reader.set_preferred_session(Path(str(preferred_session)))
         if not self._log_reader_primed:
@@ -531,8 +716,23 @@ class GeminiCommunicator:
         self._remember_gemini_session(session_path)
 
     def _load_session_info(self):
+        remote = (os.environ.get("CCB_GEMINI_REMOTE") or "").strip()
+        if remote:
+            return {
+                "session_id": f"remote:{remote}",
+                "runtime_dir": "",
+                "terminal": "remote",
+                "remote": remote,
+                "_session_file": None,
+            }
+
         if "GEMINI_SESSION_ID" in os.environ:
             terminal = os.environ.get("GEMINI_TERMINAL", "tmux")
+            pool = None
+            if os.environ.get("GEMINI_POOL"):
+                from worker_pool import pool_from_env
+
+                pool = pool_from_env("GEMINI")
             # Get correct pane_id based on terminal type
             if terminal == "wezterm":
                 pane_id = os.environ.get("GEMINI_WEZTERM_PANE", "")
@@ -546,10 +746,13 @@ class GeminiCommunicator:
                 "terminal": terminal,
                 "tmux_session": os.environ.get("GEMINI_TMUX_SESSION", ""),
                 "pane_id": pane_id,
+                "pool": pool,
                 "_session_file": None,
             }
 
-        project_session = Path.cwd() / ".gemini-session"
+        from session_utils import session_file_path
+
+        project_session = session_file_path("gemini")
         if not project_session.exists():
             return None
 
@@ -574,9 +777,16 @@ class GeminiCommunicator:
         return self._check_session_health_impl(probe_terminal=True)
 
     def _check_session_health_impl(self, probe_terminal: bool) -> Tuple[bool, str]:
+        if self.remote:
+            return self.remote.health(probe=probe_terminal)
         try:
             if not self.runtime_dir.exists():
                 return False, "Runtime directory not found"
+            if self.workers:
+                up = sum(1 for w in self.workers if self._worker_alive(w, probe_terminal))
+                if not up:
+                    return False, f"No live worker in the pool (0/{len(self.workers)})"
+                return True, f"Session OK (pool: {up}/{len(self.workers)} workers up)"
             if not self.pane_id:
                 return False, "Session ID not found"
             if probe_terminal and self.backend and not self.backend.is_alive(self.pane_id):
@@ -585,20 +795,174 @@ class GeminiCommunicator:
         except Exception as exc:
             return False, f"Check failed: {exc}"
 
-    def _send_via_terminal(self, content: str) -> bool:
-        if not self.backend or not self.pane_id:
+    def readiness(self, since: float) -> Optional[str]:
+        """How Gemini CLI showed it takes input (for `ccb up`); None while it is still starting"""
+        if self.remote:
+            return "remote bridge" if self.remote.health(probe=True)[0] else None
+        if not self._check_session_health_impl(probe_terminal=False)[0]:
+            return None
+        from terminal import get_pane_id_from_session
+
+        panes = [get_pane_id_from_session(w) for w in self.workers] if self.workers else [self.pane_id]
+        work_dir = self.session_info.get("work_dir")
+        reader = GeminiLogReader(work_dir=Path(work_dir) if work_dir else None)
+        if len(reader.recent_sessions(since)) >= len(panes):
+            return "chat file"
+        pattern = re.compile(os.environ.get("GEMINI_READY_PATTERN") or DEFAULT_READY_PATTERN)
+        if self.backend and all(p and pattern.search(self.backend.get_text(p)) for p in panes):
+            return "idle prompt"
+        return None
+
+    def _worker_alive(self, worker: Dict[str, Any], probe_terminal: bool = True) -> bool:
+        from terminal import get_pane_id_from_session
+
+        pane_id = get_pane_id_from_session(worker)
+        if not pane_id:
+            return False
+        return not probe_terminal or not self.backend or self.backend.is_alive(pane_id)
+
+    def _worker_load(self, worker: Dict[str, Any]) -> Optional[float]:
+        from worker_pool import outstanding_count
+
+        if not self._worker_alive(worker):
+            return None
+        return outstanding_count(Path(worker["runtime_dir"]), OUTSTANDING_MAX_AGE)
+
+    def _send_via_terminal(self, content: str, pane_id: Optional[str] = None) -> bool:
+        pane_id = pane_id or self.pane_id
+        if not self.backend or not pane_id:
             raise RuntimeError("Terminal session not configured")
-        self.backend.send_text(self.pane_id, content)
+        self.backend.send_text(pane_id, content)
         return True
 
-    def _send_message(self, content: str) -> Tuple[str, Dict[str, Any]]:
+    def _send_to_worker(self, marker: str, content: str) -> Dict[str, Any]:
+        from terminal import get_pane_id_from_session
+        from worker_pool import bound_log, clear_outstanding, mark_outstanding, pick_worker
+
+        worker = pick_worker(self._ask_workers, self._worker_load)
+        if worker is None:
+            raise RuntimeError("No live Gemini worker in the pool")
+        runtime_dir = Path(worker["runtime_dir"])
+        # The worker's own session file, once bound, gives an exact message-count baseline.
+        session = bound_log(runtime_dir)
+        state = self.log_reader.capture_state(session if session and session.exists() else None)
+        state.update(ask_content=content, marker=marker, worker=str(runtime_dir), sent_at=time.time())
+        mark_outstanding(runtime_dir, marker)
+        try:
+            self._send_via_terminal(content, get_pane_id_from_session(worker))
+        except Exception:
+            clear_outstanding(runtime_dir, marker)
+            raise
+        return state
+
+    def _send_message(self, content: str, deadline: Optional[float] = None) -> Tuple[str, Dict[str, Any]]:
+        if self.remote:
+            # The remote bridge assigns the marker; its log tailer streams the reply back.
+            timeout = deadline - time.time() if deadline else float(os.environ.get("CCB_SYNC_TIMEOUT", "3600.0"))
+            ask = self.remote.ask(content, timeout=timeout)
+            return ask.marker, {"remote_ask": ask}
         marker = self._generate_marker()
+        # No bridge runs next to Gemini, so its asks sweep the claim / cancel records themselves.
+        purge_stale_records_every(self.runtime_dir)
+        if self._ask_workers:
+            return marker, self._send_to_worker(marker, content)
         state = self.log_reader.capture_state()
+        # Lets wait_for_reply() find this prompt's own reply among concurrent asks.
+        state.update(ask_content=content, marker=marker)
         self._send_via_terminal(content)
         return marker, state
 
+    def wait_for_reply(self, marker: str, state: Dict[str, Any], timeout: float) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Wait for the reply to the prompt sent as `marker` (the next reply if its prompt is unknown);
+        raises RequestCancelledError if `marker` is cancelled meanwhile
+        """
+        if self.remote:
+            from remote_bridge import wait_remote_reply
+            return wait_remote_reply(state, timeout), state
+        deadline = time.time() + timeout
+        while True:
+            if is_cancelled(self.runtime_dir, marker):
+                clear_cancel(self.runtime_dir, marker)
+                raise RequestCancelledError(f"Request {marker} was cancelled")
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None, state
+            if state.get("ask_content") is not None:
+                reply, state = self.find_reply(state)
+                if reply:
+                    return reply, state
+                time.sleep(min(remaining, self.log_reader._poll_interval))
+                continue
+            reply, state = self.log_reader.wait_for_message(state, min(remaining, cancel_poll_interval()))
+            if reply:
+                return reply, state
+
+    def find_reply(self, state: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Non-blocking: the reply to the prompt sent with `state` (see GeminiLogReader.find_reply)"""
+        claim = lambda key: claim_entry(self.runtime_dir, key, state.get("marker") or "")  # noqa: E731
+        if not state.get("worker"):
+            return self.log_reader.find_reply(state, state["ask_content"], claim)
+        return self._find_worker_reply(state, claim)
+
+    def _find_worker_reply(self, state: Dict[str, Any],
+                           claim: Callable[[str], bool]) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Pool ask: look in the worker's session file, or find (and bind) it by the prompt"""
+        from worker_pool import bind_log, bound_log, clear_outstanding, foreign_logs
+
+        runtime_dir = Path(state["worker"])
+        session = bound_log(runtime_dir)
+        if session and session.exists():
+            candidates = [session]
+        else:
+            taken = foreign_logs(self._ask_workers, runtime_dir)
+            candidates = [p for p in self.log_reader.recent_sessions(float(state["sent_at"]) - 1.0) if p not in taken]
+        reply = None
+        for candidate in candidates:
+            reply, state = self.log_reader.find_reply(state, state["ask_content"], claim, session=candidate)
+            if state.get("anchor_session") == str(candidate):
+                if candidate != session:
+                    bind_log(self.runtime_dir, runtime_dir, candidate)
+                break
+        if reply:
+            clear_outstanding(runtime_dir, state.get("marker") or "")
+        return reply, state
+
+    def cancel(self, marker: str) -> bool:
+        """
+        Release the waiter for `marker` and interrupt Gemini, but only while `marker` owns the
+        unanswered prompt Gemini is working on (its waiter claimed it); another caller's turn is
+        never interrupted. Returns True if Gemini is being interrupted.
+        """
+        if self.remote:
+            return self.remote.cancel(marker)
+        request_cancel(self.runtime_dir, marker)
+        pane_id = self.pane_id
+        session = None
+        if self._ask_workers:
+            from worker_pool import bound_log, clear_outstanding, worker_for
+
+            worker = worker_for(self._ask_workers, marker)
+            if worker is None:
+                return False
+            from terminal import get_pane_id_from_session
+
+            clear_outstanding(Path(worker["runtime_dir"]), marker)
+            pane_id = get_pane_id_from_session(worker)
+            session = bound_log(Path(worker["runtime_dir"]))
+            if session is None:
+                return False
+        if not self.backend or not pane_id:
+            return False
+        key = self.log_reader.pending_prompt_key(session)
+        if not key or claim_owner(self.runtime_dir, key) != marker:
+            return False
+        self.backend.send_key(pane_id, interrupt_key("gemini"))
+        return True
+
     def _generate_marker(self) -> str:
-        return f"{self.marker_prefix}-{int(time.time())}-{os.getpid()}"
+        # The sequence keeps markers distinct when one process (daemon, remote bridge) sends many asks.
+        return f"{self.marker_prefix}-{int(time.time())}-{os.getpid()}-{next(_MARKER_SEQ)}"
 
     def ask_async(self, question: str) -> bool:
         try:
@@ -606,7 +970,10 @@ class GeminiCommunicator:
             if not healthy:
                 raise RuntimeError(f"❌ Session error: {status}")
 
-            self._send_via_terminal(question)
+            if self.remote:
+                self._send_message(question)
+            else:
+                self._send_via_terminal(question)
             print(f"✅ Sent to Gemini")
             print("Hint: Use gpend to view reply")
             return True
@@ -621,11 +988,21 @@ class GeminiCommunicator:
                 raise RuntimeError(f"❌ Session error: {status}")
 
             print(f"🔔 {t('sending_to', provider='Gemini')}", flush=True)
+            wait_timeout = self.timeout if timeout is None else int(timeout)
+            if self.remote:
+                marker, state = self._send_message(question)
+                print(f"⏳ {t('waiting_for_reply', provider='Gemini')}", flush=True)
+                message, _ = self.wait_for_reply(marker, state, float(wait_timeout or 86400))
+                if message:
+                    print(f"🤖 {t('reply_from', provider='Gemini')}")
+                    print(message)
+                    return message
+                print(f"⏰ {t('timeout_no_reply', provider='Gemini')}")
+                return None
             self._send_via_terminal(question)
             # Capture state after sending to reduce "question → send" latency.
             state = self.log_reader.capture_state()
 
-            wait_timeout = self.timeout if timeout is None else int(timeout)
             if wait_timeout == 0:
                 print(f"⏳ {t('waiting_for_reply', provider='Gemini')}", flush=True)
                 start_time = time.time()
@@ -662,33 +1039,19 @@ class GeminiCommunicator:
             return None
 
     def consume_pending(self, display: bool = True, n: int = 1):
+        if self.remote:
+            result = self.remote.pending(n) or None
+            return print_pending(result, "Gemini") if display else result
         session_path = self.log_reader.current_session_path()
         if isinstance(session_path, Path):
             self._remember_gemini_session(session_path)
 
         if n > 1:
-            conversations = self.log_reader.latest_conversations(n)
-            if not conversations:
-                if display:
-                    print(t('no_reply_available', provider='Gemini'))
-                return None
-            if display:
-                for i, (question, reply) in enumerate(conversations):
-                    if question:
-                        print(f"Q: {question}")
-                    print(f"A: {reply}")
-                    if i < len(conversations) - 1:
-                        print("---")
-            return conversations
-
-        message = self.log_reader.latest_message()
-        if not message:
-            if display:
-                print(t('no_reply_available', provider='Gemini'))
-            return None
-        if display:
-            print(message)
-        return message
+            conversations = self.log_reader.latest_conversations(n) or None
+            return print_pending(conversations, "Gemini") if display else conversations
+
+        message = self.log_reader.latest_message() or None
+        return print_pending(message, "Gemini") if display else message
 
     def _remember_gemini_session(self, session_path: Path) -> None:
         if not session_path or not self.project_session_file:
@@ -731,6 +1094,12 @@ class GeminiCommunicator:
         if not updated:
             return
 
+        from resume_registry import record
+
+        work_dir = data.get("work_dir")
+        record(Path(work_dir) if work_dir else None, gemini_project_hash=project_hash,
+               gemini_session_id=session_id, gemini_log=session_path_str)
+
         tmp_file = project_file.with_suffix(".tmp")
         try:
             with tmp_file.open("w", encoding="utf-8") as handle:
@@ -760,6 +1129,10 @@ class GeminiCommunicator:
         return healthy, msg
 
     def get_status(self) -> Dict[str, Any]:
+        if self.remote:
+            info = self.remote.status()
+            info["remote"] = self.remote.address
+            return info
         healthy, status = self._check_session_health()
         return {
             "session_id": self.session_id,
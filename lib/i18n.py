@@ -8,12 +8,12 @@ Language detection priority:
 """
 
 import os
-import locale
 
 _current_lang = None
 
-MESSAGES = {
-    "en": {
+# Message tables are built on first use (only the active language's, plus English as fallback).
+def _messages_en() -> dict:
+    return {
         # Terminal detection
         "no_terminal_backend": "No terminal backend detected (WezTerm or tmux)",
         "solutions": "Solutions:",
@@ -89,8 +89,11 @@ MESSAGES = {
         "detected_env": "Detected {env} environment",
         "confirm_continue": "Confirm continue? (y/N)",
         "cancelled": "Cancelled",
-    },
-    "zh": {
+    }
+
+
+def _messages_zh() -> dict:
+    return {
         # Terminal detection
         "no_terminal_backend": "未检测到终端后端 (WezTerm 或 tmux)",
         "solutions": "解决方案：",
@@ -166,8 +169,24 @@ MESSAGES = {
         "detected_env": "检测到 {env} 环境",
         "confirm_continue": "确认继续？(y/N)",
         "cancelled": "已取消",
-    },
-}
+    }
+
+
+_TABLE_BUILDERS = {"en": _messages_en, "zh": _messages_zh}
+_tables: dict = {}
+
+
+def _messages(lang: str) -> dict:
+    table = _tables.get(lang)
+    if table is None:
+        table = _tables[lang] = _TABLE_BUILDERS.get(lang, _messages_en)()
+    return table
+
+
+def __getattr__(name: str):
+    if name == "MESSAGES":
+        return {lang: _messages(lang) for lang in _TABLE_BUILDERS}
+    raise AttributeError(name)
 
 
 def detect_language() -> str:
@@ -189,6 +208,8 @@ def detect_language() -> str:
     try:
         lang = os.environ.get("LANG", "") or os.environ.get("LC_ALL", "") or os.environ.get("LC_MESSAGES", "")
         if not lang:
+            import locale
+
             lang, _ = locale.getdefaultlocale()
             lang = lang or ""
 
@@ -226,13 +247,10 @@ def t(key: str, **kwargs) -> str:
     Returns:
         Translated and formatted message
     """
-    lang = get_lang()
-    messages = MESSAGES.get(lang, MESSAGES["en"])
-
-    msg = messages.get(key)
+    msg = _messages(get_lang()).get(key)
     if msg is None:
         # Fallback to English
-        msg = MESSAGES["en"].get(key, key)
+        msg = _messages("en").get(key, key)
 
     if kwargs:
         try:
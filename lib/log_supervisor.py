@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+User-level log supervisor
+One process per user owns the only scan of the Codex and Gemini log roots and serves what it finds to
+every project's tools over a Unix socket (the newline JSON-RPC of ccb_daemon), so the number of directory
+walks stays fixed however many projects run ccb. Codex logs are routed to projects by the cwd in their
+session_meta line, Gemini session files by the project hash of their directory.
+
+Each tick re-lists only directories whose mtime changed and stats only files written in the last
+CCB_SUPERVISOR_HOT_WINDOW seconds; every CCB_SUPERVISOR_FULL_SCAN seconds all files are stat'ed again.
+A project's version goes up whenever one of its files changes; `watch` blocks until it does.
+
+Methods (params): latest(provider, root, [key]) -> {path, version}   (no key: newest of any project)
+                  recent(provider, root, key, since) -> {paths}       (newest first)
+                  watch(provider, root, key, version, timeout) -> {path, version}
+                  info() / shutdown()
+
+Usage: ccb supervisor start|stop|status  (or python lib/log_supervisor.py)
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ccb_daemon import ERR_PARAMS, RpcError, RpcServer
+from daemon_client import daemon_supported, supervisor_socket_path
+
+PROVIDERS = ("codex", "gemini")
+DEFAULT_INTERVAL = 0.25
+DEFAULT_HOT_WINDOW = 3600.0
+DEFAULT_FULL_SCAN = 5.0
+MAX_WATCH = 60.0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.environ.get(name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+class LogIndex:
+    """Every log under one provider root, grouped by project key; rescanned by scan()"""
+
+    def __init__(self, provider: str, root: Path, hot_window: float = DEFAULT_HOT_WINDOW):
+        self.provider = provider
+        self.root = Path(root)
+        self.hot_window = hot_window
+        self._dirs: Dict[Path, Tuple[float, List[Path], List[Path]]] = {}
+        # path -> (mtime, size, project key); "" while the file has no readable key (no session_meta)
+        self._files: Dict[Path, Tuple[float, int, str]] = {}
+        self._latest: Dict[str, Tuple[float, Path]] = {}
+        self.versions: Dict[str, int] = {}
+        self._last_full = 0.0
+        self._key_reader: Any = None
+        self.scans = 0
+
+    def _is_log(self, path: Path) -> bool:
+        if self.provider == "codex":
+            return path.suffix == ".jsonl"
+        return (path.name.startswith("session-") and path.suffix == ".json"
+                and path.parent.name == "chats")
+
+    def _project_key(self, path: Path) -> Optional[str]:
+        if self.provider == "gemini":
+            return path.parent.parent.name
+        if self._key_reader is None:
+            from codex_comm import CodexLogReader
+
+            self._key_reader = CodexLogReader(root=self.root, work_dir=self.root)
+        # Same normalization CodexLogReader applies to its own work dir.
+        return self._key_reader._extract_cwd_from_log(path)
+
+    def _list(self, directory: Path, mtime: float) -> Tuple[List[Path], List[Path]]:
+        cached = self._dirs.get(directory)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+        subdirs: List[Path] = []
+        files: List[Path] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(Path(entry.path))
+                    elif self._is_log(Path(entry.path)):
+                        files.append(Path(entry.path))
+        except OSError:
+            pass
+        self._dirs[directory] = (mtime, subdirs, files)
+        return subdirs, files
+
+    def _walk(self) -> List[Path]:
+        found: List[Path] = []
+        seen = set()
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = directory.stat().st_mtime
+            except OSError:
+                continue
+            seen.add(directory)
+            subdirs, files = self._list(directory, mtime)
+            stack.extend(subdirs)
+            found.extend(files)
+        for gone in [d for d in self._dirs if d not in seen]:
+            del self._dirs[gone]
+        return found
+
+    def scan(self) -> set:
+        """Rescan the root; returns the project keys whose files changed"""
+        now = time.time()
+        full = now - self._last_full >= _env_float("CCB_SUPERVISOR_FULL_SCAN", DEFAULT_FULL_SCAN)
+        if full:
+            self._last_full = now
+        changed = set()
+        present = self._walk()
+        for path in present:
+            known = self._files.get(path)
+            if known and not full and now - known[0] > self.hot_window:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if known and (known[0], known[1]) == (stat.st_mtime, stat.st_size):
+                continue
+            # A keyless file is read again only once it changes (e.g. session_meta gets written).
+            key = (known[2] if known else "") or self._project_key(path) or ""
+            self._files[path] = (stat.st_mtime, stat.st_size, key)
+            if not key:
+                continue
+            changed.add(key)
+            latest = self._latest.get(key)
+            if not latest or stat.st_mtime >= latest[0]:
+                self._latest[key] = (stat.st_mtime, path)
+        present_set = set(present)
+        for path in [p for p in self._files if p not in present_set]:
+            key = self._files.pop(path)[2]
+            if key:
+                changed.add(key)
+                if self._latest.get(key, (0.0, None))[1] == path:
+                    self._relatest(key)
+        for key in changed:
+            self.versions[key] = self.versions.get(key, 0) + 1
+        self.scans += 1
+        return changed
+
+    def _relatest(self, key: str) -> None:
+        candidates = [(mtime, path) for path, (mtime, _, k) in self._files.items() if k == key]
+        if candidates:
+            self._latest[key] = max(candidates)
+        else:
+            self._latest.pop(key, None)
+
+    def latest(self, key: Optional[str]) -> Optional[Path]:
+        if key is None:
+            return max(self._latest.values(), default=(0.0, None))[1]
+        entry = self._latest.get(key)
+        return entry[1] if entry else None
+
+    def recent(self, key: str, since: float) -> List[Path]:
+        if not key:
+            return []
+        found = [(mtime, path) for path, (mtime, _, k) in self._files.items() if k == key and mtime >= since]
+        return [path for _, path in sorted(found, reverse=True)]
+
+
+class LogSupervisor(RpcServer):
+    """Serves the Codex and Gemini log indexes of this user; one scanner thread feeds both"""
+
+    def __init__(self, path: Optional[Path] = None, interval: Optional[float] = None):
+        from codex_comm import session_root
+        from gemini_comm import gemini_root
+
+        self.interval = max(0.05, interval if interval is not None
+                            else _env_float("CCB_SUPERVISOR_INTERVAL", DEFAULT_INTERVAL))
+        hot_window = _env_float("CCB_SUPERVISOR_HOT_WINDOW", DEFAULT_HOT_WINDOW)
+        self.indexes = {"codex": LogIndex("codex", session_root(), hot_window),
+                        "gemini": LogIndex("gemini", gemini_root(), hot_window)}
+        self._changed = threading.Condition()
+        self._scan_ms = 0.0
+        self._subscribers: Dict[str, float] = {}
+        super().__init__(Path(path) if path else supervisor_socket_path(),
+                         "A ccb log supervisor is already running for this user")
+
+    def _index(self, provider: str, root: str) -> LogIndex:
+        index = self.indexes.get(provider)
+        if index is None:
+            raise RpcError(ERR_PARAMS, f"Unknown provider: {provider}")
+        if Path(root).expanduser().resolve() != index.root.expanduser().resolve():
+            # Clients with another root (CODEX_SESSION_ROOT/GEMINI_ROOT) scan on their own.
+            raise RpcError(ERR_PARAMS, f"Not watching {root} (watching {index.root})")
+        return index
+
+    def _scan_loop(self) -> None:
+        while True:
+            started = time.perf_counter()
+            changed = False
+            with self._changed:
+                for index in self.indexes.values():
+                    changed = bool(index.scan()) or changed
+                self._scan_ms = round((time.perf_counter() - started) * 1000.0, 2)
+                if changed:
+                    self._changed.notify_all()
+            time.sleep(self.interval)
+
+    def _result(self, index: LogIndex, key: Optional[str]) -> Dict[str, Any]:
+        path = index.latest(key)
+        return {"path": str(path) if path else None, "version": index.versions.get(key or "", 0)}
+
+    def rpc_latest(self, provider: str, root: str, key: Optional[str] = None) -> Dict[str, Any]:
+        index = self._index(provider, root)
+        with self._changed:
+            return self._result(index, key)
+
+    def rpc_recent(self, provider: str, root: str, key: str, since: float) -> Dict[str, Any]:
+        index = self._index(provider, root)
+        with self._changed:
+            return {"paths": [str(p) for p in index.recent(key, float(since))]}
+
+    def rpc_watch(self, provider: str, root: str, key: str, version: Optional[int] = None,
+                  timeout: float = MAX_WATCH) -> Dict[str, Any]:
+        """Returns once the project's version differs from `version` (at once when it already does)"""
+        index = self._index(provider, root)
+        deadline = time.time() + min(MAX_WATCH, max(0.0, float(timeout)))
+        with self._changed:
+            self._subscribers[f"{provider}:{key}"] = time.time()
+            while version is not None and index.versions.get(key, 0) == version:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return self._result(index, key)
+
+    def rpc_info(self) -> Dict[str, Any]:
+        with self._changed:
+            cutoff = time.time() - 300.0
+            return {
+                "pid": os.getpid(),
+                "socket": str(self.path),
+                "interval_s": self.interval,
+                "last_scan_ms": self._scan_ms,
+                "roots": {name: str(index.root) for name, index in self.indexes.items()},
+                "logs": {name: len(index._files) for name, index in self.indexes.items()},
+                "projects": {name: len(index._latest) for name, index in self.indexes.items()},
+                "scans": self.indexes["codex"].scans,
+                "subscribers": sorted(k for k, seen in self._subscribers.items() if seen >= cutoff),
+            }
+
+    def serve(self) -> None:
+        threading.Thread(target=self._scan_loop, name="log-scan", daemon=True).start()
+        super().serve()
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="User-level ccb log supervisor")
+    parser.add_argument("--interval", type=float, default=None,
+                        help=f"Seconds between scans (default CCB_SUPERVISOR_INTERVAL or {DEFAULT_INTERVAL})")
+    args = parser.parse_args(argv)
+    if not daemon_supported():
+        print("❌ ccb supervisor needs Unix domain sockets", file=sys.stderr)
+        return 1
+    try:
+        server = LogSupervisor(interval=args.interval)
+    except Exception as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 1
+    print(f"🔌 ccb log supervisor watching {', '.join(str(i.root) for i in server.indexes.values())} "
+          f"on {server.path}", flush=True)
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    print("👋 ccb log supervisor exited", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Bounded pane output capture
+Replacement for `cat >> log` under `tmux pipe-pane`: keeps a fixed-size ring of the most
+recent pane output plus a timestamp -> byte offset index, so disk usage stays flat and the
+latest N KB can be read without scanning the file.
+
+Files:
+  <log>      ring data region (never larger than capacity)
+  <log>.idx  header (capacity, total bytes written) + fixed-slot timestamp index
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+_MAGIC = b"CCBR"
+_VERSION = 1
+# magic, version, capacity, slots, total_written, index_count
+_HEADER = struct.Struct("<4sIQIQQ")
+# timestamp, absolute offset
+_SLOT = struct.Struct("<dQ")
+
+DEFAULT_CAPACITY = 4 * 1024 * 1024
+DEFAULT_SLOTS = 4096
+DEFAULT_INDEX_INTERVAL = 1.0
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return max(1, value)
+
+
+def default_capacity() -> int:
+    return _env_int("CCB_PANE_CAPTURE_BYTES", DEFAULT_CAPACITY)
+
+
+def index_path_for(log_path: Path) -> Path:
+    return log_path.with_name(log_path.name + ".idx")
+
+
+class PaneCaptureRing:
+    """Fixed-size ring of pane output with a timestamp index"""
+
+    def __init__(self, log_path: Path, capacity: Optional[int] = None, slots: int = DEFAULT_SLOTS,
+                 index_interval: float = DEFAULT_INDEX_INTERVAL):
+        self.log_path = Path(log_path)
+        self.index_path = index_path_for(self.log_path)
+        self.capacity = max(1, int(capacity or default_capacity()))
+        self.slots = max(1, int(slots))
+        self.index_interval = max(0.0, float(index_interval))
+        self._data_fd: Optional[int] = None
+        self._index_fd: Optional[int] = None
+        self._total = 0
+        self._index_count = 0
+        self._last_index_ts = 0.0
+
+    # ---- writer ----
+
+    def open_for_write(self) -> None:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._data_fd = os.open(self.log_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._index_fd = os.open(self.index_path, os.O_RDWR | os.O_CREAT, 0o644)
+        header = self._read_header(self._index_fd)
+        # Continue an existing ring only if its geometry matches; otherwise start over.
+        if header and header[2] == self.capacity and header[3] == self.slots:
+            self._total = header[4]
+            self._index_count = header[5]
+        else:
+            os.ftruncate(self._data_fd, 0)
+            os.ftruncate(self._index_fd, 0)
+            self._total = 0
+            self._index_count = 0
+            self._write_header()
+
+    def close(self) -> None:
+        for fd in (self._data_fd, self._index_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._data_fd = None
+        self._index_fd = None
+
+    def append(self, data: bytes, now: Optional[float] = None) -> None:
+        if not data or self._data_fd is None:
+            return
+        now = time.time() if now is None else now
+        if now - self._last_index_ts >= self.index_interval:
+            self._add_index(now, self._total)
+            self._last_index_ts = now
+
+        start_total = self._total
+        if len(data) > self.capacity:
+            # Only the tail can survive; skip the bytes that would be overwritten anyway.
+            skipped = len(data) - self.capacity
+            start_total += skipped
+            data = data[skipped:]
+        pos = start_total % self.capacity
+        first = min(len(data), self.capacity - pos)
+        os.pwrite(self._data_fd, data[:first], pos)
+        if first < len(data):
+            os.pwrite(self._data_fd, data[first:], 0)
+        self._total = start_total + len(data)
+        self._write_header()
+
+    def _add_index(self, ts: float, offset: int) -> None:
+        slot = self._index_count % self.slots
+        os.pwrite(self._index_fd, _SLOT.pack(ts, offset), _HEADER.size + slot * _SLOT.size)
+        self._index_count += 1
+
+    def _write_header(self) -> None:
+        header = _HEADER.pack(_MAGIC, _VERSION, self.capacity, self.slots, self._total, self._index_count)
+        os.pwrite(self._index_fd, header, 0)
+
+    # ---- reader ----
+
+    @staticmethod
+    def _read_header(fd: int) -> Optional[Tuple]:
+        raw = os.pread(fd, _HEADER.size, 0)
+        if len(raw) < _HEADER.size:
+            return None
+        header = _HEADER.unpack(raw)
+        if header[0] != _MAGIC or header[1] != _VERSION or header[2] <= 0 or header[3] <= 0:
+            return None
+        return header
+
+    @classmethod
+    def _load_header(cls, log_path: Path) -> Optional[Tuple]:
+        try:
+            fd = os.open(index_path_for(log_path), os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            return cls._read_header(fd)
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def read_tail(cls, log_path: Path, nbytes: int) -> bytes:
+        """Return the most recent `nbytes` of captured output (at most capacity)."""
+        log_path = Path(log_path)
+        header = cls._load_header(log_path)
+        if not header or nbytes <= 0:
+            return b""
+        total = header[4]
+        return cls._read_range(log_path, max(0, total - nbytes), total)
+
+    @classmethod
+    def read_since(cls, log_path: Path, since: float) -> bytes:
+        """Return captured output written at or after timestamp `since` (as far as the ring still holds it)."""
+        log_path = Path(log_path)
+        header = cls._load_header(log_path)
+        if not header:
+            return b""
+        total = header[4]
+        offset = cls.offset_at(log_path, since)
+        if offset is None:
+            return b""
+        return cls._read_range(log_path, offset, total)
+
+    @classmethod
+    def index_entries(cls, log_path: Path) -> List[Tuple[float, int]]:
+        """Index entries (timestamp, absolute offset), oldest first."""
+        log_path = Path(log_path)
+        header = cls._load_header(log_path)
+        if not header:
+            return []
+        slots, count = header[3], header[5]
+        try:
+            raw = index_path_for(log_path).read_bytes()[_HEADER.size:_HEADER.size + slots * _SLOT.size]
+        except OSError:
+            return []
+        live = min(count, slots)
+        first_slot = count % slots if count > slots else 0
+        entries: List[Tuple[float, int]] = []
+        for i in range(live):
+            slot = (first_slot + i) % slots
+            chunk = raw[slot * _SLOT.size:(slot + 1) * _SLOT.size]
+            if len(chunk) < _SLOT.size:
+                break
+            entries.append(_SLOT.unpack(chunk))
+        return entries
+
+    @classmethod
+    def offset_at(cls, log_path: Path, since: float) -> Optional[int]:
+        """Absolute offset of the first indexed write at or after `since`, None if nothing newer."""
+        entries = cls.index_entries(log_path)
+        lo, hi = 0, len(entries)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if entries[mid][0] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo >= len(entries):
+            return None
+        return entries[lo][1]
+
+    @classmethod
+    def _read_range(cls, log_path: Path, start: int, end: int) -> bytes:
+        header = cls._load_header(log_path)
+        if not header:
+            return b""
+        capacity = header[2]
+        start = max(start, end - capacity, 0)
+        if end <= start:
+            return b""
+        try:
+            fd = os.open(log_path, os.O_RDONLY)
+        except OSError:
+            return b""
+        try:
+            pos = start % capacity
+            length = end - start
+            first = min(length, capacity - pos)
+            data = os.pread(fd, first, pos)
+            if first < length:
+                data += os.pread(fd, length - first, 0)
+        finally:
+            os.close(fd)
+        # The writer may have lapped us while reading; drop anything that was overwritten.
+        latest = cls._load_header(log_path)
+        if latest and latest[4] - capacity > start:
+            data = data[latest[4] - capacity - start:]
+        return data
+
+
+def run_writer(log_path: Path, capacity: int) -> int:
+    ring = PaneCaptureRing(log_path, capacity=capacity)
+    ring.open_for_write()
+    try:
+        while True:
+            try:
+                chunk = os.read(sys.stdin.fileno(), 65536)
+            except InterruptedError:
+                continue
+            if not chunk:
+                break
+            ring.append(chunk)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bounded ring-buffer pane capture")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    write_parser = sub.add_parser("write", help="Append stdin to the ring (used by tmux pipe-pane)")
+    write_parser.add_argument("log", help="Ring data file")
+    write_parser.add_argument("--capacity", type=int, default=None, help="Ring size in bytes")
+
+    tail_parser = sub.add_parser("tail", help="Print the most recent captured output")
+    tail_parser.add_argument("log", help="Ring data file")
+    tail_parser.add_argument("--bytes", type=int, default=16 * 1024, help="Number of bytes to print")
+    tail_parser.add_argument("--since", type=float, default=None, help="Print output since UNIX timestamp")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    log_path = Path(args.log).expanduser()
+    if args.command == "write":
+        return run_writer(log_path, args.capacity or default_capacity())
+    if args.since is not None:
+        data = PaneCaptureRing.read_since(log_path, args.since)
+    else:
+        data = PaneCaptureRing.read_tail(log_path, args.bytes)
+    sys.stdout.buffer.write(data)
+    sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
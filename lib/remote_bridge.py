@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Remote bridge transport
+Newline-framed JSON over TCP (optionally TLS), so the Claude host can drive Codex/Gemini panes
+that run on another machine. The server runs next to the provider pane: it submits asks through
+the local communicator and streams replies back from its own log tailer, so remote clients never
+read ~/.codex or ~/.gemini.
+
+Server:
+  Codex bridge:  CCB_BRIDGE_LISTEN=127.0.0.1:8765 (or codex_dual_bridge.py --listen ...)
+  standalone:    python lib/remote_bridge.py serve --provider gemini --listen 0.0.0.0:8766
+Client:
+  CCB_CODEX_REMOTE=host:8765 / CCB_GEMINI_REMOTE=tls://host:8766
+
+Auth: every frame carries CCB_BRIDGE_TOKEN; a token is mandatory unless listening on loopback, and
+once configured it is checked on loopback too.
+TLS: server CCB_BRIDGE_TLS_CERT / CCB_BRIDGE_TLS_KEY; client tls:// plus optional CCB_BRIDGE_TLS_CA.
+A non-loopback listener without TLS is refused unless CCB_BRIDGE_INSECURE=1 (the token and every
+prompt would cross the network in clear text).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hmac
+import os
+import socket
+import socketserver
+import ssl
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bridge_protocol import (
+    BridgeBackpressureError,
+    RequestCancelledError,
+    RequestFramer,
+    encode_request,
+)
+
+PROVIDERS = ("codex", "gemini")
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return max(0.0, value)
+
+
+def parse_address(address: str) -> Tuple[str, int, bool]:
+    """"host:port" or "tls://host:port" -> (host, port, tls)"""
+    value = address.strip()
+    tls = False
+    for scheme in ("tls://", "tcp://"):
+        if value.lower().startswith(scheme):
+            tls = scheme == "tls://"
+            value = value[len(scheme):]
+    host, sep, port = value.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Invalid bridge address: {address} (expected host:port)")
+    return host.strip("[]") or "127.0.0.1", int(port), tls
+
+
+def remote_address(provider: str) -> Optional[str]:
+    """Remote bridge address configured for `provider` (CCB_CODEX_REMOTE / CCB_GEMINI_REMOTE)"""
+    return (os.environ.get(f"CCB_{provider.upper()}_REMOTE") or "").strip() or None
+
+
+def _is_loopback(host: str) -> bool:
+    return host in ("localhost", "127.0.0.1", "::1") or host.startswith("127.")
+
+
+def _insecure_allowed() -> bool:
+    return (os.environ.get("CCB_BRIDGE_INSECURE") or "").lower() in {"1", "true", "yes", "on"}
+
+
+# ---- server ----
+
+def _codex_factory():
+    from codex_comm import CodexCommunicator
+    return CodexCommunicator(lazy_init=True)
+
+
+def _gemini_factory():
+    from gemini_comm import GeminiCommunicator
+    return GeminiCommunicator(lazy_init=True)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "RemoteBridgeServer"
+
+    def setup(self) -> None:
+        self._lock = threading.Lock()
+        if isinstance(self.request, ssl.SSLSocket):
+            self.request.do_handshake()
+
+    def _send(self, frame: Dict[str, Any]) -> None:
+        with self._lock:
+            self.request.sendall(encode_request(frame))
+
+    def handle(self) -> None:
+        framer = RequestFramer()
+        while True:
+            try:
+                data = self.request.recv(65536)
+            except (OSError, ssl.SSLError):
+                return
+            if not data:
+                return
+            for frame in framer.feed(data):
+                if not self.server.authorized(frame.get("token")):
+                    self._send({"op": "error", "code": "unauthorized", "error": "Invalid bridge token"})
+                    return
+                try:
+                    self.server.dispatch(frame, self._send)
+                except (OSError, ssl.SSLError):
+                    return
+                except Exception as exc:
+                    self._send({"op": "error", "code": "error", "error": str(exc)})
+
+
+class RemoteBridgeServer(socketserver.ThreadingTCPServer):
+    """Serves ask / cancel / ping / status / turn / pending for one provider"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, provider: str, listen: str, token: Optional[str] = None,
+                 tls_cert: Optional[str] = None, tls_key: Optional[str] = None,
+                 factory: Optional[Callable[[], Any]] = None):
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown provider: {provider}")
+        host, port, _ = parse_address(listen)
+        self.provider = provider
+        self.token = token or os.environ.get("CCB_BRIDGE_TOKEN") or None
+        if not self.token and not _is_loopback(host):
+            raise RuntimeError(f"Refusing to listen on {host} without CCB_BRIDGE_TOKEN")
+        tls_cert = tls_cert or os.environ.get("CCB_BRIDGE_TLS_CERT")
+        tls_key = tls_key or os.environ.get("CCB_BRIDGE_TLS_KEY")
+        if not tls_cert and not _is_loopback(host) and not _insecure_allowed():
+            raise RuntimeError(f"Refusing to listen on {host} without TLS "
+                               "(set CCB_BRIDGE_TLS_CERT/CCB_BRIDGE_TLS_KEY, or CCB_BRIDGE_INSECURE=1)")
+        self._ssl: Optional[ssl.SSLContext] = None
+        if tls_cert:
+            self._ssl = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self._ssl.load_cert_chain(tls_cert, tls_key)
+        self._factory = factory or (_codex_factory if provider == "codex" else _gemini_factory)
+        # Never let the server's own communicators point back at a remote bridge.
+        os.environ.pop(f"CCB_{provider.upper()}_REMOTE", None)
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        self.address_family = family
+        super().__init__((host, port), _Handler)
+
+    def get_request(self):
+        sock, addr = self.socket.accept()
+        if self._ssl is not None:
+            # Handshake happens in the handler thread, not in the accept loop.
+            sock = self._ssl.wrap_socket(sock, server_side=True, do_handshake_on_connect=False)
+        return sock, addr
+
+    @property
+    def address(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{'tls://' if self._ssl else ''}{host}:{port}"
+
+    def authorized(self, token: Any) -> bool:
+        if not self.token:
+            return True
+        return isinstance(token, str) and hmac.compare_digest(token, self.token)
+
+    def start_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name=f"ccb-remote-{self.provider}", daemon=True)
+        thread.start()
+        return thread
+
+    def dispatch(self, frame: Dict[str, Any], send: Callable[[Dict[str, Any]], None]) -> None:
+        op = frame.get("op")
+        comm = self._factory()
+        if op == "ping":
+            healthy, status = comm._check_session_health_impl(probe_terminal=bool(frame.get("probe", True)))
+            send({"op": "pong", "healthy": healthy, "status": status})
+        elif op == "status":
+            send({"op": "status", "status": comm.get_status()})
+        elif op == "turn":
+            turn = comm.turn_status() if hasattr(comm, "turn_status") else {"source": "remote", "turn": "unknown"}
+            send({"op": "turn", "turn": turn})
+        elif op == "pending":
+            result = comm.consume_pending(display=False, n=max(1, int(frame.get("n") or 1)))
+            if isinstance(result, list):
+                send({"op": "pending", "conversations": [list(pair) for pair in result]})
+            else:
+                send({"op": "pending", "reply": result})
+        elif op == "cancel":
+            send({"op": "cancelled", "interrupted": bool(comm.cancel(str(frame.get("marker") or "")))})
+        elif op == "ask":
+            self._ask(comm, frame, send)
+        else:
+            send({"op": "error", "code": "error", "error": f"Unknown op: {op}"})
+
+    def _ask(self, comm: Any, frame: Dict[str, Any], send: Callable[[Dict[str, Any]], None]) -> None:
+        healthy, status = comm._check_session_health_impl(probe_terminal=False)
+        if not healthy:
+            send({"op": "error", "code": "unhealthy", "error": f"Session error: {status}"})
+            return
+        content = str(frame.get("content") or "")
+        try:
+            if self.provider == "codex":
+                marker, state = comm._send_message(content, coalesce=frame.get("coalesce"),
+                                                   deadline=frame.get("deadline"), priority=frame.get("priority"))
+            else:
+                marker, state = comm._send_message(content)
+        except BridgeBackpressureError as exc:
+            send({"op": "error", "code": "backpressure", "error": str(exc)})
+            return
+        send({"op": "accepted", "marker": marker})
+        timeout = float(frame.get("timeout") or 3600.0)
+        try:
+            reply, _ = comm.wait_for_reply(marker, state, timeout)
+        except RequestCancelledError:
+            send({"op": "reply", "marker": marker, "status": "cancelled", "reply": None})
+            return
+        send({"op": "reply", "marker": marker, "status": "ok" if reply else "timeout", "reply": reply})
+
+
+# ---- client ----
+
+def raise_for_error(frame: Dict[str, Any]) -> Dict[str, Any]:
+    """The frame itself, or the exception an error frame stands for"""
+    if frame.get("op") == "error":
+        if frame.get("code") == "backpressure":
+            raise BridgeBackpressureError(frame.get("error") or "Remote bridge queue full")
+        raise RuntimeError(f"Remote bridge: {frame.get('error')}")
+    return frame
+
+
+class RemoteAsk:
+    """An ask in flight on its own connection; wait() returns the reply frame"""
+
+    def __init__(self, client: "RemoteBridgeClient", sock: socket.socket, framer: RequestFramer,
+                 pending: List[Dict[str, Any]], marker: str):
+        self.client = client
+        self.marker = marker
+        self._sock = sock
+        self._framer = framer
+        self._pending = pending
+
+    def wait(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return self.client._read_frame(self._sock, self._framer, self._pending, timeout, op="reply")
+        except socket.timeout:
+            return None
+
+    def close(self) -> None:
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RemoteBridgeClient:
+    """Client transport for a remote bridge"""
+
+    def __init__(self, address: str, token: Optional[str] = None, connect_timeout: Optional[float] = None):
+        self.address = address
+        self.host, self.port, self.tls = parse_address(address)
+        self.token = token if token is not None else (os.environ.get("CCB_BRIDGE_TOKEN") or None)
+        self.connect_timeout = (connect_timeout if connect_timeout is not None
+                                else _env_float("CCB_BRIDGE_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT))
+
+    def _connect(self) -> socket.socket:
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        except OSError as exc:
+            raise RuntimeError(f"Cannot reach remote bridge {self.address}: {exc}")
+        if self.tls:
+            sock = self.ssl_context().wrap_socket(sock, server_hostname=self.host)
+        return sock
+
+    def ssl_context(self) -> Optional[ssl.SSLContext]:
+        if not self.tls:
+            return None
+        return ssl.create_default_context(cafile=os.environ.get("CCB_BRIDGE_TLS_CA") or None)
+
+    def _read_frame(self, sock: socket.socket, framer: RequestFramer, pending: List[Dict[str, Any]],
+                    timeout: Optional[float], op: Optional[str] = None) -> Dict[str, Any]:
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            while pending:
+                frame = raise_for_error(pending.pop(0))
+                if op is None or frame.get("op") == op:
+                    return frame
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                raise socket.timeout("timed out")
+            sock.settimeout(remaining)
+            data = sock.recv(65536)
+            if not data:
+                raise RuntimeError(f"Remote bridge {self.address} closed the connection")
+            pending.extend(framer.feed(data))
+
+    def request(self, frame: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """One-shot request: send a frame and return the server's single response"""
+        sock = self._connect()
+        try:
+            sock.sendall(encode_request({**frame, "token": self.token}))
+            try:
+                return self._read_frame(sock, RequestFramer(), [], timeout or self.connect_timeout)
+            except socket.timeout:
+                raise RuntimeError(f"Remote bridge {self.address} did not answer")
+        finally:
+            sock.close()
+
+    def ask(self, content: str, timeout: float, **options: Any) -> RemoteAsk:
+        """Submit an ask; returns once the server accepted it (the reply is read from RemoteAsk.wait)"""
+        sock = self._connect()
+        framer = RequestFramer()
+        pending: List[Dict[str, Any]] = []
+        frame = {"op": "ask", "token": self.token, "content": content, "timeout": timeout}
+        frame.update({key: value for key, value in options.items() if value is not None})
+        try:
+            sock.sendall(encode_request(frame))
+            accepted = self._read_frame(sock, framer, pending, self.connect_timeout, op="accepted")
+        except socket.timeout:
+            sock.close()
+            raise RuntimeError(f"Remote bridge {self.address} did not accept the request")
+        except Exception:
+            sock.close()
+            raise
+        return RemoteAsk(self, sock, framer, pending, str(accepted.get("marker") or ""))
+
+    # Communicator-shaped helpers
+
+    def health(self, probe: bool = True) -> Tuple[bool, str]:
+        try:
+            frame = self.request({"op": "ping", "probe": probe})
+        except RuntimeError as exc:
+            return False, str(exc)
+        return bool(frame.get("healthy")), f"{frame.get('status') or ''} via {self.address}"
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self.request({"op": "status"}).get("status") or {})
+
+    def turn(self) -> Dict[str, Any]:
+        return dict(self.request({"op": "turn"}).get("turn") or {})
+
+    def pending(self, n: int = 1):
+        frame = self.request({"op": "pending", "n": n})
+        if "conversations" in frame:
+            return [tuple(pair) for pair in frame["conversations"]] or None
+        return frame.get("reply")
+
+    def cancel(self, marker: str) -> bool:
+        return bool(self.request({"op": "cancel", "marker": marker}).get("interrupted"))
+
+
+def wait_remote_reply(state: Dict[str, Any], timeout: float) -> Optional[str]:
+    """Reply for a RemoteAsk kept in a communicator's send state; raises RequestCancelledError"""
+    ask: Optional[RemoteAsk] = state.get("remote_ask")
+    if ask is None:
+        return None
+    frame = ask.wait(timeout)
+    if frame is None:
+        return None
+    ask.close()
+    if frame.get("status") == "cancelled":
+        raise RequestCancelledError(f"Request {ask.marker} was cancelled")
+    return frame.get("reply")
+
+
+# ---- CLI ----
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Remote bridge transport")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Serve a provider session over TCP/TLS")
+    serve.add_argument("--provider", choices=PROVIDERS, required=True)
+    serve.add_argument("--listen", default=os.environ.get("CCB_BRIDGE_LISTEN") or "127.0.0.1:8765",
+                       help="host:port to listen on")
+    ping = sub.add_parser("ping", help="Check a remote bridge")
+    ping.add_argument("address", help="host:port or tls://host:port")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.command == "ping":
+        healthy, status = RemoteBridgeClient(args.address).health()
+        print(f"✅ {status}" if healthy else f"❌ {status}")
+        return 0 if healthy else 1
+    try:
+        server = RemoteBridgeServer(args.provider, args.listen)
+    except Exception as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 1
+    print(f"🌐 Serving {args.provider} on {server.address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
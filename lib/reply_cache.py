@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Opt-in reply cache (CCB_REPLY_CACHE=1 or --cache; --no-cache bypasses it)
+Replies are kept per provider session in <runtime_dir>/reply_cache, one file per prompt, keyed by
+provider, the bound provider session (Codex session id, Gemini chat id or file; never the ccb
+session, which outlives /clear and /chat) and the whitespace-normalized prompt. Until a provider
+session is bound there is nothing to key on, so the cache is skipped. Entries expire after
+CCB_REPLY_CACHE_TTL seconds; beyond CCB_REPLY_CACHE_MAX entries the least recently used go first
+(a hit touches the file, so mtime is the LRU clock).
+Kept import-light: a hit is answered before any communicator is opened.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CACHE_DIR = "reply_cache"
+DEFAULT_TTL = 3600.0
+DEFAULT_MAX_ENTRIES = 256
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("CCB_REPLY_CACHE", "").lower() in {"1", "true", "yes", "on"}
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.split())
+
+
+def _session_info(provider: str) -> Optional[Dict[str, Any]]:
+    """
+    The provider's runtime dir and session ids, as its communicator would load them (no remotes);
+    the provider session binding always comes from the project session file
+    """
+    prefix = provider.upper()
+    if os.environ.get(f"CCB_{prefix}_REMOTE"):
+        return None
+    try:
+        from session_utils import session_file_path
+
+        data = json.loads(session_file_path(provider).read_text(encoding="utf-8-sig"))
+    except (OSError, ValueError):
+        data = None
+    data = data if isinstance(data, dict) else {}
+    if os.environ.get(f"{prefix}_SESSION_ID"):
+        return {**data, "session_id": os.environ[f"{prefix}_SESSION_ID"],
+                "runtime_dir": os.environ.get(f"{prefix}_RUNTIME_DIR", "")}
+    return data if data.get("active") else None
+
+
+class ReplyCache:
+    def __init__(self, directory: Path, provider: str, session: str,
+                 ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.directory = Path(directory)
+        self.provider = provider
+        self.session = session
+        self.ttl = _env_float("CCB_REPLY_CACHE_TTL", DEFAULT_TTL) if ttl is None else ttl
+        self.max_entries = _env_int("CCB_REPLY_CACHE_MAX", DEFAULT_MAX_ENTRIES) if max_entries is None else max_entries
+
+    def _path(self, prompt: str) -> Path:
+        import hashlib
+
+        key = "\0".join((self.provider, self.session, normalize_prompt(prompt)))
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """The cached entry ({"reply", "created_at", ...}) for `prompt`, or None (missing or expired)"""
+        path = self._path(prompt)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not entry.get("reply"):
+            return None
+        if self.ttl > 0 and time.time() - float(entry.get("created_at") or 0.0) > self.ttl:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, prompt: str, reply: str) -> None:
+        from cli_output import atomic_write_text
+
+        entry = {"provider": self.provider, "session": self.session, "prompt": normalize_prompt(prompt)[:200],
+                 "reply": reply, "created_at": time.time()}
+        try:
+            atomic_write_text(self._path(prompt), json.dumps(entry, ensure_ascii=False))
+            self._evict()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        entries = []
+        now = time.time()
+        for path in self.directory.glob("*.json"):
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if self.ttl > 0 and now - mtime > self.ttl:
+                # Not even read within the TTL, so it has expired too.
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((mtime, path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - max(1, self.max_entries))]:
+            path.unlink(missing_ok=True)
+
+
+def reply_cache(provider: str, force: Optional[bool] = None) -> Optional[ReplyCache]:
+    """
+    The cache for the current project's `provider` session; None if disabled, there is no local
+    session or it has no provider session bound yet
+    """
+    if not (cache_enabled() if force is None else force):
+        return None
+    info = _session_info(provider)
+    if not info or not info.get("runtime_dir"):
+        return None
+    session = info.get(f"{provider}_session_id") or info.get(f"{provider}_session_path")
+    if not session:
+        return None
+    return ReplyCache(Path(info["runtime_dir"]) / CACHE_DIR, provider, str(session))
+
+
+def describe_age(entry: Dict[str, Any]) -> str:
+    seconds = max(0, int(time.time() - float(entry.get("created_at") or 0.0)))
+    return f"{seconds // 60}m{seconds % 60:02d}s" if seconds >= 60 else f"{seconds}s"
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Per-user resume registry
+<XDG_CACHE_HOME or ~/.cache>/ccb/resume.json maps a normalized work dir (plus CCB_INSTANCE) to the
+provider sessions last bound there: Codex session id and log, Gemini project hash, Claude session id
+and log. `ccb up -r` and `ccb restore` answer from it with a stat instead of walking ~/.codex/sessions,
+the Gemini chats dirs or ~/.claude/projects, and scan only on a miss or a stale entry.
+
+Written by ccb cleanup(), by ccb after a resume scan, and by the communicators whenever they bind a
+new provider session. Last writer wins; a lost update only costs the next resume one scan.
+CCB_RESUME_REGISTRY overrides the path (0 disables the registry).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+MAX_ENTRIES = 500
+
+
+def registry_path() -> Optional[Path]:
+    override = (os.environ.get("CCB_RESUME_REGISTRY") or "").strip()
+    if override.lower() in {"0", "false", "no", "off"}:
+        return None
+    if override:
+        return Path(override).expanduser()
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home).expanduser() / "ccb" / "resume.json"
+
+
+def registry_key(work_dir: Optional[Path] = None) -> str:
+    try:
+        path = Path(work_dir or Path.cwd()).resolve()
+    except OSError:
+        path = Path(work_dir or Path.cwd()).absolute()
+    key = os.path.normcase(str(path))
+    instance = (os.environ.get("CCB_INSTANCE") or "").strip()
+    return f"{key}#{instance}" if instance else key
+
+
+def _load(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def lookup(work_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Everything recorded for `work_dir` (default cwd) and this instance; {} on a miss"""
+    path = registry_path()
+    if path is None:
+        return {}
+    entry = _load(path).get(registry_key(work_dir))
+    return entry if isinstance(entry, dict) else {}
+
+
+def record(work_dir: Optional[Path] = None, **fields: Any) -> None:
+    """Merge `fields` (None values are skipped) into the entry of `work_dir`; never raises"""
+    path = registry_path()
+    fields = {k: str(v) for k, v in fields.items() if v}
+    if path is None or not fields:
+        return
+    data = _load(path)
+    key = registry_key(work_dir)
+    entry = data.get(key) if isinstance(data.get(key), dict) else {}
+    if all(entry.get(k) == v for k, v in fields.items()):
+        return
+    entry.update(fields)
+    entry["updated_at"] = time.time()
+    data[key] = entry
+    if len(data) > MAX_ENTRIES:
+        newest = sorted(data, key=lambda k: (data[k] or {}).get("updated_at") or 0, reverse=True)
+        data = {k: data[k] for k in newest[:MAX_ENTRIES]}
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            tmp.unlink()
+        except Exception:
+            pass
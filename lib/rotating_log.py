@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Buffered, size-rotated log files
+Keeps the handle open, buffers writes and flushes on an interval / buffer limit / close.
+Files rotate at a size limit to <name>.1 .. <name>.N (optionally gzip'ed in a background thread),
+and the compaction tool moves rotated history segments into a pack of compressed blocks with a
+small JSON index.
+
+Usage:
+  python lib/rotating_log.py compact RUNTIME/history/session.jsonl [--output PACK]
+  python lib/rotating_log.py show PACK [--marker MARKER] [--since ISO_TIMESTAMP]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_BUFFER_BYTES = 64 * 1024
+PACK_BLOCK_ENTRIES = 256
+
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return max(minimum, value)
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return max(0.0, value)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() not in {"0", "false", "no", "off"}
+
+
+class RotatingLogWriter:
+    """Append-only text log with an open handle, bounded buffering and size-based rotation"""
+
+    def __init__(self, path: Path, max_bytes: Optional[int] = None, backups: Optional[int] = None,
+                 compress: Optional[bool] = None, flush_interval: Optional[float] = None,
+                 buffer_bytes: Optional[int] = None):
+        self.path = Path(path)
+        self.max_bytes = max_bytes if max_bytes is not None else _env_int("CCB_LOG_MAX_BYTES", DEFAULT_MAX_BYTES)
+        self.backups = backups if backups is not None else _env_int("CCB_LOG_BACKUPS", DEFAULT_BACKUPS, minimum=0)
+        self.compress = compress if compress is not None else _env_bool("CCB_LOG_COMPRESS", True)
+        self.flush_interval = (flush_interval if flush_interval is not None
+                               else _env_float("CCB_LOG_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL))
+        self.buffer_bytes = buffer_bytes if buffer_bytes is not None else _env_int("CCB_LOG_BUFFER_BYTES", DEFAULT_BUFFER_BYTES)
+        self._handle = None
+        self._size = 0
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._first_pending_at = 0.0
+        self._compressor: Optional[threading.Thread] = None
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        if not data:
+            return
+        if not self._pending:
+            self._first_pending_at = time.time()
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        if self._pending_bytes >= self.buffer_bytes or not self.flush_interval:
+            self.flush()
+
+    def flush_due(self) -> None:
+        """Flush if the oldest buffered write is older than flush_interval"""
+        if self._pending and time.time() - self._first_pending_at >= self.flush_interval:
+            self.flush()
+
+    def next_flush_in(self) -> Optional[float]:
+        """Seconds until buffered data is due (None if nothing is buffered)"""
+        if not self._pending:
+            return None
+        return max(0.0, self._first_pending_at + self.flush_interval - time.time())
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        self._pending = []
+        self._pending_bytes = 0
+        handle = self._open()
+        handle.write(data)
+        handle.flush()
+        self._size += len(data)
+        if self.max_bytes and self._size >= self.max_bytes:
+            self._rotate()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            self._wait_compressor()
+
+    def _open(self):
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = self.path.open("ab")
+            self._size = self._handle.tell()
+        return self._handle
+
+    def _wait_compressor(self) -> None:
+        if self._compressor is not None:
+            self._compressor.join()
+            self._compressor = None
+
+    def _rotate(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        # The previous segment must be compressed before the shift below renames it.
+        self._wait_compressor()
+        if self.backups <= 0:
+            self.path.unlink(missing_ok=True)
+            self._size = 0
+            return
+        for index in range(self.backups, 0, -1):
+            for segment in (_segment_path(self.path, index, False), _segment_path(self.path, index, True)):
+                if not segment.exists():
+                    continue
+                if index == self.backups:
+                    segment.unlink(missing_ok=True)
+                else:
+                    os.replace(segment, _segment_path(self.path, index + 1, segment.suffix == ".gz"))
+        first = _segment_path(self.path, 1, False)
+        os.replace(self.path, first)
+        if self.compress:
+            # gzip of a full segment takes long enough to stall the bridge's select loop.
+            self._compressor = threading.Thread(
+                target=_compress_segment, args=(first, _segment_path(self.path, 1, True)),
+                name="ccb-log-compress", daemon=True,
+            )
+            self._compressor.start()
+        self._size = 0
+
+
+def _compress_segment(src: Path, dst: Path) -> None:
+    """gzip `src` to `dst` and drop `src`; on failure the plain segment stays in place"""
+    tmp = dst.with_name(dst.name + ".tmp")
+    try:
+        with src.open("rb") as plain, gzip.open(tmp, "wb") as packed:
+            shutil.copyfileobj(plain, packed)
+        os.replace(tmp, dst)
+        src.unlink(missing_ok=True)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def _segment_path(path: Path, index: int, compressed: bool) -> Path:
+    return path.with_name(f"{path.name}.{index}{'.gz' if compressed else ''}")
+
+
+def log_segments(path: Path) -> List[Path]:
+    """Rotated segments and the live file, oldest first"""
+    path = Path(path)
+    rotated: Dict[int, Path] = {}
+    for candidate in path.parent.glob(f"{path.name}.*"):
+        parts = candidate.name[len(path.name) + 1:].split(".")
+        if parts and parts[0].isdigit() and (len(parts) == 1 or parts[1:] == ["gz"]):
+            # Mid-compression both forms can exist; the .gz only appears once complete.
+            index = int(parts[0])
+            if index not in rotated or candidate.suffix == ".gz":
+                rotated[index] = candidate
+    segments = [rotated[index] for index in sorted(rotated, reverse=True)]
+    if path.exists():
+        segments.append(path)
+    return segments
+
+
+def _iter_lines(segment: Path) -> Iterator[bytes]:
+    opener = gzip.open if segment.suffix == ".gz" else open
+    with opener(segment, "rb") as handle:
+        for line in handle:
+            if line.strip():
+                yield line if line.endswith(b"\n") else line + b"\n"
+
+
+# ---- history compaction ----
+
+def _load_pack_index(pack: Path) -> Dict[str, Any]:
+    return json.loads(pack.with_name(pack.name + ".idx").read_text(encoding="utf-8"))
+
+
+def compact_history(history: Path, output: Path, block_entries: int = PACK_BLOCK_ENTRIES) -> Dict[str, Any]:
+    """
+    Move the rotated history segments into `output` as zlib blocks of `block_entries` JSON lines,
+    after any blocks already packed there. The live file is left alone.
+    The index (<output>.idx) lists each block's byte range, time range and markers.
+    """
+    segments = [s for s in log_segments(history) if s != history]
+    previous: Dict[str, Any] = {}
+    if output.exists():
+        try:
+            previous = _load_pack_index(output)
+        except (OSError, ValueError):
+            raise RuntimeError(f"Pack index missing or unreadable for {output}")
+    blocks: List[Dict[str, Any]] = []
+    tmp = output.with_name(output.name + ".tmp")
+    entries = int(previous.get("entries") or 0)
+    with tmp.open("wb") as out:
+        if previous:
+            with output.open("rb") as old:
+                for block in previous.get("blocks", []):
+                    old.seek(block["offset"])
+                    blob = old.read(block["length"])
+                    blocks.append({**block, "offset": out.tell()})
+                    out.write(blob)
+        batch: List[bytes] = []
+        meta: List[Dict[str, Any]] = []
+
+        def flush_block() -> None:
+            if not batch:
+                return
+            blob = zlib.compress(b"".join(batch), 9)
+            timestamps = [m.get("timestamp") for m in meta if m.get("timestamp")]
+            blocks.append({
+                "offset": out.tell(),
+                "length": len(blob),
+                "count": len(batch),
+                "first_ts": min(timestamps) if timestamps else None,
+                "last_ts": max(timestamps) if timestamps else None,
+                "markers": sorted({m.get("marker") for m in meta if m.get("marker")}),
+            })
+            out.write(blob)
+            batch.clear()
+            meta.clear()
+
+        for segment in segments:
+            for line in _iter_lines(segment):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                batch.append(line)
+                meta.append(entry)
+                entries += 1
+                if len(batch) >= block_entries:
+                    flush_block()
+        flush_block()
+    index = {
+        "version": 1,
+        "entries": entries,
+        "segments": list(previous.get("segments") or []) + [s.name for s in segments],
+        "blocks": blocks,
+    }
+    index_path = output.with_name(output.name + ".idx")
+    index_tmp = index_path.with_name(index_path.name + ".tmp")
+    index_tmp.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, output)
+    os.replace(index_tmp, index_path)
+    # Packed segments are now redundant.
+    for segment in segments:
+        segment.unlink(missing_ok=True)
+    return index
+
+
+def read_pack(pack: Path, marker: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Entries from a history pack, decompressing only the blocks the index says can match"""
+    index = _load_pack_index(pack)
+    results: List[Dict[str, Any]] = []
+    with pack.open("rb") as handle:
+        for block in index.get("blocks", []):
+            if marker and marker not in block.get("markers", []):
+                continue
+            if since and block.get("last_ts") and block["last_ts"] < since:
+                continue
+            handle.seek(block["offset"])
+            for line in zlib.decompress(handle.read(block["length"])).splitlines():
+                entry = json.loads(line)
+                if marker and entry.get("marker") != marker:
+                    continue
+                if since and (entry.get("timestamp") or "") < since:
+                    continue
+                results.append(entry)
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rotating log utilities")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    compact_parser = sub.add_parser("compact", help="Move rotated history segments into an indexed pack")
+    compact_parser.add_argument("history", help="Live history file (e.g. RUNTIME/history/session.jsonl)")
+    compact_parser.add_argument("--output", help="Pack file (default: <history>.pack)")
+
+    show_parser = sub.add_parser("show", help="Print entries from a history pack as JSON lines")
+    show_parser.add_argument("pack", help="Pack file")
+    show_parser.add_argument("--marker", help="Only entries for this request marker")
+    show_parser.add_argument("--since", help="Only entries at or after this ISO timestamp")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.command == "compact":
+        history = Path(args.history).expanduser()
+        output = Path(args.output).expanduser() if args.output else history.with_name(history.name + ".pack")
+        index = compact_history(history, output)
+        print(f"✅ Pack holds {index['entries']} entries from {len(index['segments'])} segment(s) "
+              f"in {len(index['blocks'])} block(s): {output}")
+        return 0
+    for entry in read_pack(Path(args.pack).expanduser(), marker=args.marker, since=args.since):
+        sys.stdout.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
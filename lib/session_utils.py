@@ -1,13 +1,33 @@
 #!/usr/bin/env python3
 """
-session_utils.py - Session file permission check utility
+session_utils.py - Session file location and permission check utility
 """
 from __future__ import annotations
 import os
+import re
 import stat
 from pathlib import Path
 from typing import Tuple, Optional
 
+# `ccb up --name X` namespaces one ccb instance; children and bin/* tools see it as CCB_INSTANCE.
+INSTANCE_ENV = "CCB_INSTANCE"
+_INSTANCE_RE = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+
+def instance_name() -> str:
+    """The ccb instance namespace ("" for the default instance); ValueError if CCB_INSTANCE is malformed"""
+    value = (os.environ.get(INSTANCE_ENV) or "").strip()
+    if value and not _INSTANCE_RE.match(value):
+        raise ValueError(f"invalid {INSTANCE_ENV} {value!r} (letters, digits, '-' and '_', at most 32)")
+    return value
+
+
+def session_file_path(provider: str, work_dir: Optional[Path] = None) -> Path:
+    """The project session file of `provider` for the current instance: .codex-session or .codex-session-X"""
+    name = instance_name()
+    filename = f".{provider}-session-{name}" if name else f".{provider}-session"
+    return Path(work_dir or Path.cwd()) / filename
+
 
 def check_session_writable(session_file: Path) -> Tuple[bool, Optional[str], Optional[str]]:
     """
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Startup-latency budget for the bin/ entry points
+Runs each entry point under `python -X importtime` up to its first real action (session lookup in
+an empty project, so nothing is sent) and reports wall time, import time and the heaviest imports.
+The ENTRY:session cases run again against a stub session file, so the communicator and terminal
+modules load as they do on a live session (the stub's pane does not exist, so nothing is sent).
+Bytecode goes to a scratch PYTHONPYCACHEPREFIX and one warm-up run per entry point is discarded, so
+a clean checkout (no __pycache__) is measured like an installed one instead of timing compilation.
+Exits 1 when an entry point's import time exceeds the budget, so it can guard against regressions.
+
+Usage:
+  python lib/startup_budget.py [--runs 5] [--budget-ms 50] [--top 5] [--json] [ENTRY ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+BIN_DIR = Path(__file__).resolve().parent.parent / "bin"
+DEFAULT_BUDGET_MS = 50.0
+# Arguments that drive each entry point through its normal import path to the first action.
+ENTRY_ARGS: Dict[str, List[str]] = {
+    "cask": ["--timeout", "1", "startup-budget-probe"],
+    "cask-w": ["--timeout", "1", "startup-budget-probe"],
+    "gask": ["--timeout", "1", "startup-budget-probe"],
+    "gask-w": ["--timeout", "1", "startup-budget-probe"],
+    "cpend": [],
+    "gpend": [],
+    "cping": [],
+    "gping": [],
+}
+# Provider of each stub-session case; the entry point's own arguments are reused.
+SESSION_ENTRIES: Dict[str, str] = {
+    "cask:session": "codex",
+    "cpend:session": "codex",
+    "cping:session": "codex",
+    "gask:session": "gemini",
+    "gpend:session": "gemini",
+    "gping:session": "gemini",
+}
+# Session env that would point the probe at a live session.
+_SESSION_ENV_PREFIXES = ("CODEX_", "GEMINI_", "CCB_CODEX_REMOTE", "CCB_GEMINI_REMOTE")
+
+
+def _probe_env(scratch: Path) -> Dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if not k.startswith(_SESSION_ENV_PREFIXES)}
+    env["CCB_DAEMON"] = "0"
+    env["CODEX_SESSION_ROOT"] = str(scratch / "codex")
+    env["GEMINI_ROOT"] = str(scratch / "gemini")
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPYCACHEPREFIX"] = str(scratch / "pycache")
+    return env
+
+
+def _write_stub_session(scratch: Path, provider: str) -> None:
+    runtime_dir = scratch / "runtime" / provider
+    runtime_dir.mkdir(parents=True, exist_ok=True)
+    stub = {
+        "session_id": "startup-budget-probe",
+        "runtime_dir": str(runtime_dir),
+        "input_fifo": str(runtime_dir / "input.fifo"),
+        "terminal": "tmux",
+        "tmux_session": "ccb-startup-budget-probe",
+        "pane_id": "ccb-startup-budget-probe",
+        "work_dir": str(scratch),
+        "active": True,
+    }
+    (scratch / f".{provider}-session").write_text(json.dumps(stub), encoding="utf-8")
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """(total ms, [(module, cumulative ms)] for top-level imports) from -X importtime output"""
+    top: List[Tuple[str, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        cumulative_us, name = parts[1], parts[2]
+        # Nesting is two spaces per level after the separator; depth 0 is " name".
+        if name.startswith("   "):
+            continue
+        top.append((name.strip(), int(cumulative_us) / 1000.0))
+    return sum(ms for _, ms in top), top
+
+
+def measure(entry: str, runs: int) -> Dict[str, Any]:
+    name = entry.split(":", 1)[0]
+    script = BIN_DIR / name
+    walls: List[float] = []
+    best: Tuple[float, List[Tuple[str, float]]] = (float("inf"), [])
+    with tempfile.TemporaryDirectory(prefix="ccb-startup-") as tmp:
+        scratch = Path(tmp)
+        env = _probe_env(scratch)
+        if entry in SESSION_ENTRIES:
+            _write_stub_session(scratch, SESSION_ENTRIES[entry])
+        command = [sys.executable, "-X", "importtime", str(script), *ENTRY_ARGS.get(name, [])]
+        # Warm-up: compiles every module into the scratch pycache.
+        subprocess.run(command, cwd=scratch, env=env, stdin=subprocess.DEVNULL, capture_output=True)
+        for _ in range(max(1, runs)):
+            start = time.perf_counter()
+            result = subprocess.run(
+                command, cwd=scratch, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                encoding="utf-8", errors="replace",
+            )
+            walls.append((time.perf_counter() - start) * 1000.0)
+            total, top = parse_importtime(result.stderr)
+            if total < best[0]:
+                best = (total, top)
+    # The interpreter's own bootstrap (site, encodings) is not ours to trim.
+    ours = [(name, ms) for name, ms in best[1] if name not in _BOOTSTRAP]
+    return {
+        "entry": entry,
+        "wall_ms": round(min(walls), 1),
+        "import_ms": round(sum(ms for _, ms in ours), 1),
+        "heaviest": sorted(ours, key=lambda item: item[1], reverse=True),
+    }
+
+
+_BOOTSTRAP = {
+    "_frozen_importlib_external", "_imp", "_thread", "_warnings", "_weakref", "_io", "marshal", "posix",
+    "time", "zipimport", "_codecs", "codecs", "encodings.aliases", "encodings", "encodings.utf_8",
+    "_signal", "_abc", "abc", "io", "_stat", "stat", "_collections_abc", "genericpath", "posixpath",
+    "os.path", "os", "_sitebuiltins", "site", "sitecustomize", "usercustomize", "_distutils_hack",
+    "certifi", "encodings.latin_1",
+}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report per-entry-point startup time of bin/ scripts")
+    parser.add_argument("entries", nargs="*", default=[*ENTRY_ARGS, *SESSION_ENTRIES],
+                        help="Entry points, ENTRY:session for the stub-session case (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per entry point; the fastest is reported")
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("CCB_STARTUP_BUDGET_MS") or DEFAULT_BUDGET_MS),
+                        help="Import-time budget per entry point in ms (default CCB_STARTUP_BUDGET_MS or 50)")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to list")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = [measure(entry, args.runs) for entry in args.entries]
+    over = [r for r in results if r["import_ms"] > args.budget_ms]
+    if args.json:
+        for r in results:
+            r["heaviest"] = r["heaviest"][:args.top]
+        print(json.dumps({"budget_ms": args.budget_ms, "results": results}, indent=2))
+        return 1 if over else 0
+    print(f"{'entry':<13} {'wall ms':>8} {'import ms':>10}  heaviest imports")
+    for r in results:
+        heaviest = ", ".join(f"{name} {ms:.1f}" for name, ms in r["heaviest"][:args.top])
+        flag = "❌" if r in over else "✅"
+        print(f"{r['entry']:<13} {r['wall_ms']:>8.1f} {r['import_ms']:>10.1f}  {flag} {heaviest}")
+    if over:
+        print(f"❌ {len(over)} entry point(s) over the {args.budget_ms:.0f} ms import budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,15 +2,13 @@
 from __future__ import annotations
 import json
 import os
-import platform
 import re
-import shlex
-import shutil
 import subprocess
+import sys
 import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
 
 
 def _env_float(name: str, default: float) -> float:
@@ -24,20 +22,202 @@ def _env_float(name: str, default: float) -> float:
     return max(0.0, value)
 
 
+# Probe results (WSL detection, wezterm/it2/tmux lookups) are persisted across invocations so
+# each bin/* process and ccb command doesn't repeat the PATH walk and /mnt/<drive> stats.
+# The cache is keyed by PATH and the env vars that influence probing; any change invalidates it.
+# A cached binary path is re-checked with os.path.exists before use (one stat). A cached miss also
+# stores the mtimes of the PATH directories it depends on (installing a tool changes them), and the
+# WezTerm probes add the Windows "Program Files" dirs; only a miss pays for those stats.
+_PROBE_CACHE_VERSION = 3
+_PROBE_ENV_KEYS = (
+    "PATH",
+    "CODEX_WEZTERM_BIN",
+    "WEZTERM_BIN",
+    "CODEX_IT2_BIN",
+    "IT2_BIN",
+    "WSL_DISTRO_NAME",
+    "CCB_BACKEND_ENV",
+)
+_probe_state: Optional[dict] = None
+
+
+def _probe_cache_path() -> Optional[Path]:
+    override = (os.environ.get("CCB_PROBE_CACHE") or "").strip()
+    if override.lower() in {"0", "false", "no", "off"}:
+        return None
+    if override:
+        return Path(override).expanduser()
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home).expanduser() / "ccb" / "terminal_probe.json"
+
+
+def _probe_cache_key() -> str:
+    parts = [str(_PROBE_CACHE_VERSION), sys.platform]
+    for name in _PROBE_ENV_KEYS:
+        parts.append(f"{name}={os.environ.get(name, '')}")
+    # _load_cached_wezterm_bin() reads the install-time env file; changes to it must invalidate too.
+    try:
+        parts.append(str(_install_env_file().stat().st_mtime_ns))
+    except OSError:
+        parts.append("-")
+    import hashlib
+
+    return hashlib.sha256("\0".join(parts).encode("utf-8", errors="replace")).hexdigest()
+
+
+_WEZTERM_PROBES = ("wezterm_bin", "is_windows_wezterm")
+
+
+def _probe_fingerprint(name: str) -> str:
+    """What a miss of probe `name` depends on: the mtimes of the directories it searched"""
+    windows = name in _WEZTERM_PROBES
+    parts = []
+    for directory in (os.environ.get("PATH") or "").split(os.pathsep):
+        # Windows dirs on a WSL PATH sit on a slow mount and only matter for wezterm.exe.
+        if not directory or (directory.startswith("/mnt/") and not windows):
+            continue
+        try:
+            parts.append(f"{directory}={os.stat(directory).st_mtime_ns}")
+        except OSError:
+            parts.append(f"{directory}=-")
+    if windows and is_wsl():
+        try:
+            drives = sorted(d for d in os.listdir("/mnt") if len(d) == 1)
+        except OSError:
+            drives = []
+        for drive in drives:
+            for folder in ("Program Files", "Program Files (x86)"):
+                try:
+                    parts.append(f"{drive}/{folder}={os.stat(f'/mnt/{drive}/{folder}').st_mtime_ns}")
+                except OSError:
+                    pass
+    import hashlib
+
+    return hashlib.sha256("\0".join(parts).encode("utf-8", errors="replace")).hexdigest()
+
+
+def _load_probe_state() -> dict:
+    """Load persisted probe results once per process (single read)"""
+    global _probe_state
+    if _probe_state is not None:
+        return _probe_state
+    key = _probe_cache_key()
+    values: dict = {}
+    path = _probe_cache_path()
+    if path is not None:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if (
+                isinstance(data, dict)
+                and data.get("version") == _PROBE_CACHE_VERSION
+                and data.get("key") == key
+                and isinstance(data.get("values"), dict)
+            ):
+                values = data["values"]
+        except Exception:
+            values = {}
+    _probe_state = {"key": key, "values": values}
+    return _probe_state
+
+
+def _save_probe_state(state: dict) -> None:
+    path = _probe_cache_path()
+    if path is None:
+        return
+    payload = {"version": _PROBE_CACHE_VERSION, "key": state["key"], "values": state["values"]}
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            tmp.unlink()
+        except Exception:
+            pass
+
+
+def _cached_probe(name: str, compute: Callable[[], Any], is_path: bool = False,
+                  host_fact: bool = False) -> Any:
+    """
+    compute() once across invocations. A miss is reused while _probe_fingerprint(name) is
+    unchanged, or always for a `host_fact` (like WSL) that installing a tool cannot change.
+    """
+    state = _load_probe_state()
+    entry = state["values"].get(name)
+    if isinstance(entry, dict):
+        value = entry.get("value")
+        if value:
+            if not is_path or os.path.exists(value):
+                return value
+        elif host_fact or entry.get("fingerprint") == _probe_fingerprint(name):
+            return value
+    value = compute()
+    entry = {"value": value}
+    if not value and not host_fact:
+        entry["fingerprint"] = _probe_fingerprint(name)
+    state["values"][name] = entry
+    _save_probe_state(state)
+    return value
+
+
+def clear_probe_cache() -> None:
+    """Drop persisted and in-process probe results"""
+    global _probe_state, _cached_wezterm_bin
+    _probe_state = None
+    _cached_wezterm_bin = None
+    path = _probe_cache_path()
+    if path is not None:
+        try:
+            path.unlink()
+        except Exception:
+            pass
+
+
 def is_windows() -> bool:
+    import platform
+
     return platform.system() == "Windows"
 
 
-def is_wsl() -> bool:
+def _probe_wsl() -> bool:
     try:
         return "microsoft" in Path("/proc/version").read_text().lower()
     except Exception:
         return False
 
 
+def is_wsl() -> bool:
+    return bool(_cached_probe("is_wsl", _probe_wsl, host_fact=True))
+
+
+def _which(*names: str) -> str:
+    """First of `names` found on PATH, or "" (shutil is only imported when a probe runs)"""
+    import shutil
+
+    for name in names:
+        found = shutil.which(name)
+        if found:
+            return found
+    return ""
+
+
+def _find_windows_wezterm_install() -> str:
+    for drive in "cdefghijklmnopqrstuvwxyz":
+        for path in [f"/mnt/{drive}/Program Files/WezTerm/wezterm.exe",
+                     f"/mnt/{drive}/Program Files (x86)/WezTerm/wezterm.exe"]:
+            if Path(path).exists():
+                return path
+    return ""
+
+
+def _install_env_file() -> Path:
+    return Path.home() / ".config/ccb/env"
+
+
 def _load_cached_wezterm_bin() -> str | None:
     """Load cached WezTerm path from installation"""
-    config = Path.home() / ".config/ccb/env"
+    config = _install_env_file()
     if config.exists():
         try:
             for line in config.read_text().splitlines():
@@ -63,22 +243,23 @@ def _get_wezterm_bin() -> str | None:
     if override and Path(override).exists():
         _cached_wezterm_bin = override
         return override
+    # A cached path whose binary moved or was uninstalled is probed again.
+    found = _cached_probe("wezterm_bin", _probe_wezterm_bin, is_path=True) or None
+    if found:
+        _cached_wezterm_bin = found
+    return found
+
+
+def _probe_wezterm_bin() -> str:
     cached = _load_cached_wezterm_bin()
     if cached:
-        _cached_wezterm_bin = cached
         return cached
-    found = shutil.which("wezterm") or shutil.which("wezterm.exe")
+    found = _which("wezterm", "wezterm.exe")
     if found:
-        _cached_wezterm_bin = found
         return found
     if is_wsl():
-        for drive in "cdefghijklmnopqrstuvwxyz":
-            for path in [f"/mnt/{drive}/Program Files/WezTerm/wezterm.exe",
-                         f"/mnt/{drive}/Program Files (x86)/WezTerm/wezterm.exe"]:
-                if Path(path).exists():
-                    _cached_wezterm_bin = path
-                    return path
-    return None
+        return _find_windows_wezterm_install()
+    return ""
 
 
 def _is_windows_wezterm() -> bool:
@@ -87,14 +268,14 @@ def _is_windows_wezterm() -> bool:
     if override:
         if ".exe" in override.lower() or "/mnt/" in override:
             return True
-    if shutil.which("wezterm.exe"):
+    return bool(_cached_probe("is_windows_wezterm", _probe_windows_wezterm))
+
+
+def _probe_windows_wezterm() -> bool:
+    if _which("wezterm.exe"):
         return True
     if is_wsl():
-        for drive in "cdefghijklmnopqrstuvwxyz":
-            for path in [f"/mnt/{drive}/Program Files/WezTerm/wezterm.exe",
-                         f"/mnt/{drive}/Program Files (x86)/WezTerm/wezterm.exe"]:
-                if Path(path).exists():
-                    return True
+        return bool(_find_windows_wezterm_install())
     return False
 
 
@@ -103,7 +284,7 @@ def _default_shell() -> tuple[str, str]:
         return "bash", "-c"
     if is_windows():
         for shell in ["pwsh", "powershell"]:
-            if shutil.which(shell):
+            if _which(shell):
                 return shell, "-Command"
         return "powershell", "-Command"
     return "bash", "-c"
@@ -118,10 +299,27 @@ def get_shell_type() -> str:
     return "bash"
 
 
+# Raw byte sequences for the named keys send_key() accepts (tmux takes the names directly).
+_KEY_SEQUENCES = {
+    "Escape": "\x1b",
+    "C-c": "\x03",
+    "Enter": "\r",
+}
+
+
+def _key_sequence(key: str) -> str:
+    try:
+        return _KEY_SEQUENCES[key]
+    except KeyError:
+        raise ValueError(f"Unsupported key: {key} (expected one of {', '.join(_KEY_SEQUENCES)})")
+
+
 class TerminalBackend(ABC):
     @abstractmethod
     def send_text(self, pane_id: str, text: str) -> None: ...
     @abstractmethod
+    def send_key(self, pane_id: str, key: str) -> None: ...
+    @abstractmethod
     def is_alive(self, pane_id: str) -> bool: ...
     @abstractmethod
     def kill_pane(self, pane_id: str) -> None: ...
@@ -130,6 +328,14 @@ class TerminalBackend(ABC):
     @abstractmethod
     def create_pane(self, cmd: str, cwd: str, direction: str = "right", percent: int = 50, parent_pane: Optional[str] = None) -> str: ...
 
+    def get_text(self, pane_id: str, lines: int = 50) -> str:
+        """Last `lines` lines shown in the pane; "" when the backend cannot read it back"""
+        return ""
+
+    def list_panes(self) -> Optional[set[str]]:
+        """Ids of every live pane from one backend call; None when the backend cannot be asked"""
+        return None
+
 
 class TmuxBackend(TerminalBackend):
     def send_text(self, session: str, text: str) -> None:
@@ -154,6 +360,10 @@ class TmuxBackend(TerminalBackend):
         finally:
             subprocess.run(["tmux", "delete-buffer", "-b", buffer_name], stderr=subprocess.DEVNULL)
 
+    def send_key(self, session: str, key: str) -> None:
+        _key_sequence(key)
+        subprocess.run(["tmux", "send-keys", "-t", session, key], check=True)
+
     def is_alive(self, session: str) -> bool:
         result = subprocess.run(["tmux", "has-session", "-t", session], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         return result.returncode == 0
@@ -161,6 +371,20 @@ class TmuxBackend(TerminalBackend):
     def kill_pane(self, session: str) -> None:
         subprocess.run(["tmux", "kill-session", "-t", session], stderr=subprocess.DEVNULL)
 
+    def list_panes(self) -> Optional[set[str]]:
+        try:
+            result = subprocess.run(["tmux", "list-sessions", "-F", "#{session_name}"],
+                                    capture_output=True, text=True, encoding="utf-8", errors="replace")
+        except OSError:
+            return None
+        # No tmux server running means no sessions, not an unknown answer.
+        return set(result.stdout.split()) if result.returncode == 0 else set()
+
+    def get_text(self, session: str, lines: int = 50) -> str:
+        result = subprocess.run(["tmux", "capture-pane", "-p", "-t", session, "-S", f"-{max(1, lines)}"],
+                                capture_output=True, text=True, encoding="utf-8", errors="replace")
+        return result.stdout if result.returncode == 0 else ""
+
     def activate(self, session: str) -> None:
         subprocess.run(["tmux", "attach", "-t", session])
 
@@ -182,7 +406,7 @@ class Iterm2Backend(TerminalBackend):
         if override:
             cls._it2_bin = override
             return override
-        cls._it2_bin = shutil.which("it2") or "it2"
+        cls._it2_bin = _cached_probe("it2_bin", lambda: _which("it2"), is_path=True) or "it2"
         return cls._it2_bin
 
     def send_text(self, session_id: str, text: str) -> None:
@@ -203,18 +427,26 @@ class Iterm2Backend(TerminalBackend):
             check=True,
         )
 
+    def send_key(self, session_id: str, key: str) -> None:
+        subprocess.run(
+            [self._bin(), "session", "send", _key_sequence(key), "--session", session_id],
+            check=True,
+        )
+
     def is_alive(self, session_id: str) -> bool:
+        return session_id in (self.list_panes() or ())
+
+    def list_panes(self) -> Optional[set[str]]:
         try:
             result = subprocess.run(
                 [self._bin(), "session", "list", "--json"],
                 capture_output=True, text=True
             )
             if result.returncode != 0:
-                return False
-            sessions = json.loads(result.stdout)
-            return any(s.get("id") == session_id for s in sessions)
+                return None
+            return {str(s.get("id")) for s in json.loads(result.stdout)}
         except Exception:
-            return False
+            return None
 
     def kill_pane(self, session_id: str) -> None:
         subprocess.run(
@@ -246,6 +478,8 @@ class Iterm2Backend(TerminalBackend):
         # Execute startup command in new pane
         if new_session_id and cmd:
             # First cd to work directory, then execute command
+            import shlex
+
             full_cmd = f"cd {shlex.quote(cwd)} && {cmd}"
             time.sleep(0.2)  # Wait for pane ready
             # Use send + Enter, consistent with send_text
@@ -327,19 +561,35 @@ class WeztermBackend(TerminalBackend):
 
         self._send_enter(pane_id)
 
+    def send_key(self, pane_id: str, key: str) -> None:
+        subprocess.run(
+            [*self._cli_base_args(), "send-text", "--pane-id", pane_id, "--no-paste"],
+            input=_key_sequence(key).encode("utf-8"),
+            check=True,
+        )
+
     def is_alive(self, pane_id: str) -> bool:
+        return str(pane_id) in (self.list_panes() or ())
+
+    def list_panes(self) -> Optional[set[str]]:
         try:
             result = subprocess.run([*self._cli_base_args(), "list", "--format", "json"], capture_output=True, text=True, encoding="utf-8", errors="replace")
             if result.returncode != 0:
-                return False
-            panes = json.loads(result.stdout)
-            return any(str(p.get("pane_id")) == str(pane_id) for p in panes)
+                return None
+            return {str(p.get("pane_id")) for p in json.loads(result.stdout)}
         except Exception:
-            return False
+            return None
 
     def kill_pane(self, pane_id: str) -> None:
         subprocess.run([*self._cli_base_args(), "kill-pane", "--pane-id", pane_id], stderr=subprocess.DEVNULL)
 
+    def get_text(self, pane_id: str, lines: int = 50) -> str:
+        result = subprocess.run(
+            [*self._cli_base_args(), "get-text", "--pane-id", pane_id, "--start-line", f"-{max(1, lines)}"],
+            capture_output=True, text=True, encoding="utf-8", errors="replace",
+        )
+        return result.stdout if result.returncode == 0 else ""
+
     def activate(self, pane_id: str) -> None:
         subprocess.run([*self._cli_base_args(), "activate-pane", "--pane-id", pane_id])
 
@@ -367,6 +617,8 @@ class WeztermBackend(TerminalBackend):
             args.extend(["--percent", str(percent)])
             if parent_pane:
                 args.extend(["--pane-id", parent_pane])
+            import shlex
+
             startup_script = f"cd {shlex.quote(wsl_cwd)} && exec {cmd}"
             if in_wsl_pane:
                 args.extend(["--", "bash", "-l", "-i", "-c", startup_script])
@@ -407,10 +659,10 @@ def detect_terminal() -> Optional[str]:
     override = os.environ.get("CODEX_IT2_BIN") or os.environ.get("IT2_BIN")
     if override and Path(override).expanduser().exists():
         return "iterm2"
-    # Check available terminal tools
-    if shutil.which("it2"):
+    # Check available terminal tools (their resolved paths are cached, and re-checked on use)
+    if _cached_probe("it2_bin", lambda: _which("it2"), is_path=True):
         return "iterm2"
-    if shutil.which("tmux") or shutil.which("tmux.exe"):
+    if _cached_probe("tmux_bin", lambda: _which("tmux", "tmux.exe"), is_path=True):
         return "tmux"
     return None
 
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Terminal injection microbenchmark
+Drives TerminalBackend.send_text() against a throwaway pane running a stub reader and
+measures end-to-end injection latency/throughput per backend and payload shape.
+
+Usage:
+  python lib/terminal_bench.py                          # all available backends, JSON to stdout
+  python lib/terminal_bench.py --backend tmux -n 20 --output bench.json
+  python lib/terminal_bench.py --zero-delays            # measure with the fixed sleeps disabled
+  python lib/terminal_bench.py --compare baseline.json  # print per-case median deltas
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from terminal import Iterm2Backend, TerminalBackend, TmuxBackend, WeztermBackend, _get_wezterm_bin
+
+# The stub runs in raw mode so long payloads aren't clipped by the tty line discipline, and enables
+# bracketed paste like the Codex/Gemini TUIs do. It appends one JSON line per submitted Enter.
+_STUB_READER = r'''
+import json, os, sys, time, tty
+START, END = b"\x1b[200~", b"\x1b[201~"
+out = open(sys.argv[1], "a", buffering=1)
+fd = sys.stdin.fileno()
+tty.setraw(fd)
+os.write(sys.stdout.fileno(), b"\x1b[?2004h")
+pending = b""
+in_paste = False
+count = 0
+while True:
+    chunk = os.read(fd, 65536)
+    if not chunk:
+        break
+    data = pending + chunk
+    pending = b""
+    while data:
+        if in_paste:
+            idx = data.find(END)
+            if idx < 0:
+                keep = len(END) - 1
+                count += max(0, len(data) - keep)
+                pending = data[-keep:] if len(data) >= keep else data
+                data = b""
+                break
+            count += idx
+            data = data[idx + len(END):]
+            in_paste = False
+            continue
+        cr = data.find(b"\r")
+        st = data.find(START)
+        if st >= 0 and (cr < 0 or st < cr):
+            count += st
+            data = data[st + len(START):]
+            in_paste = True
+            continue
+        if cr >= 0:
+            count += cr
+            out.write(json.dumps({"t": time.time(), "bytes": count}) + "\n")
+            count = 0
+            data = data[cr + 1:]
+            continue
+        if data.endswith(b"\x1b") or data[-5:].find(b"\x1b[") >= 0:
+            cut = data.rfind(b"\x1b")
+            count += cut
+            pending = data[cut:]
+        else:
+            count += len(data)
+        data = b""
+'''
+
+_DELAY_ENV = ("CCB_TMUX_ENTER_DELAY", "CCB_WEZTERM_ENTER_DELAY", "CCB_WEZTERM_PASTE_DELAY")
+
+
+def build_payloads(large_kb: int = 100) -> Dict[str, str]:
+    """Payload shapes that exercise each backend's fast/slow path"""
+    line = "Review the function and list potential edge cases. "
+    return {
+        "single_line": (line * 2).strip(),
+        "multiline": "\n".join(f"{i + 1}. {line.strip()}" for i in range(12)),
+        # TmuxBackend/WeztermBackend switch from send-keys/--no-paste to paste mode above 200 chars.
+        "boundary_200": "x" * 200,
+        "boundary_201": "x" * 201,
+        f"large_{large_kb}kb": (line * ((large_kb * 1024) // len(line) + 1))[: large_kb * 1024],
+    }
+
+
+class StubPane:
+    """A throwaway pane running the stub reader for one backend"""
+
+    def __init__(self, name: str, backend: TerminalBackend, workdir: Path):
+        self.name = name
+        self.backend = backend
+        self.workdir = workdir
+        self.stub_path = workdir / "stub_reader.py"
+        self.events_path = workdir / f"{name}-events.jsonl"
+        self.pane_id = ""
+        self._events_offset = 0
+
+    def start(self) -> None:
+        self.stub_path.write_text(_STUB_READER, encoding="utf-8")
+        self.events_path.write_text("", encoding="utf-8")
+        cmd = f"{shlex.quote(sys.executable)} {shlex.quote(str(self.stub_path))} {shlex.quote(str(self.events_path))}"
+        if isinstance(self.backend, TmuxBackend):
+            self.pane_id = f"ccb-bench-{os.getpid()}-{int(time.time() * 1000) % 100000}"
+            subprocess.run(
+                ["tmux", "new-session", "-d", "-s", self.pane_id, "-x", "200", "-y", "50", "-c", str(self.workdir), cmd],
+                check=True,
+            )
+        else:
+            self.pane_id = self.backend.create_pane(cmd, str(self.workdir), direction="bottom", percent=20)
+        # Give the stub time to switch to raw mode and enable bracketed paste.
+        time.sleep(0.5)
+
+    def stop(self) -> None:
+        if self.pane_id:
+            try:
+                self.backend.kill_pane(self.pane_id)
+            except Exception:
+                pass
+
+    def wait_event(self, timeout: float) -> Optional[Dict[str, Any]]:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                with self.events_path.open("rb") as handle:
+                    handle.seek(self._events_offset)
+                    line = handle.readline()
+            except OSError:
+                line = b""
+            if line.endswith(b"\n"):
+                self._events_offset += len(line)
+                try:
+                    return json.loads(line)
+                except json.JSONDecodeError:
+                    return None
+            time.sleep(0.001)
+        return None
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "min": round(ordered[0], 3),
+        "median": round(statistics.median(ordered), 3),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p95": round(p95, 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def bench_case(pane: StubPane, payload_name: str, payload: str, iterations: int, timeout: float) -> Dict[str, Any]:
+    latencies_ms: List[float] = []
+    call_ms: List[float] = []
+    received: List[int] = []
+    errors: List[str] = []
+    for _ in range(iterations):
+        t0 = time.time()
+        try:
+            pane.backend.send_text(pane.pane_id, payload)
+        except Exception as exc:
+            errors.append(str(exc))
+            continue
+        t_call = time.time()
+        event = pane.wait_event(timeout)
+        if not event:
+            errors.append("timeout waiting for stub reader")
+            continue
+        call_ms.append((t_call - t0) * 1000.0)
+        latencies_ms.append((float(event["t"]) - t0) * 1000.0)
+        received.append(int(event.get("bytes", 0)))
+
+    size = len(payload.encode("utf-8"))
+    median_ms = statistics.median(latencies_ms) if latencies_ms else 0.0
+    return {
+        "backend": pane.name,
+        "payload": payload_name,
+        "bytes": size,
+        "iterations": iterations,
+        "ok": len(latencies_ms),
+        "latency_ms": _summary(latencies_ms),
+        "send_call_ms": _summary(call_ms),
+        "throughput_kib_s": round(size / 1024.0 / (median_ms / 1000.0), 1) if median_ms else 0.0,
+        # Payloads are stripped/normalized by send_text; a mismatch usually means truncation.
+        "bytes_received": sorted(set(received)),
+        "errors": errors[:5],
+    }
+
+
+def available_backends() -> List[Tuple[str, Callable[[], TerminalBackend]]]:
+    found: List[Tuple[str, Callable[[], TerminalBackend]]] = []
+    if shutil.which("tmux"):
+        found.append(("tmux", TmuxBackend))
+    # WezTerm/iTerm2 can only split panes from inside a running GUI session.
+    if os.environ.get("WEZTERM_PANE") and _get_wezterm_bin():
+        found.append(("wezterm", WeztermBackend))
+    if os.environ.get("ITERM_SESSION_ID") and shutil.which("it2"):
+        found.append(("iterm2", Iterm2Backend))
+    return found
+
+
+def run_benchmarks(backends: List[str], iterations: int, timeout: float, large_kb: int,
+                   zero_delays: bool) -> Dict[str, Any]:
+    if zero_delays:
+        for name in _DELAY_ENV:
+            os.environ[name] = "0"
+    payloads = build_payloads(large_kb)
+    selected = [(name, factory) for name, factory in available_backends() if not backends or name in backends]
+    results: List[Dict[str, Any]] = []
+    skipped = sorted(set(backends) - {name for name, _ in selected})
+    with tempfile.TemporaryDirectory(prefix="ccb-bench-") as tmp:
+        workdir = Path(tmp)
+        for name, factory in selected:
+            pane = StubPane(name, factory(), workdir)
+            try:
+                pane.start()
+                for payload_name, payload in payloads.items():
+                    results.append(bench_case(pane, payload_name, payload, iterations, timeout))
+            except Exception as exc:
+                results.append({"backend": name, "error": str(exc)})
+            finally:
+                pane.stop()
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "delays": {name: os.environ.get(name) for name in _DELAY_ENV},
+            "skipped_backends": skipped,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    def index(report: Dict[str, Any]) -> Dict[Tuple[str, str], float]:
+        out: Dict[Tuple[str, str], float] = {}
+        for row in report.get("results", []):
+            median = (row.get("latency_ms") or {}).get("median")
+            if median is not None:
+                out[(row.get("backend", ""), row.get("payload", ""))] = float(median)
+        return out
+
+    base = index(baseline)
+    lines = []
+    for key, median in sorted(index(current).items()):
+        before = base.get(key)
+        if before is None:
+            lines.append(f"{key[0]:8} {key[1]:14} {median:9.2f} ms  (new)")
+            continue
+        delta = (median - before) / before * 100.0 if before else 0.0
+        lines.append(f"{key[0]:8} {key[1]:14} {median:9.2f} ms  vs {before:9.2f} ms  ({delta:+.1f}%)")
+    return lines
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark terminal text injection per backend")
+    parser.add_argument("--backend", action="append", choices=["tmux", "wezterm", "iterm2"],
+                        help="Backend to benchmark (repeatable, default: all available)")
+    parser.add_argument("-n", "--iterations", type=int, default=10, help="Iterations per payload")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-injection timeout in seconds")
+    parser.add_argument("--large-kb", type=int, default=100, help="Size of the large payload in KiB")
+    parser.add_argument("--zero-delays", action="store_true", help="Set the backend enter/paste sleeps to 0")
+    parser.add_argument("--output", help="Write JSON report to file instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON report to compare medians against (printed to stderr)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = run_benchmarks(args.backend or [], max(1, args.iterations), args.timeout, max(1, args.large_kb),
+                            args.zero_delays)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).expanduser().write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.compare:
+        baseline = json.loads(Path(args.compare).expanduser().read_text(encoding="utf-8"))
+        for line in compare(report, baseline):
+            print(line, file=sys.stderr)
+    if not report["results"]:
+        print("No terminal backend available to benchmark", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Provider worker pools: `ccb up codex:4 gemini:2` runs several panes per provider behind one ask interface
+The project session file describes the first worker at top level (exactly as a single pane) and every
+worker under "pool". Replies, cancels and claims live in the first worker's runtime dir, the pool's shared
+dir, so waiters and `--cancel` never need to know which pane took an ask. Only sending picks a worker:
+the least-loaded healthy one (Codex: its bridge's turn and queue; Gemini: its outstanding asks).
+Every pane binds its own provider log, by the first prompt of its own it finds there (bind_log).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bridge_protocol import claim_entry
+
+MAX_WORKERS = 8
+BOUND_LOG = "bound_log"
+OUTSTANDING_DIR = "outstanding"
+
+
+def parse_spec(value: str) -> Tuple[str, int]:
+    """"codex" or "codex:4" -> (provider, workers)"""
+    provider, _, count = value.partition(":")
+    if not count:
+        return provider, 1
+    try:
+        workers = int(count)
+    except ValueError:
+        raise ValueError(f"invalid worker count in {value!r}")
+    if not 1 <= workers <= MAX_WORKERS:
+        raise ValueError(f"worker count for {provider} must be 1..{MAX_WORKERS}")
+    return provider, workers
+
+
+def worker_name(provider: str, index: int) -> str:
+    return provider if index == 0 else f"{provider}-{index + 1}"
+
+
+def pool_workers(session_info: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The workers of a pooled session ([] for a single pane)"""
+    pool = (session_info or {}).get("pool")
+    if not isinstance(pool, list) or len(pool) < 2:
+        return []
+    return [w for w in pool if isinstance(w, dict) and w.get("runtime_dir")]
+
+
+def pool_from_env(prefix: str) -> Optional[List[Dict[str, Any]]]:
+    """The pool `ccb up` hands to Claude in <PREFIX>_POOL (JSON), for env-configured sessions"""
+    try:
+        pool = json.loads(os.environ.get(f"{prefix}_POOL") or "null")
+    except ValueError:
+        return None
+    return pool if isinstance(pool, list) else None
+
+
+def in_pool() -> bool:
+    """Whether this bridge runs one worker of a pool (set by `ccb up codex:N`)"""
+    return bool((os.environ.get("CCB_POOL_SHARED_DIR") or "").strip())
+
+
+def shared_dir(default: Path) -> Path:
+    """Where a bridge files replies and looks for cancels: the pool's shared dir, else its own"""
+    value = (os.environ.get("CCB_POOL_SHARED_DIR") or "").strip()
+    return Path(value) if value else Path(default)
+
+
+def pick_worker(workers: List[Dict[str, Any]],
+                load: Callable[[Dict[str, Any]], Optional[float]]) -> Optional[Dict[str, Any]]:
+    """The least-loaded worker (`load` returns None for one that can't take asks); ties rotate"""
+    scored = []
+    for worker in workers:
+        value = load(worker)
+        if value is not None:
+            scored.append((value, worker))
+    if not scored:
+        return None
+    best = min(value for value, _ in scored)
+    ties = [worker for value, worker in scored if value == best]
+    # Concurrent senders reading the same loads spread out instead of piling onto one pane.
+    return ties[(time.time_ns() // 1000 + os.getpid()) % len(ties)]
+
+
+# ---- log binding ----
+
+def bound_log(runtime_dir: Path) -> Optional[Path]:
+    try:
+        value = (Path(runtime_dir) / BOUND_LOG).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return Path(value) if value else None
+
+
+def bind_log(shared: Path, runtime_dir: Path, log_path: Path) -> bool:
+    """Bind `log_path` to the worker at `runtime_dir`; False if another worker already owns it"""
+    if bound_log(runtime_dir) == Path(log_path):
+        return True
+    if not claim_entry(shared, f"log-{Path(log_path).name}"):
+        return False
+    try:
+        (Path(runtime_dir) / BOUND_LOG).write_text(f"{log_path}\n", encoding="utf-8")
+    except OSError:
+        pass
+    return True
+
+
+def foreign_logs(workers: List[Dict[str, Any]], runtime_dir: Path) -> set:
+    """Logs bound to the other workers of the pool"""
+    own = Path(runtime_dir)
+    return {log for w in workers if Path(w["runtime_dir"]) != own
+            for log in [bound_log(Path(w["runtime_dir"]))] if log}
+
+
+# ---- outstanding asks (providers without a bridge) ----
+
+def mark_outstanding(runtime_dir: Path, marker: str) -> None:
+    path = Path(runtime_dir) / OUTSTANDING_DIR / Path(str(marker)).name
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"{time.time()}\n", encoding="utf-8")
+    except OSError:
+        pass
+
+
+def clear_outstanding(runtime_dir: Path, marker: str) -> None:
+    try:
+        (Path(runtime_dir) / OUTSTANDING_DIR / Path(str(marker)).name).unlink()
+    except OSError:
+        pass
+
+
+def outstanding_count(runtime_dir: Path, max_age: float) -> int:
+    """Asks sent to this worker and not answered yet; ones older than `max_age` are given up on"""
+    cutoff = time.time() - max_age
+    count = 0
+    try:
+        entries = list((Path(runtime_dir) / OUTSTANDING_DIR).iterdir())
+    except OSError:
+        return 0
+    for path in entries:
+        try:
+            if path.stat().st_mtime >= cutoff:
+                count += 1
+            else:
+                path.unlink()
+        except OSError:
+            pass
+    return count
+
+
+def worker_for(workers: List[Dict[str, Any]], marker: str) -> Optional[Dict[str, Any]]:
+    """The worker an outstanding ask was sent to"""
+    name = Path(str(marker)).name
+    for worker in workers:
+        if (Path(worker["runtime_dir"]) / OUTSTANDING_DIR / name).exists():
+            return worker
+    return None